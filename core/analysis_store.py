@@ -0,0 +1,196 @@
+import os
+import json
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+
+def json_default(obj):
+    """직렬화 보조 (numpy 스칼라/배열만 파이썬 값으로 변환, 그 외 타입은 TypeError)"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"직렬화할 수 없는 타입: {type(obj).__name__}")
+
+
+class AnalysisHistoryStore:
+    """분석 실행 이력 저장소 (SQLite, 실행별 종목 결과를 행 단위로 누적)"""
+
+    def __init__(self, db_path="data/analysis_history.db", timeout=30):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """DB 연결 (커밋 후 종료)"""
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """테이블 생성"""
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_type TEXT NOT NULL,
+                    run_date TEXT NOT NULL,
+                    run_at TEXT NOT NULL,
+                    ticker_count INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    UNIQUE (run_type, run_at)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ticker_results (
+                    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+                    run_type TEXT NOT NULL,
+                    run_date TEXT NOT NULL,
+                    ticker TEXT NOT NULL,
+                    score REAL,
+                    confidence REAL,
+                    current_price REAL,
+                    rsi REAL,
+                    maintain INTEGER,
+                    removal_reason TEXT,
+                    result TEXT,
+                    PRIMARY KEY (run_id, ticker)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_type_date ON runs (run_type, run_date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_date_type_ticker "
+                         "ON ticker_results (run_date, run_type, ticker)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_ticker_date ON ticker_results (ticker, run_date)")
+
+    @staticmethod
+    def _ticker_rows(run_type, data):
+        """실행 데이터에서 종목별 결과 추출 → [(ticker, result dict, maintain, removal_reason)]"""
+        if run_type == 'morning':
+            return [(ticker, result, None, None) for ticker, result in data.get('stock_analysis', {}).items()]
+
+        rows = []
+        detailed = data.get('detailed_analysis', {})
+        maintained = set(data.get('maintained', []))
+        for ticker, result in detailed.items():
+            maintain = result.get('maintain', ticker in maintained)
+            rows.append((ticker, result, bool(maintain), result.get('removal_reason') or None))
+
+        # 상세 분석 없이 제외된 종목 (데이터 수집 실패 등)
+        for entry in data.get('removed', []):
+            ticker, reason = (entry[0], entry[1]) if isinstance(entry, (list, tuple)) else (entry, '')
+            if ticker not in detailed:
+                rows.append((ticker, {}, False, reason))
+        return rows
+
+    @staticmethod
+    def _number(value):
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+    def record_run(self, run_type, data):
+        """실행 결과 추가 (같은 실행 시각이 이미 있으면 기존 run_id 반환)"""
+        run_at = data.get('timestamp') or datetime.now().isoformat()
+        run_date = run_at[:10]
+        rows = self._ticker_rows(run_type, data)
+        payload = json.dumps(data, ensure_ascii=False, default=json_default)
+
+        with self._lock, self._connect() as conn:
+            existing = conn.execute(
+                "SELECT run_id FROM runs WHERE run_type = ? AND run_at = ?", (run_type, run_at)
+            ).fetchone()
+            if existing:
+                return existing['run_id']
+
+            run_id = conn.execute(
+                "INSERT INTO runs (run_type, run_date, run_at, ticker_count, payload) VALUES (?, ?, ?, ?, ?)",
+                (run_type, run_date, run_at, len(rows), payload)
+            ).lastrowid
+            conn.executemany(
+                "INSERT OR REPLACE INTO ticker_results (run_id, run_type, run_date, ticker, score, confidence, "
+                "current_price, rsi, maintain, removal_reason, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, run_type, run_date, ticker,
+                     self._number(result.get('score')), self._number(result.get('confidence')),
+                     self._number(result.get('current_price')), self._number(result.get('rsi')),
+                     None if maintain is None else int(maintain), removal_reason,
+                     json.dumps(result, ensure_ascii=False, default=json_default))
+                    for ticker, result, maintain, removal_reason in rows
+                ]
+            )
+
+        self.logger.info(f"분석 이력 기록: {run_type} {run_at} ({len(rows)}개 종목)")
+        return run_id
+
+    def latest_run(self, run_type):
+        """가장 최근 실행 데이터 (없으면 None)"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM runs WHERE run_type = ? ORDER BY run_at DESC, run_id DESC LIMIT 1",
+                (run_type,)
+            ).fetchone()
+        return json.loads(row['payload']) if row else None
+
+    def get_runs(self, run_type=None, since=None, until=None):
+        """실행 목록 (payload 제외)"""
+        query = "SELECT run_id, run_type, run_date, run_at, ticker_count FROM runs WHERE 1 = 1"
+        params = []
+        if run_type:
+            query += " AND run_type = ?"
+            params.append(run_type)
+        if since:
+            query += " AND run_date >= ?"
+            params.append(str(since))
+        if until:
+            query += " AND run_date <= ?"
+            params.append(str(until))
+        query += " ORDER BY run_at"
+
+        with self._lock, self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def get_ticker_results(self, ticker=None, run_type=None, since=None, until=None, include_result=False):
+        """종목별 결과 이력 (예: 최근 분기 전체 종목 점수 추이)"""
+        columns = "run_id, run_type, run_date, ticker, score, confidence, current_price, rsi, maintain, removal_reason"
+        if include_result:
+            columns += ", result"
+        query = f"SELECT {columns} FROM ticker_results WHERE 1 = 1"
+        params = []
+        if ticker:
+            query += " AND ticker = ?"
+            params.append(ticker)
+        if run_type:
+            query += " AND run_type = ?"
+            params.append(run_type)
+        if since:
+            query += " AND run_date >= ?"
+            params.append(str(since))
+        if until:
+            query += " AND run_date <= ?"
+            params.append(str(until))
+        query += " ORDER BY run_date, run_id, ticker"
+
+        with self._lock, self._connect() as conn:
+            rows = [dict(row) for row in conn.execute(query, params)]
+
+        for row in rows:
+            if row['maintain'] is not None:
+                row['maintain'] = bool(row['maintain'])
+            if include_result:
+                row['result'] = json.loads(row['result']) if row['result'] else {}
+        return rows
+
+
+print("✅ AnalysisHistoryStore (SQLite 분석 이력 저장소)")
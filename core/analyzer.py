@@ -7,6 +7,8 @@ from .technical import TechnicalAnalyzer
 from .data_manager import DataManager
 from .telegram_bot import TelegramBot
 from .report_generator import MorningReportGenerator, EveningReportGenerator, SundayReportGenerator
+from .portfolio_risk import PortfolioRiskEngine
+from .monte_carlo import MonteCarloSimulator
 
 # 조건부 import (에러 방지)
 try:
@@ -26,6 +28,7 @@ except ImportError as e:
     POSITION_ESTIMATOR_AVAILABLE = False
 
 from utils.stock_utils import StockTickerManager
+from utils.concurrency import TokenBucket, run_concurrently
 
 load_dotenv()
 
@@ -62,6 +65,12 @@ class AlphaSeeker:
         self.portfolio_balance = float(os.getenv('PORTFOLIO_CAPITAL', 100000))
         self.max_position_size = 0.15    # 종목당 최대 15%
         self.max_total_exposure = 0.8    # 전체 노출 최대 80%
+        self.portfolio_risk_engine = PortfolioRiskEngine()
+        self.monte_carlo = MonteCarloSimulator(paths=5000, horizon=10)
+        
+        # 병렬 분석 설정 (yfinance 요청은 토큰 버킷으로 속도 제한)
+        self.max_workers = 4
+        self.request_limiter = TokenBucket(rate=2, capacity=4)  # 초당 2건, 순간 최대 4건
         
         # 상태 메시지
         features = []
@@ -135,6 +144,32 @@ class AlphaSeeker:
                 'confidence_factor': 0.5
             }
     
+    def calculate_portfolio_weights(self, analysis_result):
+        """유지 종목 비중 (재검토 포지션 비율, 없으면 동일 비중)"""
+        detailed_analysis = analysis_result.get('detailed_analysis', {})
+        weights = {}
+        for ticker in analysis_result.get('maintained', []):
+            data = detailed_analysis.get(ticker, {})
+            weights[ticker] = data.get('position_pct') or 0
+        return weights
+    
+    def calculate_portfolio_risk(self, analysis_result):
+        """유지 종목 포트폴리오 위험 (수축 공분산 기반 변동성/VaR/CVaR/위험 기여도)"""
+        try:
+            maintained = analysis_result.get('maintained', [])
+            if len(maintained) < 2:
+                return None
+            
+            return self.portfolio_risk_engine.analyze_tickers(
+                maintained,
+                self.technical_analyzer.history_store,
+                weights=self.calculate_portfolio_weights(analysis_result)
+            )
+            
+        except Exception as e:
+            logging.error(f"포트폴리오 위험 계산 오류: {e}")
+            return None
+    
     def calculate_risk_metrics(self, analysis_result):
         """리스크 메트릭 계산"""
         try:
@@ -172,7 +207,7 @@ class AlphaSeeker:
             else:
                 risk_level = "💥 매우 고위험"
             
-            return {
+            metrics = {
                 'risk_level': risk_level,
                 'risk_score': round(risk_score, 1),
                 'removal_rate': round(removal_rate * 100, 1),
@@ -181,6 +216,20 @@ class AlphaSeeker:
                 'maintained_count': len(maintained)
             }
             
+            # 포트폴리오 위험 요약 (유지 종목 공분산 기반)
+            portfolio_risk = analysis_result.get('portfolio_risk')
+            if portfolio_risk:
+                metrics.update({
+                    'portfolio_volatility': portfolio_risk['volatility_annual'],
+                    'portfolio_var': portfolio_risk.get('var_historical', portfolio_risk['var_parametric']),
+                    'portfolio_cvar': portfolio_risk.get('cvar_historical', portfolio_risk['cvar_parametric']),
+                    'avg_correlation': portfolio_risk['avg_correlation'],
+                    'effective_bets': portfolio_risk['effective_bets'],
+                    'portfolio_warnings': portfolio_risk['warnings']
+                })
+            
+            return metrics
+            
         except Exception as e:
             logging.error(f"리스크 메트릭 계산 오류: {e}")
             return {'risk_level': '계산 오류', 'risk_score': 50}
@@ -256,25 +305,81 @@ class AlphaSeeker:
             logging.error(f"Perplexity 분석 오류: {e}")
             return None
     
+    def _analyze_technical_batch(self, tickers):
+        """기술적 분석 일괄 실행 (일괄 다운로드 후 실패 종목만 병렬 재시도)"""
+        results = self.technical_analyzer.analyze_many(tickers, retry=False)
+        
+        failed = [ticker for ticker in tickers if not results.get(ticker)]
+        if failed:
+            logging.warning(f"일괄 분석 실패 {len(failed)}개 종목 병렬 재시도: {failed}")
+            retried = run_concurrently(
+                self.technical_analyzer.analyze, failed,
+                max_workers=self.max_workers,
+                rate_limiter=self.request_limiter,
+                description="기술적 분석"
+            )
+            results.update(zip(failed, retried))
+        
+        return results
+    
+    def simulate_profit_targets(self, analysis_results):
+        """과거 1년 일간 수익률 부트스트랩으로 익절 선도달 확률/기대수익/도달 기간 계산"""
+        targets = {}
+        for ticker, result in analysis_results.items():
+            advanced_position = result.get('advanced_position')
+            if advanced_position:
+                targets[ticker] = (
+                    result.get('current_price', 0),
+                    advanced_position.get('stop_loss', 0),
+                    advanced_position.get('take_profit', 0)
+                )
+        if not targets:
+            return
+        
+        try:
+            frames = self.technical_analyzer.history_store.get_many(list(targets), interval="1d", period="1y")
+            simulations = self.monte_carlo.analyze_many(frames, targets)
+        except Exception as e:
+            logging.error(f"몬테카를로 시뮬레이션 오류: {e}")
+            return
+        
+        for ticker, simulation in simulations.items():
+            analysis_results[ticker]['monte_carlo'] = simulation
+        logging.info(f"몬테카를로 시뮬레이션 완료: {len(simulations)}/{len(targets)}개 종목")
+    
     def analyze_extracted_stocks(self, tickers):
         """추출된 종목들 기술적 분석 + 포지션 예상"""
         print(f"📊 {len(tickers)}개 종목 기술적 분석 + 포지션 예상 시작...")
         logging.info(f"{len(tickers)}개 종목 분석 시작")
         
         analysis_results = {}
+        target_tickers = tickers[:8]  # 최대 8개 종목
         
-        for ticker in tickers[:8]:  # 최대 8개 종목
+        # 기술적 분석 (전 종목 일괄 다운로드)
+        technical_results = self._analyze_technical_batch(target_tickers)
+        
+        # 기본 정보 병렬 조회 (결과는 입력 순서 유지)
+        analyzable = [ticker for ticker in target_tickers if technical_results.get(ticker)]
+        basic_infos = dict(zip(analyzable, run_concurrently(
+            self.ticker_manager.get_stock_basic_info, analyzable,
+            max_workers=self.max_workers,
+            rate_limiter=self.request_limiter,
+            description="기본 정보 조회"
+        )))
+        self.ticker_manager.metadata_cache.flush()
+        
+        for ticker in target_tickers:
             print(f"🔍 {ticker} 분석 중...")
             
+            # 기술적 분석 결과
+            technical_result = technical_results.get(ticker)
+            if not technical_result:
+                continue
+            
             # 기본 정보
-            basic_info = self.ticker_manager.get_stock_basic_info(ticker)
+            basic_info = basic_infos.get(ticker)
             if not basic_info:
                 continue
-                
-            # 기술적 분석
-            technical_result = self.technical_analyzer.analyze(ticker)
-            if not technical_result:
-                continue
             
             # 포지션 크기 계산 (기존)
             position_info = self.calculate_position_size(
@@ -303,9 +408,9 @@ class AlphaSeeker:
                 result['advanced_position'] = advanced_position
             
             analysis_results[ticker] = result
-            
-            import time
-            time.sleep(0.8)  # API 제한 방지
+        
+        # 손익 목표 몬테카를로 시뮬레이션 (고급 포지션 종목)
+        self.simulate_profit_targets(analysis_results)
         
         print(f"✅ {len(analysis_results)}개 종목 분석 완료")
         logging.info(f"{len(analysis_results)}개 종목 분석 완료")
@@ -376,21 +481,20 @@ class AlphaSeeker:
         recheck_results = {}
         failed_count = 0
         
+        # 강화된 기술적 분석 (일괄 다운로드 + 실패 종목 병렬 재시도)
+        try:
+            current_analyses = self._analyze_technical_batch(list(morning_stocks.keys()))
+        except Exception as e:
+            print(f"⚠️ 일괄 재분석 오류: {str(e)}")
+            logging.error(f"일괄 재분석 오류: {e}")
+            current_analyses = {}
+        
         for ticker, morning_data in morning_stocks.items():
             print(f"📊 {ticker} 재분석...")
             
-            # 강화된 기술적 분석 (재시도 로직)
-            current_analysis = None
-            for attempt in range(3):  # 최대 3회 재시도
-                try:
-                    current_analysis = self.technical_analyzer.analyze(ticker)
-                    if current_analysis:
-                        break
-                    print(f"⚠️ {ticker} 데이터 없음 (시도 {attempt+1}/3)")
-                except Exception as e:
-                    print(f"⚠️ {ticker} 분석 오류 (시도 {attempt+1}/3): {str(e)}")
-                    import time
-                    time.sleep(2)
+            current_analysis = current_analyses.get(ticker)
+            if not current_analysis:
+                print(f"⚠️ {ticker} 데이터 없음")
             
             # 분석 실패 시 폴백 처리
             if not current_analysis:
@@ -571,7 +675,8 @@ class AlphaSeeker:
                 # 긴급 알림 전송
                 self.telegram_bot.send_message(emergency_msg, emergency=True)
             
-            # 4. 리스크 메트릭 계산
+            # 4. 리스크 메트릭 계산 (포트폴리오 위험 포함)
+            evening_result['portfolio_risk'] = self.calculate_portfolio_risk(evening_result)
             risk_metrics = self.calculate_risk_metrics(evening_result)
             evening_result['risk_metrics'] = risk_metrics
             
@@ -595,7 +700,9 @@ class AlphaSeeker:
                 
                 self.realtime_monitor = RealtimeRiskMonitor(
                     self.telegram_bot, 
-                    maintained  # 유지된 종목들만 모니터링
+                    maintained,  # 유지된 종목들만 모니터링
+                    history_store=self.technical_analyzer.history_store,
+                    portfolio_weights=self.calculate_portfolio_weights(evening_result)
                 )
                 
                 monitor_started = self.realtime_monitor.start_monitoring()
@@ -614,6 +721,7 @@ class AlphaSeeker:
 • 거래량 3배 급증 / 50% 급감
 • VIX 30 이상 급등
 • 주요 지지선/저항선 이탈
+• 포트폴리오 당일 손실 VaR95 초과
 
 ⚡ 24시간 자동 모니터링 시작
 🔄 알림 중복 방지: 30분 간격
@@ -685,6 +793,15 @@ class AlphaSeeker:
         else:
             print("⚠️ 중지할 실시간 모니터링이 없습니다.")
     
+    def shutdown(self):
+        """종료 정리 (메타데이터 캐시 저장, 모니터링 중지, 텔레그램 발신 큐/후속 알림 정리)"""
+        self.ticker_manager.metadata_cache.flush()
+        if self.realtime_monitor:
+            self.stop_realtime_monitoring()  # 발신 큐 대기 + 봇 정리 포함
+        else:
+            self.telegram_bot.flush(timeout=30)
+        self.telegram_bot.close()
+    
     def run(self, analysis_type):
         """메인 실행 메서드"""
         print(f"🎯 Alpha Seeker Enhanced Final 분석 시작: {analysis_type}")
@@ -0,0 +1,448 @@
+import os
+import logging
+
+import pandas as pd
+import numpy as np
+
+from .indicator_engine import CrossSectionalIndicatorEngine
+from .position_estimator import AdvancedPositionEstimator
+
+
+class VectorizedBacktester:
+    """TechnicalAnalyzer 점수 모델 과거 성과 검증 (날짜×종목 패널 일괄 계산, 로컬 데이터만 사용)
+
+    흐름 (신호일 t 종가 기준 분석 → t+1 시가 진입):
+      1. 오전 분석: 유효 지표 + 점수 min_score 이상 종목 중 점수 상위 max_picks개
+      2. 저녁 재검토: t+1 시가를 현재가로 다시 계산한 지표로 갭/점수/데드크로스/RSI/신뢰도/포지션 예상
+         매도 의견 기준 제외 (AlphaSeeker.recheck_morning_picks와 동일 기준, 거래량은 신호일 값 사용)
+      3. 청산: AdvancedPositionEstimator 손절/익절가, 긴급 매도 신호(종가), 최대 보유일 경과(종가)
+    """
+
+    FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    def __init__(self, indicator_engine=None, position_estimator=None, min_score=7.0, max_picks=8,
+                 max_holding_days=10, max_gap_pct=8.0, recheck_min_score=4.0, recheck_min_rsi=15.0,
+                 recheck_min_confidence=0.3, drop_on_dead_cross=True, score_weights=None, score_thresholds=None,
+                 warmup=30, cost_bps=0.0, exit_on_urgent_sell=True):
+        self.indicator_engine = indicator_engine or CrossSectionalIndicatorEngine()
+        self.position_estimator = position_estimator or AdvancedPositionEstimator()
+        self.min_score = min_score
+        self.max_picks = max_picks
+        self.max_holding_days = max_holding_days
+
+        # 저녁 재검토 제외 기준 (기본값은 recheck_morning_picks와 동일)
+        self.max_gap_pct = max_gap_pct
+        self.recheck_min_score = recheck_min_score
+        self.recheck_min_rsi = recheck_min_rsi
+        self.recheck_min_confidence = recheck_min_confidence
+        self.drop_on_dead_cross = drop_on_dead_cross
+
+        # 점수 가중치/신호 기준 (None이면 CrossSectionalIndicatorEngine 기본값)
+        self.score_weights = score_weights
+        self.score_thresholds = score_thresholds
+
+        self.warmup = warmup                    # 지표 안정화 구간 (진입 제외)
+        self.cost_bps = cost_bps                # 편도 거래비용 (bp)
+        self.exit_on_urgent_sell = exit_on_urgent_sell
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def load_panel(cls, path, tickers=None, start=None, end=None):
+        """로컬 파일에서 일봉 패널 로드 → {필드: 날짜×종목 DataFrame}
+
+        .csv/.parquet: Date, Ticker, Open, High, Low, Close, Volume 컬럼의 long 형식
+        .db: OHLCVHistoryStore SQLite 파일 (저장된 1d 봉 전체)
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.db':
+            from .history_store import OHLCVHistoryStore
+            store = OHLCVHistoryStore(db_path=path)
+            frames = {ticker: store.read(ticker, interval="1d", period="max")
+                      for ticker in (tickers or store.tickers("1d"))}
+            return cls.panel_from_frames(frames, start=start, end=end)
+
+        if ext == '.parquet':
+            data = pd.read_parquet(path)
+        else:
+            data = pd.read_csv(path)
+
+        aliases = {'date': 'Date', 'datetime': 'Date', 'timestamp': 'Date', 'ticker': 'Ticker', 'symbol': 'Ticker'}
+        aliases.update({field.lower(): field for field in cls.FIELDS})
+        data = data.rename(columns={column: aliases.get(str(column).lower(), column) for column in data.columns})
+
+        missing = [column for column in ['Date', 'Ticker'] + cls.FIELDS if column not in data.columns]
+        if missing:
+            raise ValueError(f"패널 파일 필수 컬럼 누락: {missing}")
+
+        if tickers:
+            data = data[data['Ticker'].isin(tickers)]
+        data['Date'] = cls._normalize_dates(pd.to_datetime(data['Date']))
+
+        panel = {field: data.pivot_table(index='Date', columns='Ticker', values=field, aggfunc='last').sort_index()
+                 for field in cls.FIELDS}
+        return cls._slice_dates(panel, start, end)
+
+    @classmethod
+    def panel_from_frames(cls, frames, start=None, end=None):
+        """종목별 OHLCV 프레임 → {필드: 날짜×종목 DataFrame}"""
+        frames = {ticker: frame for ticker, frame in frames.items() if frame is not None and not frame.empty}
+        if not frames:
+            raise ValueError("패널을 구성할 데이터 없음")
+
+        panel = {}
+        for field in cls.FIELDS:
+            data = CrossSectionalIndicatorEngine.build_panel(frames, field)
+            data.index = cls._normalize_dates(data.index)
+            panel[field] = data.groupby(level=0).last()
+        return cls._slice_dates(panel, start, end)
+
+    @staticmethod
+    def _normalize_dates(dates):
+        """일봉 날짜 정규화 (시간대 제거 후 자정 기준)"""
+        index = pd.DatetimeIndex(dates)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        index = index.normalize()
+        return pd.Series(index, index=dates.index) if isinstance(dates, pd.Series) else index
+
+    @staticmethod
+    def _slice_dates(panel, start, end):
+        close = panel['Close']
+        mask = np.ones(len(close), dtype=bool)
+        if start is not None:
+            mask &= close.index >= pd.Timestamp(start)
+        if end is not None:
+            mask &= close.index <= pd.Timestamp(end)
+        columns = close.columns
+        return {field: frame.loc[mask].reindex(columns=columns) for field, frame in panel.items()}
+
+    def compute_indicators(self, panel):
+        """전 기간 지표 일괄 계산 (날짜×종목 배열, 지표 기간이 같으면 재사용 가능)"""
+        ind = self.indicator_engine.compute(panel['Close'], panel['Volume'])
+        return {key: frame.to_numpy(dtype=float) for key, frame in ind.items()}
+
+    def compute_signals(self, panel, indicators=None):
+        """전 기간 점수/긴급 신호 일괄 계산 (값은 날짜×종목 배열)"""
+        arrays = indicators if indicators is not None else self.compute_indicators(panel)
+
+        score, signal_masks, valid = self.indicator_engine.score(arrays, self.score_weights, self.score_thresholds)
+        buy_masks, sell_masks, level = self.indicator_engine.urgent_signals(arrays)
+
+        score = np.minimum(np.round(score, 1), 10)
+        price = arrays['close']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volatility = np.where(price > 0, (arrays['bb_upper'] - arrays['bb_lower']) / price, 0.0)
+
+        urgent_buy_count = sum(mask.astype(int) for _, mask in buy_masks)
+        urgent_sell_count = sum(mask.astype(int) for _, mask in sell_masks)
+
+        return {
+            **arrays,
+            'score': score,
+            'confidence': np.minimum(score / 10.0, 1.0),
+            'valid': valid & ~np.isnan(price),
+            'dead_cross': dict(signal_masks)["EMA 데드크로스"],
+            'volatility': volatility,
+            'urgent_level': level,
+            'urgent_buy_count': urgent_buy_count,
+            'urgent_sell_count': urgent_sell_count,
+            'urgent_sell': urgent_sell_count > 0,
+        }
+
+    def gap_open_indicators(self, panel, arrays):
+        """각 날짜 종가 대신 시가를 현재가로 둔 지표 (전일까지 종가 + 당일 시가, 저녁 재검토 시점 분석)
+
+        전 기간 지표에서 마지막 값만 바꾼 효과를 닫힌 식으로 반영 (EMA/MACD: 현재 관측 가중치,
+        RSI/볼린저: 이동 구간 합), 거래량 관련 지표는 시가 시점에 알 수 없어 전일 값 사용
+        """
+        engine = self.indicator_engine
+        close = arrays['close']
+        opens = panel['Open'].to_numpy(dtype=float)
+        valid = ~np.isnan(close)
+
+        prev_close = np.full(close.shape, np.nan)
+        prev_close[1:] = close[:-1]
+        diff = opens - close
+
+        def current_weight(span):
+            # adjust=True EWM에서 당일 관측 가중치 = 1 / Σ(과거 유효 관측 가중치)
+            total = pd.DataFrame(valid.astype(float)).ewm(span=span).sum().to_numpy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(total > 0, 1 / total, np.nan)
+
+        ema_fast = arrays['ema_12'] + diff * current_weight(engine.ema_fast)
+        ema_slow = arrays['ema_26'] + diff * current_weight(engine.ema_slow)
+
+        # MACD 신호선도 당일 MACD 값만 바뀜
+        line = arrays['ema_12'] - arrays['ema_26']
+        signal_line = line - arrays['macd_histogram']
+        new_line = ema_fast - ema_slow
+        new_signal = signal_line + (new_line - line) * current_weight(engine.macd_signal)
+
+        # RSI (단순 이동평균): 당일 상승/하락폭만 교체 (IndicatorFrame.rsi와 같은 상승/하락폭 정의)
+        period = engine.rsi_period
+        delta = close - prev_close
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        gain[~valid] = np.nan
+        loss[~valid] = np.nan
+        avg_gain = pd.DataFrame(gain).rolling(window=period).mean().to_numpy()
+        avg_loss = pd.DataFrame(loss).rolling(window=period).mean().to_numpy()
+        open_delta = opens - prev_close
+        new_gain = avg_gain + (np.where(open_delta > 0, open_delta, 0.0) - gain) / period
+        new_loss = avg_loss + (np.where(open_delta < 0, -open_delta, 0.0) - loss) / period
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = new_gain / np.where(new_loss == 0, np.nan, new_loss)
+            rsi = np.where(np.isnan(rs), 50.0, 100 - 100 / (1 + rs))
+
+        # 볼린저: 이동 구간 합/제곱합에서 당일 값 교체
+        n = engine.bb_period
+        middle = arrays['bb_middle']
+        std = pd.DataFrame(close).rolling(n).std().to_numpy()
+        square_sum = (n - 1) * std ** 2 + n * middle ** 2 - close ** 2 + opens ** 2
+        new_middle = middle + diff / n
+        new_std = np.sqrt(np.clip((square_sum - n * new_middle ** 2) / (n - 1), 0, None))
+        new_upper = np.where(new_std != 0, new_middle + new_std * engine.bb_std, opens * 1.02)
+        new_lower = np.where(new_std != 0, new_middle - new_std * engine.bb_std, opens * 0.98)
+
+        def shifted(values, periods):
+            result = np.full(values.shape, np.nan)
+            result[periods:] = values[:-periods]
+            return result
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {
+                'close': opens,
+                'ema_12': ema_fast,
+                'ema_26': ema_slow,
+                'rsi': rsi,
+                'bb_middle': new_middle,
+                'bb_upper': new_upper,
+                'bb_lower': new_lower,
+                'macd_histogram': new_line - new_signal,
+                'volume': shifted(arrays['volume'], 1),
+                'volume_avg': shifted(arrays['volume_avg'], 1),
+                'volume_ratio': shifted(arrays['volume_ratio'], 1),
+                'price_change_1d': (opens / prev_close - 1) * 100,
+                'price_change_5d': (opens / shifted(close, 5) - 1) * 100,
+            }
+
+    def recheck_signals(self, panel, signals):
+        """저녁 재검토 분석 (t+1 시가 기준 지표) → 신호일 t 행에 정렬된 점수/신호 배열"""
+        recheck = self.compute_signals(panel, self.gap_open_indicators(panel, signals))
+
+        aligned = {}
+        for key, values in recheck.items():
+            values = np.asarray(values)
+            shifted = np.zeros_like(values) if values.dtype == bool else np.full(values.shape, np.nan)
+            shifted[:-1] = values[1:]
+            aligned[key] = shifted
+        return aligned
+
+    @staticmethod
+    def position_candidates(signals, rows, cols):
+        """포지션 예상 입력 테이블 (TechnicalAnalyzer 결과 컬럼)"""
+        return pd.DataFrame({
+            key: signals[source][rows, cols] for key, source in [
+                ('current_price', 'close'), ('score', 'score'), ('confidence', 'confidence'), ('rsi', 'rsi'),
+                ('macd_signal', 'macd_histogram'), ('volume_ratio', 'volume_ratio'), ('volatility', 'volatility'),
+                ('bb_upper', 'bb_upper'), ('bb_lower', 'bb_lower'), ('urgent_level', 'urgent_level'),
+                ('urgent_buy_count', 'urgent_buy_count'), ('urgent_sell_count', 'urgent_sell_count'),
+            ]
+        })
+
+    def select_entries(self, panel, signals):
+        """진입 신호일 마스크 (오전 선정 → 다음 날 시가 기준 저녁 재검토)"""
+        score = signals['score']
+        n_dates = score.shape[0]
+
+        # 1. 오전 선정: 점수 상위 max_picks개
+        eligible = signals['valid'] & (score >= self.min_score)
+        eligible[:self.warmup] = False
+        ranked = np.where(eligible, score, -np.inf)
+        order = np.argsort(-ranked, axis=1, kind='stable')
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(order.shape[1])[None, :].repeat(n_dates, axis=0), axis=1)
+        picks = eligible & (rank < self.max_picks)
+
+        # 2. 저녁 재검토: 다음 날 시가를 현재가로 다시 분석 (갭/점수/신호는 재분석 결과 기준)
+        recheck = self.recheck_signals(panel, signals)
+        next_open = recheck['close']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gap_pct = (next_open / signals['close'] - 1) * 100
+
+        with np.errstate(invalid='ignore'):
+            removed = (
+                (np.abs(gap_pct) > self.max_gap_pct)
+                | (recheck['score'] < self.recheck_min_score)
+                | (recheck['dead_cross'] & self.drop_on_dead_cross)
+                | (recheck['rsi'] < self.recheck_min_rsi)
+                | (recheck['confidence'] < self.recheck_min_confidence)
+                | np.isnan(next_open)
+            )
+
+        # 포지션 예상 매도 의견 제외 (재검토 통과 후보만 계산)
+        rows, cols = np.nonzero(picks & ~removed)
+        if len(rows):
+            positions = self.position_estimator.estimate_positions(self.position_candidates(recheck, rows, cols))
+            sell = positions['position_recommendation'].isin(['SELL', 'STRONG_SELL']).to_numpy()
+            removed[rows[sell], cols[sell]] = True
+
+        return picks & ~removed, picks, gap_pct
+
+    def simulate(self, panel, entries, signals):
+        """진입 신호별 청산 시뮬레이션 (보유 기간 전체를 거래×보유일 배열로 일괄 판정)"""
+        opens = panel['Open'].to_numpy(dtype=float)
+        highs = panel['High'].to_numpy(dtype=float)
+        lows = panel['Low'].to_numpy(dtype=float)
+        closes = panel['Close'].ffill().to_numpy(dtype=float)
+        n_dates = opens.shape[0]
+
+        signal_idx, cols = np.nonzero(entries)
+        entry_idx = signal_idx + 1
+
+        # 포지션 크기/손익 목표는 신호일 분석 결과 기준 (오전 리포트와 동일)
+        positions = self.position_estimator.estimate_positions(self.position_candidates(signals, signal_idx, cols))
+        stop = positions['stop_loss'].to_numpy(dtype=float)[:, None]
+        take = positions['take_profit'].to_numpy(dtype=float)[:, None]
+
+        offsets = np.arange(self.max_holding_days)
+        day_idx = entry_idx[:, None] + offsets[None, :]
+        in_range = day_idx < n_dates
+        day_idx = np.minimum(day_idx, n_dates - 1)
+        col_idx = cols[:, None]
+
+        day_open = opens[day_idx, col_idx]
+        day_high = highs[day_idx, col_idx]
+        day_low = lows[day_idx, col_idx]
+        day_close = closes[day_idx, col_idx]
+        entry_price = day_open[:, 0]
+
+        stop_hit = in_range & (day_low <= stop)
+        take_hit = in_range & (day_high >= take) & ~stop_hit  # 같은 날 모두 닿으면 손절 우선 (보수적)
+        urgent_hit = in_range & signals['urgent_sell'][day_idx, col_idx] & ~stop_hit & ~take_hit
+        if not self.exit_on_urgent_sell:
+            urgent_hit[:] = False
+
+        event = stop_hit | take_hit | urgent_hit
+        has_event = event.any(axis=1)
+        last_day = in_range.sum(axis=1) - 1
+        exit_k = np.where(has_event, event.argmax(axis=1), last_day)
+
+        rows = np.arange(len(entry_idx))
+        exit_open = day_open[rows, exit_k]
+        exit_price = np.select(
+            [stop_hit[rows, exit_k], take_hit[rows, exit_k]],
+            [np.fmin(exit_open, stop[:, 0]), np.fmax(exit_open, take[:, 0])],  # 갭으로 넘긴 경우 시가 체결
+            default=day_close[rows, exit_k]
+        )
+        reason = np.select(
+            [stop_hit[rows, exit_k], take_hit[rows, exit_k], urgent_hit[rows, exit_k]],
+            ['stop_loss', 'take_profit', 'urgent_sell'],
+            default='time_exit'
+        )
+
+        cost = self.cost_bps / 10000
+        gross_return = exit_price / entry_price - 1
+        trades = pd.DataFrame({
+            'ticker': np.asarray(panel['Close'].columns)[cols],
+            'signal_date': panel['Close'].index[signal_idx],
+            'entry_date': panel['Close'].index[np.minimum(entry_idx, n_dates - 1)],
+            'exit_date': panel['Close'].index[day_idx[rows, exit_k]],
+            'score': signals['score'][signal_idx, cols],
+            'recommendation': positions['position_recommendation'].to_numpy(),
+            'position_pct': positions['percentage'].to_numpy(),
+            'entry_price': entry_price,
+            'stop_loss': stop[:, 0],
+            'take_profit': take[:, 0],
+            'exit_price': exit_price,
+            'exit_reason': reason,
+            'holding_days': exit_k + 1,
+            'return_pct': (gross_return - 2 * cost) * 100,
+        })
+
+        # 보유일별 수익률 (포트폴리오 합산용): 첫날은 진입가 대비, 청산일은 청산가 기준
+        held = in_range & (offsets[None, :] <= exit_k[:, None])
+        mark = np.where(offsets[None, :] == exit_k[:, None], exit_price[:, None], day_close)
+        prev = np.concatenate([entry_price[:, None], day_close[:, :-1]], axis=1)
+        daily = mark / prev - 1
+        daily[:, 0] -= cost
+        daily[rows, exit_k] -= cost
+
+        usable = ~np.isnan(entry_price) & ~np.isnan(exit_price)
+        held &= usable[:, None]
+        daily_returns = {
+            'day_idx': day_idx[held],
+            'returns': np.nan_to_num(daily[held]),
+            'entry_idx': entry_idx[usable],
+            'exit_idx': day_idx[rows, exit_k][usable],
+        }
+        return trades[usable].reset_index(drop=True), daily_returns
+
+    def portfolio(self, dates, daily_returns):
+        """동일 비중 포트폴리오 일별 수익률/보유 종목 수/회전율"""
+        n_dates = len(dates)
+        total = np.bincount(daily_returns['day_idx'], weights=daily_returns['returns'], minlength=n_dates)
+        positions = np.bincount(daily_returns['day_idx'], minlength=n_dates)
+        entries = np.bincount(daily_returns['entry_idx'], minlength=n_dates)
+        exits = np.bincount(daily_returns['exit_idx'], minlength=n_dates)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.where(positions > 0, total / positions, 0.0)
+            # 일별 회전율: 교체된 비중 합 / 2 (동일 비중 가정)
+            turnover = np.where(positions > 0, (entries + exits) / positions / 2, 0.0)
+
+        return pd.DataFrame({
+            'return': returns,
+            'positions': positions,
+            'turnover': turnover,
+            'equity': np.cumprod(1 + returns),
+        }, index=dates)
+
+    def summarize(self, trades, daily):
+        """적중률/수익률/낙폭/회전율 요약"""
+        if trades.empty:
+            return {'trades': 0}
+
+        equity = daily['equity']
+        drawdown = equity / equity.cummax() - 1
+        active = daily['positions'] > 0
+        years = max(len(daily) / 252, 1 / 252)
+        std = daily['return'].std()
+
+        return {
+            'trades': int(len(trades)),
+            'hit_rate': round(float((trades['exit_reason'] == 'take_profit').mean()) * 100, 1),
+            'win_rate': round(float((trades['return_pct'] > 0).mean()) * 100, 1),
+            'avg_return_pct': round(float(trades['return_pct'].mean()), 2),
+            'median_return_pct': round(float(trades['return_pct'].median()), 2),
+            'sized_avg_return_pct': round(float(np.average(trades['return_pct'], weights=trades['position_pct'])), 2)
+                                    if trades['position_pct'].sum() > 0 else 0.0,
+            'avg_position_pct': round(float(trades['position_pct'].mean()), 2),
+            'avg_holding_days': round(float(trades['holding_days'].mean()), 1),
+            'exit_reasons': trades['exit_reason'].value_counts().to_dict(),
+            'total_return_pct': round(float(equity.iloc[-1] - 1) * 100, 2),
+            'annual_return_pct': round(float(equity.iloc[-1] ** (1 / years) - 1) * 100, 2),
+            'max_drawdown_pct': round(float(drawdown.min()) * 100, 2),
+            'sharpe': round(float(daily['return'].mean() / std * np.sqrt(252)), 2) if std > 0 else 0.0,
+            'exposure_pct': round(float(active.mean()) * 100, 1),
+            'avg_daily_turnover_pct': round(float(daily.loc[active, 'turnover'].mean()) * 100, 1) if active.any() else 0.0,
+            'annual_turnover': round(float(daily['turnover'].sum() / years), 1),
+        }
+
+    def run(self, panel, indicators=None):
+        """백테스트 실행 → {'summary', 'trades', 'daily'}"""
+        signals = self.compute_signals(panel, indicators)
+        entries, picks, _ = self.select_entries(panel, signals)
+        trades, daily_returns = self.simulate(panel, entries, signals)
+        daily = self.portfolio(panel['Close'].index, daily_returns)
+        summary = self.summarize(trades, daily)
+        summary['morning_picks'] = int(picks.sum())
+        summary['evening_removed'] = int(picks.sum() - entries.sum())
+
+        self.logger.debug(f"백테스트 완료: 거래 {summary.get('trades', 0)}건, "
+                         f"적중률 {summary.get('hit_rate', 0)}%, 최대낙폭 {summary.get('max_drawdown_pct', 0)}%")
+        return {'summary': summary, 'trades': trades, 'daily': daily}
+
+
+print("✅ VectorizedBacktester (패널 벡터화 백테스트 엔진)")
@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import threading
+import logging
+from datetime import datetime
+
+
+class ContentAddressedBackupStore:
+    """내용 주소 기반 백업 저장소 (고정 크기 청크 압축 저장 + 매니페스트 색인, 변경분만 저장)
+
+    backups/
+      manifest.json          스냅샷 목록 + 청크 색인 (보관/정리는 매니페스트만 참조)
+      objects/ab/abcdef...   zlib 압축 청크 (원본 청크 SHA-256)
+    """
+
+    MANIFEST_VERSION = 1
+
+    def __init__(self, root="backups", chunk_size=256 * 1024, compress_level=6):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.compress_level = compress_level
+        self.objects_dir = os.path.join(root, "objects")
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            manifest.setdefault('snapshots', [])
+            manifest.setdefault('chunks', {})
+            return manifest
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.error(f"백업 매니페스트 로드 실패 - 새로 생성: {e}")
+        return {'version': self.MANIFEST_VERSION, 'snapshots': [], 'chunks': {}}
+
+    def _save_manifest(self, manifest):
+        """매니페스트 원자적 기록 (중단 시 이전 매니페스트 유지)"""
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _store_chunk(self, manifest, chunk):
+        """청크 저장 (이미 있으면 생략) → 청크 해시"""
+        digest = hashlib.sha256(chunk).hexdigest()
+        if digest in manifest['chunks']:
+            return digest, 0
+
+        path = self._object_path(digest)
+        data = zlib.compress(chunk, self.compress_level)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        manifest['chunks'][digest] = len(data)
+        return digest, len(data)
+
+    @staticmethod
+    def _latest_entries(manifest):
+        """파일별 가장 최근 백업 항목"""
+        latest = {}
+        for snapshot in manifest['snapshots']:
+            latest.update(snapshot['files'])
+        return latest
+
+    def snapshot(self, files):
+        """파일 목록 백업 (files: {백업 이름: 파일 경로})
+
+        이전 백업과 내용이 같은 파일은 청크를 다시 쓰지 않고, 모든 파일이 그대로면 스냅샷도 추가하지 않음
+        → (스냅샷 ID 또는 None, 새로 저장한 바이트 수)
+        """
+        with self._lock:
+            manifest = self._load_manifest()
+            previous = self._latest_entries(manifest)
+
+            entries = {}
+            written = 0
+            touched = False
+            for name, file_path in files.items():
+                try:
+                    if not os.path.exists(file_path):
+                        continue
+
+                    stat = os.stat(file_path)
+                    last = previous.get(name)
+                    # 크기/수정 시각이 같으면 읽지 않고 이전 항목 재사용
+                    if last and last['size'] == stat.st_size and last['mtime'] == stat.st_mtime:
+                        entries[name] = last
+                        continue
+
+                    file_hash = hashlib.sha256()
+                    chunks = []
+                    with open(file_path, 'rb') as f:
+                        while True:
+                            chunk = f.read(self.chunk_size)
+                            if not chunk:
+                                break
+                            file_hash.update(chunk)
+                            digest, stored = self._store_chunk(manifest, chunk)
+                            chunks.append(digest)
+                            written += stored
+
+                    if last and last['sha256'] == file_hash.hexdigest():
+                        # 내용은 같고 수정 시각만 바뀐 경우 → 다음 실행부터 읽기 생략
+                        last['mtime'] = stat.st_mtime
+                        touched = True
+                        entries[name] = last
+                        continue
+
+                    entries[name] = {
+                        'path': file_path,
+                        'size': stat.st_size,
+                        'mtime': stat.st_mtime,
+                        'sha256': file_hash.hexdigest(),
+                        'chunks': chunks,
+                    }
+                except Exception as e:
+                    self.logger.error(f"개별 백업 실패 {file_path}: {e}")
+
+            unchanged = all(previous.get(name) is entry for name, entry in entries.items())
+            if not entries or unchanged:
+                if touched:
+                    self._save_manifest(manifest)
+                return None, written
+
+            snapshot_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            manifest['snapshots'].append({
+                'id': snapshot_id,
+                'created_at': time.time(),
+                'files': entries,
+            })
+            self._save_manifest(manifest)
+            return snapshot_id, written
+
+    def list_snapshots(self):
+        """스냅샷 목록 (ID, 생성 시각, 파일 이름)"""
+        with self._lock:
+            manifest = self._load_manifest()
+        return [
+            {'id': snapshot['id'], 'created_at': snapshot['created_at'], 'files': sorted(snapshot['files'])}
+            for snapshot in manifest['snapshots']
+        ]
+
+    def restore(self, name, dest_path=None, snapshot_id=None):
+        """백업 파일 복원 (snapshot_id 생략 시 최신 백업, 복원 경로 반환)"""
+        with self._lock:
+            manifest = self._load_manifest()
+
+        entry = None
+        for snapshot in reversed(manifest['snapshots']):
+            if snapshot_id and snapshot['id'] != snapshot_id:
+                continue
+            entry = snapshot['files'].get(name)
+            if entry is not None or snapshot_id:
+                break
+        if entry is None:
+            raise KeyError(f"백업 없음: {name} ({snapshot_id or 'latest'})")
+
+        dest_path = dest_path or entry['path']
+        os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+        file_hash = hashlib.sha256()
+        tmp_path = f"{dest_path}.restore"
+        with open(tmp_path, 'wb') as f:
+            for digest in entry['chunks']:
+                with open(self._object_path(digest), 'rb') as chunk_file:
+                    chunk = zlib.decompress(chunk_file.read())
+                file_hash.update(chunk)
+                f.write(chunk)
+
+        if file_hash.hexdigest() != entry['sha256']:
+            os.remove(tmp_path)
+            raise ValueError(f"백업 무결성 검증 실패: {name}")
+        os.replace(tmp_path, dest_path)
+        return dest_path
+
+    def prune(self, days=30, keep_min=1):
+        """보관 기간이 지난 스냅샷 제거 후 참조되지 않는 청크 삭제 (디렉터리 탐색 없이 매니페스트 기준)
+
+        → (삭제 스냅샷 수, 삭제 청크 수)
+        """
+        with self._lock:
+            manifest = self._load_manifest()
+            snapshots = manifest['snapshots']
+            cutoff = time.time() - days * 24 * 60 * 60
+
+            expired = [snapshot for snapshot in snapshots[:max(0, len(snapshots) - keep_min)]
+                       if snapshot['created_at'] < cutoff]
+            if not expired:
+                return 0, 0
+
+            expired_ids = {snapshot['id'] for snapshot in expired}
+            manifest['snapshots'] = [snapshot for snapshot in snapshots if snapshot['id'] not in expired_ids]
+
+            referenced = set()
+            for snapshot in manifest['snapshots']:
+                for entry in snapshot['files'].values():
+                    referenced.update(entry['chunks'])
+
+            orphaned = [digest for digest in manifest['chunks'] if digest not in referenced]
+            for digest in orphaned:
+                del manifest['chunks'][digest]
+
+            # 매니페스트를 먼저 기록해야 중단되어도 삭제된 청크를 참조하지 않음
+            self._save_manifest(manifest)
+            for digest in orphaned:
+                try:
+                    os.remove(self._object_path(digest))
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    self.logger.error(f"백업 청크 삭제 실패 {digest}: {e}")
+
+            return len(expired), len(orphaned)
+
+    def stats(self):
+        """스냅샷 수, 청크 수, 저장 바이트 수"""
+        with self._lock:
+            manifest = self._load_manifest()
+        return {
+            'snapshots': len(manifest['snapshots']),
+            'chunks': len(manifest['chunks']),
+            'stored_bytes': sum(manifest['chunks'].values()),
+        }
+
+
+print("✅ ContentAddressedBackupStore (내용 주소 기반 압축/중복 제거 백업)")
@@ -1,30 +1,93 @@
 import json
 import os
-import shutil
+import glob
 import logging
-from datetime import datetime
+import tempfile
+
+# 선택적 바이너리 직렬화 (없으면 압축 JSON)
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+from .analysis_store import AnalysisHistoryStore, json_default
+from .backup_store import ContentAddressedBackupStore
 
 
 class DataManager:
+    SCHEMA_VERSION = 1
+    
     def __init__(self):
         self.data_dir = "data"
         self.backup_dir = "backups"
-        self.morning_file = f"{self.data_dir}/morning_picks.json"
-        self.evening_file = f"{self.data_dir}/evening_results.json"
+        self.log_dir = "logs"  # main.py 일별 로그 (alpha_seeker_YYYYMMDD.log)
+        self.file_format = "msgpack" if MSGPACK_AVAILABLE else "json"
+        self.morning_file = f"{self.data_dir}/morning_picks.{self.file_format}"
+        self.evening_file = f"{self.data_dir}/evening_results.{self.file_format}"
+        # 이전 버전 파일 (들여쓰기 JSON, 버전 정보 없음) - 읽기 호환용
+        self.legacy_morning_file = f"{self.data_dir}/morning_picks.json"
+        self.legacy_evening_file = f"{self.data_dir}/evening_results.json"
         self.logger = logging.getLogger(__name__)
         
         # 디렉터리 생성
         os.makedirs(self.data_dir, exist_ok=True)
         os.makedirs(self.backup_dir, exist_ok=True)
+        
+        # 실행 이력 저장소 (오전/저녁 파일은 최신 실행의 파생 뷰)
+        self.history = AnalysisHistoryStore(f"{self.data_dir}/analysis_history.db")
+        
+        # 내용 주소 기반 백업 (변경분만 압축 저장)
+        self.backup_store = ContentAddressedBackupStore(self.backup_dir)
+    
+    def _encode(self, data):
+        """스키마 버전 포함 직렬화 (msgpack 또는 공백 없는 JSON)"""
+        envelope = {'schema_version': self.SCHEMA_VERSION, 'data': data}
+        if self.file_format == "msgpack":
+            return msgpack.packb(envelope, use_bin_type=True, default=json_default)
+        return json.dumps(envelope, ensure_ascii=False, separators=(',', ':'), default=json_default).encode('utf-8')
+    
+    @staticmethod
+    def _decode(raw):
+        """파일 내용 역직렬화 (msgpack/JSON 자동 판별, 버전 정보 없는 이전 JSON 호환)"""
+        is_msgpack_map = raw[:1] != b'' and (0x80 <= raw[0] <= 0x8f or raw[0] in (0xde, 0xdf))
+        if not is_msgpack_map:
+            payload = json.loads(raw)
+        elif MSGPACK_AVAILABLE:
+            payload = msgpack.unpackb(raw, raw=False)
+        else:
+            raise ValueError("msgpack 형식 파일이지만 msgpack 모듈이 설치되지 않음")
+        
+        if isinstance(payload, dict) and 'schema_version' in payload and 'data' in payload:
+            return payload['data']
+        return payload
+    
+    def _read_file(self, file_path):
+        with open(file_path, 'rb') as f:
+            return self._decode(f.read())
+    
+    def _write_view(self, file_path, data):
+        """최신 실행 뷰 원자적 기록 (임시 파일 작성 후 교체 → 중단되어도 이전 파일 유지)"""
+        directory = os.path.dirname(file_path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=os.path.basename(file_path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._encode(data))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
     
     def save_morning_data(self, data):
-        """오전 데이터 저장 + 백업"""
+        """오전 데이터 저장 (이력 누적 + 뷰 파일 갱신)"""
         try:
-            # 기존 파일 백업
-            self._backup_file(self.morning_file, "morning_picks")
-            
-            with open(self.morning_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.history.record_run('morning', data)
+            self._write_view(self.morning_file, data)
+            self._retire_legacy(self.legacy_morning_file, self.morning_file)
             
             self.logger.info(f"오전 데이터 저장 완료: {len(data.get('stock_analysis', {}))}개 종목")
             
@@ -33,13 +96,11 @@ class DataManager:
             raise
     
     def save_evening_data(self, data):
-        """저녁 데이터 저장 + 백업"""
+        """저녁 데이터 저장 (이력 누적 + 뷰 파일 갱신)"""
         try:
-            # 기존 파일 백업
-            self._backup_file(self.evening_file, "evening_results")
-            
-            with open(self.evening_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.history.record_run('evening', data)
+            self._write_view(self.evening_file, data)
+            self._retire_legacy(self.legacy_evening_file, self.evening_file)
             
             self.logger.info(f"저녁 데이터 저장 완료: 유지 {len(data.get('maintained', []))}개")
             
@@ -48,38 +109,89 @@ class DataManager:
             raise
     
     def load_morning_data(self):
-        """오전 데이터 로드"""
+        """오전 데이터 로드 (뷰 파일이 없거나 손상되면 이력 저장소 → 이전 형식 파일 순으로 복원)"""
+        return self._load_view(self.morning_file, self.legacy_morning_file, 'morning', "오전")
+    
+    def load_evening_data(self):
+        """저녁 데이터 로드 (뷰 파일이 없거나 손상되면 이력 저장소 → 이전 형식 파일 순으로 복원)"""
+        return self._load_view(self.evening_file, self.legacy_evening_file, 'evening', "저녁")
+    
+    def _retire_legacy(self, legacy_path, file_path):
+        """이전 형식 파일 이전 완료 후 보관용 이름으로 변경 (이후 로드 대상에서 제외)"""
+        if legacy_path == file_path or not os.path.exists(legacy_path):
+            return
         try:
-            if not os.path.exists(self.morning_file):
-                self.logger.warning("오전 데이터 파일 없음")
-                return None
-            
-            with open(self.morning_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            self.logger.info("오전 데이터 로드 완료")
-            return data
-            
+            os.replace(legacy_path, f"{legacy_path}.migrated")
+            self.logger.info(f"이전 형식 파일 보관 처리: {legacy_path}")
         except Exception as e:
-            self.logger.error(f"오전 데이터 로드 실패: {e}")
-            return None
+            self.logger.warning(f"이전 형식 파일 보관 실패 {legacy_path}: {e}")
     
-    def load_evening_data(self):
-        """저녁 데이터 로드"""
+    def _load_view(self, file_path, legacy_path, run_type, label):
         try:
-            if not os.path.exists(self.evening_file):
-                self.logger.warning("저녁 데이터 파일 없음")
-                return None
-            
-            with open(self.evening_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            self.logger.info("저녁 데이터 로드 완료")
-            return data
-            
+            if os.path.exists(file_path):
+                data = self._read_file(file_path)
+                self.logger.info(f"{label} 데이터 로드 완료")
+                return data
+            self.logger.warning(f"{label} 데이터 파일 없음 - 이력 저장소 확인")
         except Exception as e:
-            self.logger.error(f"저녁 데이터 로드 실패: {e}")
-            return None
+            self.logger.error(f"{label} 데이터 파일 로드 실패 - 이력 저장소 확인 {file_path}: {e}")
+        
+        # 이력 저장소 우선 (이전 형식 파일은 이력 저장소 도입 전 데이터만 있을 때 사용)
+        try:
+            data = self.history.latest_run(run_type)
+            if data is not None:
+                self._write_view(file_path, data)
+                self._retire_legacy(legacy_path, file_path)
+                self.logger.info(f"{label} 데이터 이력 저장소에서 복원 완료")
+                return data
+        except Exception as e:
+            self.logger.error(f"{label} 데이터 이력 저장소 복원 실패: {e}")
+        
+        try:
+            if legacy_path != file_path and os.path.exists(legacy_path):
+                data = self._read_file(legacy_path)
+                self.history.record_run(run_type, data)
+                self._write_view(file_path, data)
+                self._retire_legacy(legacy_path, file_path)
+                self.logger.info(f"{label} 데이터 이전 형식 파일에서 이전 완료")
+                return data
+        except Exception as e:
+            self.logger.error(f"{label} 데이터 이전 형식 파일 로드 실패 {legacy_path}: {e}")
+        return None
+    
+    def get_ticker_history(self, ticker, run_type=None, since=None, until=None):
+        """종목별 실행 결과 이력 (점수/신뢰도/가격/유지 여부)"""
+        return self.history.get_ticker_results(ticker=ticker, run_type=run_type, since=since, until=until)
+    
+    def get_pick_history(self, since=None, until=None, run_type='morning'):
+        """기간 내 전체 종목 결과 이력 (예: 최근 분기 오전 추천 종목 점수)"""
+        return self.history.get_ticker_results(run_type=run_type, since=since, until=until)
+    
+    def import_json_backups(self):
+        """기존 뷰 파일/JSON 백업 사본을 이력 저장소로 가져오기 (중복 실행은 무시)"""
+        sources = [
+            ('morning', [self.morning_file, self.legacy_morning_file]
+                        + glob.glob(f"{self.backup_dir}/morning_picks_*.json")),
+            ('evening', [self.evening_file, self.legacy_evening_file]
+                        + glob.glob(f"{self.backup_dir}/evening_results_*.json")),
+        ]
+        
+        imported = 0
+        for run_type, paths in sources:
+            for path in paths:
+                try:
+                    if not os.path.exists(path):
+                        continue
+                    data = self._read_file(path)
+                    if not data.get('timestamp'):
+                        continue
+                    self.history.record_run(run_type, data)
+                    imported += 1
+                except Exception as e:
+                    self.logger.warning(f"이력 가져오기 실패 {path}: {e}")
+        
+        self.logger.info(f"JSON 이력 가져오기 완료: {imported}개 파일")
+        return imported
     
     def get_data_status(self):
         """데이터 상태 확인"""
@@ -92,75 +204,53 @@ class DataManager:
                                 if os.path.exists(self.evening_file) else 0)
         }
     
-    def _backup_file(self, file_path, prefix):
-        """개별 파일 백업"""
-        try:
-            if os.path.exists(file_path):
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = os.path.basename(file_path)
-                backup_path = f"{self.backup_dir}/{prefix}_{timestamp}.json"
-                
-                shutil.copy2(file_path, backup_path)
-                self.logger.debug(f"파일 백업 완료: {backup_path}")
-                
-        except Exception as e:
-            self.logger.error(f"파일 백업 실패 {file_path}: {e}")
-    
     def backup_critical_data(self):
-        """중요 데이터 전체 백업"""
+        """중요 데이터 전체 백업 (변경된 파일/청크만 저장)"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # 백업할 파일 목록 (백업 이름 → 경로)
+            files_to_backup = {
+                "morning_picks": self.morning_file,
+                "evening_results": self.evening_file,
+                "analysis_history": self.history.db_path,
+            }
+            # 일별 시스템 로그 (변경 없는 지난 로그는 이전 백업 항목 재사용)
+            for log_path in sorted(glob.glob(os.path.join(self.log_dir, "*.log"))):
+                files_to_backup[f"system_log/{os.path.basename(log_path)}"] = log_path
             
-            # 백업할 파일 목록
-            files_to_backup = [
-                (self.morning_file, "morning_picks"),
-                (self.evening_file, "evening_results"),
-                ("alpha_seeker.log", "system_log"),
-                ("failed_messages.log", "failed_messages")
-            ]
+            snapshot_id, written = self.backup_store.snapshot(files_to_backup)
             
-            backup_count = 0
-            for file_path, prefix in files_to_backup:
-                if os.path.exists(file_path):
-                    try:
-                        backup_filename = (f"{prefix}_{timestamp}.json" if file_path.endswith('.json') 
-                                         else f"{prefix}_{timestamp}.log")
-                        backup_path = f"{self.backup_dir}/{backup_filename}"
-                        shutil.copy2(file_path, backup_path)
-                        backup_count += 1
-                        
-                    except Exception as e:
-                        self.logger.error(f"개별 백업 실패 {file_path}: {e}")
-            
-            # 오래된 백업 파일 정리 (30일 이상)
+            # 오래된 백업 정리 (30일 이상, 매니페스트 기준)
             self._cleanup_old_backups(days=30)
             
-            self.logger.info(f"전체 데이터 백업 완료: {backup_count}개 파일 ({timestamp})")
+            if snapshot_id:
+                self.logger.info(f"전체 데이터 백업 완료: 스냅샷 {snapshot_id} (신규 {written:,} bytes)")
+            else:
+                self.logger.info("전체 데이터 백업: 변경 없음")
             return True
             
         except Exception as e:
             self.logger.error(f"전체 백업 실패: {e}")
             return False
     
+    def restore_backup(self, name, snapshot_id=None):
+        """백업 복원 (name: morning_picks / evening_results / analysis_history / system_log/<로그 파일명>)"""
+        try:
+            path = self.backup_store.restore(name, snapshot_id=snapshot_id)
+            self.logger.info(f"백업 복원 완료: {name} → {path}")
+            return True
+        except Exception as e:
+            self.logger.error(f"백업 복원 실패 {name}: {e}")
+            return False
+    
     def _cleanup_old_backups(self, days=30):
-        """오래된 백업 파일 정리"""
+        """오래된 백업 스냅샷 및 미참조 청크 정리"""
         try:
-            import time
-            cutoff_time = time.time() - (days * 24 * 60 * 60)
-            
-            cleanup_count = 0
-            for filename in os.listdir(self.backup_dir):
-                file_path = os.path.join(self.backup_dir, filename)
-                
-                if os.path.isfile(file_path) and os.path.getmtime(file_path) < cutoff_time:
-                    os.remove(file_path)
-                    cleanup_count += 1
-            
-            if cleanup_count > 0:
-                self.logger.info(f"오래된 백업 파일 정리: {cleanup_count}개 파일 삭제")
+            removed_snapshots, removed_chunks = self.backup_store.prune(days=days)
+            if removed_snapshots > 0:
+                self.logger.info(f"오래된 백업 정리: 스냅샷 {removed_snapshots}개, 청크 {removed_chunks}개 삭제")
                 
         except Exception as e:
-            self.logger.error(f"백업 파일 정리 실패: {e}")
+            self.logger.error(f"백업 정리 실패: {e}")
 
 
-print("✅ DataManager Enhanced (자동 백업 + 파일 정리)")
+print("✅ DataManager Enhanced (SQLite 분석 이력 + 중복 제거 백업)")
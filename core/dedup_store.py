@@ -0,0 +1,107 @@
+import os
+import time
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class TTLDedupStore:
+    """중복 알림 억제 저장소 (TTL + 최대 크기 제한, 스레드 안전, 선택적 SQLite 영속화)"""
+
+    def __init__(self, ttl=1800, max_entries=10000, db_path=None, timeout=30):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+
+        self._entries = OrderedDict()  # 키 → 마지막 기록 시각 (오래된 순)
+        self._lock = threading.Lock()
+
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self._init_db()
+            self._load()
+
+    @contextmanager
+    def _connect(self):
+        """DB 연결 (커밋 후 종료)"""
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS dedup (key TEXT PRIMARY KEY, ts REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_ts ON dedup (ts)")
+
+    def _load(self):
+        """유효 기간 내 기록 복원 (재시작 후에도 억제 구간 유지)"""
+        try:
+            cutoff = time.time() - self.ttl
+            with self._connect() as conn:
+                conn.execute("DELETE FROM dedup WHERE ts <= ?", (cutoff,))
+                rows = conn.execute("SELECT key, ts FROM dedup ORDER BY ts").fetchall()
+            for key, ts in rows[-self.max_entries:]:
+                self._entries[key] = ts
+        except Exception as e:
+            self.logger.error(f"중복 알림 기록 로드 실패: {e}")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            ts = self._entries.get(key)
+            return ts is not None and time.time() - ts < self.ttl
+
+    def _evict(self, now):
+        """만료/초과 항목 제거 (가장 오래된 항목부터, 호출 측 잠금 보유)"""
+        while self._entries:
+            key, ts = next(iter(self._entries.items()))
+            if now - ts < self.ttl and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+
+    def check_and_set(self, key, now=None):
+        """억제 구간이 아니면 기록 후 True, 억제 구간이면 False (O(1))"""
+        now = time.time() if now is None else now
+        with self._lock:
+            ts = self._entries.get(key)
+            if ts is not None and now - ts < self.ttl:
+                return False
+
+            self._entries[key] = now
+            self._entries.move_to_end(key)
+            self._evict(now)
+
+            if self.db_path:
+                self._persist(key, now)
+            return True
+
+    def discard(self, key):
+        """기록 삭제 (전송 실패 시 다음 주기 재시도 허용)"""
+        with self._lock:
+            self._entries.pop(key, None)
+            if self.db_path:
+                try:
+                    with self._connect() as conn:
+                        conn.execute("DELETE FROM dedup WHERE key = ?", (key,))
+                except Exception as e:
+                    self.logger.error(f"중복 알림 기록 삭제 실패: {e}")
+
+    def _persist(self, key, now):
+        try:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO dedup (key, ts) VALUES (?, ?)", (key, now))
+                conn.execute("DELETE FROM dedup WHERE ts <= ?", (now - self.ttl,))
+        except Exception as e:
+            self.logger.error(f"중복 알림 기록 저장 실패: {e}")
+
+
+print("✅ TTLDedupStore (TTL/LRU 중복 알림 억제 저장소)")
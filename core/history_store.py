@@ -0,0 +1,344 @@
+import os
+import re
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import yfinance as yf
+
+
+class OHLCVHistoryStore:
+    """종목/봉 간격별 OHLCV 로컬 저장소 (SQLite + 증분 업데이트)"""
+
+    COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    def __init__(self, db_path="data/ohlcv_history.db", timeout=30):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """DB 연결 (커밋 후 종료)"""
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """테이블 생성"""
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bars (
+                    ticker TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    ts INTEGER NOT NULL,
+                    open REAL, high REAL, low REAL, close REAL, volume REAL,
+                    PRIMARY KEY (ticker, interval, ts)
+                ) WITHOUT ROWID
+            """)
+            # 마지막 저장 봉 및 보유 구간 기록
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    ticker TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    last_ts INTEGER NOT NULL,
+                    covered_from INTEGER NOT NULL,
+                    tz TEXT,
+                    last_sync TEXT,
+                    PRIMARY KEY (ticker, interval)
+                )
+            """)
+
+    def get_history(self, ticker, interval="1d", period="60d", full_refresh=False):
+        """단일 종목 히스토리 조회 (누락된 최신 구간만 다운로드)"""
+        return self.get_many([ticker], interval, period, full_refresh).get(ticker, pd.DataFrame(columns=self.COLUMNS))
+
+    def get_many(self, tickers, interval="1d", period="60d", full_refresh=False):
+        """여러 종목 히스토리 조회 (전체/증분 그룹별 일괄 다운로드, 갱신 실패 종목은 frame.attrs['stale'] 표시)"""
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+
+        now = datetime.now(timezone.utc)
+        period_start = self._period_start(period, now)
+        states = self._load_states(tickers, interval)
+
+        # 저장 구간이 요청 구간을 덮지 못하면 전체 다운로드, 아니면 마지막 봉부터 증분 다운로드
+        full_fetch = []
+        tail_fetch = []
+        for ticker in tickers:
+            state = states.get(ticker)
+            if full_refresh or state is None or period_start < state['covered_from']:
+                full_fetch.append(ticker)
+            else:
+                tail_fetch.append(ticker)
+
+        stale = set()
+        if full_fetch:
+            stored = self._fetch_and_store(full_fetch, interval, start=period_start, covered_from=period_start,
+                                           replace=full_refresh)
+            stale.update(set(full_fetch) - stored)
+
+        if tail_fetch:
+            stale.update(self._refresh_tail(tail_fetch, interval, states))
+
+        if stale:
+            self.logger.warning(f"히스토리 갱신 실패, 저장된 봉 사용 ({interval}): {sorted(stale)}")
+
+        frames = {ticker: self.read(ticker, interval, period) for ticker in tickers}
+        for ticker, frame in frames.items():
+            frame.attrs['stale'] = ticker in stale
+        return frames
+
+    @staticmethod
+    def is_stale(frame):
+        """get_many 조회 시 갱신에 실패해 저장된 봉만 담긴 프레임인지"""
+        return frame is not None and bool(frame.attrs.get('stale'))
+
+    def _refresh_tail(self, tickers, interval, states):
+        """증분 갱신 (겹치는 확정 봉이 달라지면 분할/배당 수정주가 변경으로 보고 전체 재다운로드) → 실패 종목"""
+        # 마지막 봉은 미완성일 수 있으므로 직전 확정 봉부터 다시 받아 비교 후 덮어씀
+        start_ts = min(states[ticker]['prev_ts'] or states[ticker]['last_ts'] for ticker in tickers)
+        start = datetime.fromtimestamp(start_ts, tz=timezone.utc)
+        fetched = self._download(tickers, interval, start)
+
+        stale = set()
+        readjusted = []
+        for ticker in tickers:
+            data = fetched.get(ticker)
+            if data is None:
+                stale.add(ticker)
+            elif self._adjustment_changed(ticker, interval, data, states[ticker]['last_ts']):
+                readjusted.append(ticker)
+            else:
+                self._upsert(ticker, interval, data)
+
+        if readjusted:
+            self.logger.info(f"수정주가 변경 감지 (분할/배당), 전체 재다운로드 ({interval}): {readjusted}")
+            covered_from = min(states[ticker]['covered_from'] for ticker in readjusted)
+            stored = self._fetch_and_store(readjusted, interval, start=covered_from, covered_from=covered_from,
+                                           replace=True)
+            stale.update(set(readjusted) - stored)
+
+        return stale
+
+    def read(self, ticker, interval="1d", period="60d"):
+        """저장된 봉 조회 (네트워크 사용 안 함)"""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM bars "
+                "WHERE ticker = ? AND interval = ? ORDER BY ts",
+                (ticker, interval)
+            ).fetchall()
+            state = conn.execute(
+                "SELECT tz FROM sync_state WHERE ticker = ? AND interval = ?",
+                (ticker, interval)
+            ).fetchone()
+
+        if not rows:
+            return pd.DataFrame(columns=self.COLUMNS)
+
+        frame = pd.DataFrame(rows, columns=['ts'] + self.COLUMNS)
+        index = pd.to_datetime(frame.pop('ts'), unit='s', utc=True)
+        if state and state[0]:
+            index = index.dt.tz_convert(state[0])
+        frame.index = pd.DatetimeIndex(index).rename(None)
+
+        return self._slice_period(frame, period)
+
+    def tickers(self, interval="1d"):
+        """저장된 종목 목록 (네트워크 사용 안 함)"""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ticker FROM sync_state WHERE interval = ? ORDER BY ticker", (interval,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def last_bar_time(self, ticker, interval="1d"):
+        """마지막 저장 봉 시각"""
+        state = self._load_states([ticker], interval).get(ticker)
+        if not state:
+            return None
+        return datetime.fromtimestamp(state['last_ts'], tz=timezone.utc)
+
+    def _fetch_and_store(self, tickers, interval, start, covered_from=None, replace=False):
+        """yfinance 일괄 다운로드 후 저장 → 저장된 종목"""
+        fetched = self._download(tickers, interval, start)
+        for ticker, data in fetched.items():
+            self._upsert(ticker, interval, data, covered_from, replace=replace)
+        return set(fetched)
+
+    def _download(self, tickers, interval, start):
+        """yfinance 일괄 다운로드 → {종목: 프레임} (실패/누락 종목 제외)"""
+        try:
+            # 'max' 기간은 epoch 시작으로 표현되므로 period 인자로 요청
+            kwargs = {'start': start} if start.timestamp() > 0 else {'period': 'max'}
+            raw = yf.download(
+                tickers,
+                interval=interval,
+                group_by='ticker',
+                auto_adjust=True,
+                threads=True,
+                progress=False,
+                timeout=self.timeout,
+                **kwargs
+            )
+        except Exception as e:
+            self.logger.warning(f"히스토리 다운로드 실패 ({interval}, {len(tickers)}개 종목): {e}")
+            return {}
+
+        if raw is None or raw.empty:
+            return {}
+
+        fetched = {}
+        for ticker in tickers:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if ticker not in raw.columns.get_level_values(0):
+                    continue
+                data = raw[ticker]
+            else:
+                data = raw
+
+            data = data.dropna(subset=['Close'])
+            if not data.empty:
+                fetched[ticker] = data
+        return fetched
+
+    def _adjustment_changed(self, ticker, interval, data, last_ts, rtol=1e-4):
+        """다시 받은 확정 봉 종가가 저장 값과 다른지 (auto_adjust 기준 과거 가격 재조정 여부)"""
+        ts_values = self._epoch_seconds(data.index)
+        fetched = {ts: close for ts, close in zip(ts_values, data['Close']) if ts < last_ts}
+        if not fetched:
+            return False
+
+        placeholders = ','.join('?' * len(fetched))
+        with self._lock, self._connect() as conn:
+            stored = conn.execute(
+                f"SELECT ts, close FROM bars WHERE ticker = ? AND interval = ? AND ts IN ({placeholders})",
+                [ticker, interval] + list(fetched)
+            ).fetchall()
+
+        return any(abs(fetched[ts] - close) > rtol * abs(close) for ts, close in stored)
+
+    @staticmethod
+    def _epoch_seconds(index):
+        if index.tz is None:
+            index = index.tz_localize('UTC')
+        return ((index.tz_convert('UTC') - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).tolist()
+
+    def _upsert(self, ticker, interval, data, covered_from=None, replace=False):
+        """봉 데이터 저장 (같은 시각은 덮어씀, replace면 기존 봉 전체 교체)"""
+        index = data.index
+        tz_name = str(index.tz) if index.tz is not None else 'UTC'
+        ts_values = self._epoch_seconds(index)
+
+        rows = [
+            (ticker, interval, int(ts), float(o), float(h), float(l), float(c), float(v) if not pd.isna(v) else 0.0)
+            for ts, o, h, l, c, v in zip(
+                ts_values, data['Open'], data['High'], data['Low'], data['Close'], data['Volume']
+            )
+        ]
+        last_ts = max(ts_values)
+        covered_ts = int(covered_from.timestamp()) if covered_from is not None else min(ts_values)
+
+        with self._lock, self._connect() as conn:
+            if replace:
+                # 재조정된 전체 구간으로 교체 (동기화 상태도 새로 기록)
+                conn.execute("DELETE FROM bars WHERE ticker = ? AND interval = ?", (ticker, interval))
+                conn.execute("DELETE FROM sync_state WHERE ticker = ? AND interval = ?", (ticker, interval))
+            conn.executemany(
+                "INSERT OR REPLACE INTO bars (ticker, interval, ts, open, high, low, close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute("""
+                INSERT INTO sync_state (ticker, interval, last_ts, covered_from, tz, last_sync)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ticker, interval) DO UPDATE SET
+                    last_ts = MAX(last_ts, excluded.last_ts),
+                    covered_from = MIN(covered_from, excluded.covered_from),
+                    tz = excluded.tz,
+                    last_sync = excluded.last_sync
+            """, (ticker, interval, last_ts, covered_ts, tz_name, datetime.now().isoformat()))
+
+        self.logger.debug(f"{ticker} {interval} 히스토리 저장: {len(rows)}개 봉")
+
+    def _load_states(self, tickers, interval):
+        """종목별 동기화 상태 로드 (직전 확정 봉 시각 포함)"""
+        placeholders = ','.join('?' * len(tickers))
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT s.ticker, s.last_ts, s.covered_from, "
+                f"(SELECT MAX(b.ts) FROM bars b WHERE b.ticker = s.ticker AND b.interval = s.interval "
+                f"AND b.ts < s.last_ts) FROM sync_state s "
+                f"WHERE s.interval = ? AND s.ticker IN ({placeholders})",
+                [interval] + list(tickers)
+            ).fetchall()
+
+        return {
+            ticker: {
+                'last_ts': last_ts,
+                'prev_ts': prev_ts,
+                'covered_from': datetime.fromtimestamp(covered_from, tz=timezone.utc)
+            }
+            for ticker, last_ts, covered_from, prev_ts in rows
+        }
+
+    def widest_period(self, periods):
+        """여러 기간 중 가장 긴 기간 (통합 조회용)"""
+        now = datetime.now(timezone.utc)
+        return min(periods, key=lambda period: self._period_start(period, now))
+
+    def slice_period(self, frame, period):
+        """조회된 프레임을 더 짧은 기간으로 자르기"""
+        return self._slice_period(frame, period)
+
+    @staticmethod
+    def _parse_period(period):
+        """기간 문자열 파싱 ('60d' -> (60, 'd'))"""
+        match = re.fullmatch(r'(\d+)(d|wk|mo|y)', str(period))
+        if not match:
+            return None
+        return int(match.group(1)), match.group(2)
+
+    def _period_start(self, period, now):
+        """요청 기간 시작 시각 (달력 기준, 주말/휴일 여유 포함)"""
+        parsed = self._parse_period(period)
+        if parsed is None:  # 'max' 등
+            return datetime.fromtimestamp(0, tz=timezone.utc)
+
+        count, unit = parsed
+        days = {'d': 1, 'wk': 7, 'mo': 30, 'y': 365}[unit] * count
+        if unit == 'd':
+            # 'Nd'는 거래일 기준이므로 주말/휴일만큼 여유를 둠
+            days = int(days * 7 / 5) + 4
+        return now - timedelta(days=days)
+
+    def _slice_period(self, frame, period):
+        """요청 기간만큼 잘라서 반환"""
+        parsed = self._parse_period(period)
+        if parsed is None or frame.empty:
+            return frame
+
+        count, unit = parsed
+        if unit == 'd':
+            # 최근 N개 거래 세션
+            sessions = frame.index.normalize()
+            keep = sessions.unique()[-count:]
+            return frame[sessions.isin(keep)]
+
+        start = frame.index[-1] - pd.Timedelta(days={'wk': 7, 'mo': 30, 'y': 365}[unit] * count)
+        return frame[frame.index >= start]
+
+
+print("✅ OHLCVHistoryStore (SQLite 증분 히스토리 저장소)")
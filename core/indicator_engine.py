@@ -0,0 +1,232 @@
+import pandas as pd
+import numpy as np
+import logging
+from datetime import datetime
+
+from .indicator_frame import IndicatorFrame
+
+
+class CrossSectionalIndicatorEngine:
+    """날짜×종목 패널 기반 벡터화 기술적 지표 엔진"""
+
+    # 신호별 가산점 (TechnicalAnalyzer.perform_technical_analysis와 동일)
+    DEFAULT_WEIGHTS = {
+        "12일 EMA 상향": 1, "26일 EMA 상향": 1, "EMA 골든크로스": 0.5,
+        "RSI 양호": 1, "과매도 구간": 0.5,
+        "볼린저 적정구간": 0.5, "볼린저 하단 접촉": 0.3,
+        "MACD 상승신호": 0.5, "거래량 급증": 0.5, "5일 상승 모멘텀": 0.3,
+    }
+
+    # 신호 판정 기준
+    DEFAULT_THRESHOLDS = {
+        'rsi_low': 30, 'rsi_high': 70,
+        'macd_down': -0.1,
+        'volume_surge': 1.5, 'volume_dry': 0.7,
+        'momentum_5d': 3,
+    }
+
+    def __init__(self, ema_fast=12, ema_slow=26, macd_signal=9, rsi_period=14,
+                 bb_period=20, bb_std=2, volume_period=20):
+        self.ema_fast = ema_fast
+        self.ema_slow = ema_slow
+        self.macd_signal = macd_signal
+        self.rsi_period = rsi_period
+        self.bb_period = bb_period
+        self.bb_std = bb_std
+        self.volume_period = volume_period
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def build_panel(frames, column):
+        """종목별 OHLCV 프레임에서 날짜×종목 패널 구성"""
+        panel = pd.concat({ticker: frame[column] for ticker, frame in frames.items()}, axis=1)
+        return panel.sort_index()
+
+    def compute(self, close, volume):
+        """전 종목 지표를 컬럼 단위 일괄 계산 (각 값은 날짜×종목 패널)"""
+        frame = IndicatorFrame(close=close, volume=volume)
+        bb_middle, bb_upper, bb_lower = frame.bollinger(self.bb_period, self.bb_std)
+
+        return {
+            'close': close,
+            'volume': volume,
+            'ema_12': frame.ema(self.ema_fast),
+            'ema_26': frame.ema(self.ema_slow),
+            'rsi': frame.rsi(self.rsi_period),
+            'bb_middle': bb_middle,
+            'bb_upper': bb_upper,
+            'bb_lower': bb_lower,
+            'macd_histogram': frame.macd(self.ema_fast, self.ema_slow, self.macd_signal)[2],
+            'volume_avg': frame.volume_avg(self.volume_period),
+            'volume_ratio': frame.volume_ratio(self.volume_period),
+            'price_change_1d': frame.pct_change(1),
+            'price_change_5d': frame.pct_change(5),
+        }
+
+    def score(self, ind, weights=None, thresholds=None):
+        """점수 및 신호 마스크 계산 (1차원/2차원 배열 모두 지원, 가중치/기준 변경은 파라미터 탐색용)"""
+        price = np.asarray(ind['close'], dtype=float)
+        ema_12 = np.asarray(ind['ema_12'], dtype=float)
+        ema_26 = np.asarray(ind['ema_26'], dtype=float)
+        rsi = np.asarray(ind['rsi'], dtype=float)
+        bb_upper = np.asarray(ind['bb_upper'], dtype=float)
+        bb_lower = np.asarray(ind['bb_lower'], dtype=float)
+        macd = np.asarray(ind['macd_histogram'], dtype=float)
+        volume_ratio = np.asarray(ind['volume_ratio'], dtype=float)
+        change_5d = np.asarray(ind['price_change_5d'], dtype=float)
+
+        weights = {**self.DEFAULT_WEIGHTS, **(weights or {})}
+        th = {**self.DEFAULT_THRESHOLDS, **(thresholds or {})}
+
+        # 신호 순서는 TechnicalAnalyzer.perform_technical_analysis와 동일
+        in_band = (bb_lower < price) & (price < bb_upper)
+        signal_masks = [
+            ("12일 EMA 상향", price > ema_12),
+            ("26일 EMA 상향", price > ema_26),
+            ("EMA 골든크로스", ema_12 > ema_26),
+            ("EMA 데드크로스", ema_12 < ema_26),
+            ("RSI 양호", (rsi >= th['rsi_low']) & (rsi <= th['rsi_high'])),
+            ("과매도 구간", rsi < th['rsi_low']),
+            ("과매수 주의", rsi > th['rsi_high']),
+            ("볼린저 적정구간", in_band),
+            ("볼린저 하단 접촉", ~in_band & (price <= bb_lower)),
+            ("볼린저 상단 접촉", ~in_band & (price >= bb_upper)),
+            ("MACD 상승신호", macd > 0),
+            ("MACD 하락신호", macd < th['macd_down']),
+            ("거래량 급증", volume_ratio > th['volume_surge']),
+            ("거래량 위축", volume_ratio < th['volume_dry']),
+            ("5일 상승 모멘텀", change_5d > th['momentum_5d']),
+            ("5일 하락 모멘텀", change_5d < -th['momentum_5d']),
+        ]
+
+        score = np.full(price.shape, 5.0)
+        for label, mask in signal_masks:
+            if label in weights:
+                score = score + np.where(mask, weights[label], 0)
+
+        valid = ~(np.isnan(ema_12) | np.isnan(ema_26) | np.isnan(rsi))
+        return score, signal_masks, valid
+
+    def urgent_signals(self, ind):
+        """긴급 신호 마스크 계산 (TechnicalAnalyzer.detect_urgent_signals와 동일)"""
+        rsi = np.asarray(ind['rsi'], dtype=float)
+        change_1d = np.asarray(ind['price_change_1d'], dtype=float)
+        volume_ratio = np.asarray(ind['volume_ratio'], dtype=float)
+
+        crash = change_1d <= -5
+        surge = ~crash & (change_1d >= 10)
+        rsi_low = rsi <= 20
+        rsi_high = ~rsi_low & (rsi >= 80)
+
+        has_buy = surge | rsi_low
+        has_sell = crash | rsi_high
+        volume_spike = volume_ratio >= 3.0
+
+        buy_masks = [("급등 발생", surge), ("RSI 극한 과매도", rsi_low),
+                     ("거래량 급증", volume_spike & has_buy)]
+        sell_masks = [("급락 발생", crash), ("RSI 극한 과매수", rsi_high),
+                      ("거래량 급증", volume_spike & ~has_buy & has_sell)]
+
+        level = np.zeros(rsi.shape, dtype=int)
+        level = np.maximum(level, np.where(crash | rsi_low | rsi_high, 4, 0))
+        level = np.maximum(level, np.where(surge | (volume_spike & (has_buy | has_sell)), 3, 0))
+
+        return buy_masks, sell_masks, level
+
+    def latest_table(self, close, volume):
+        """종목별 최신 분석 결과 테이블 (TechnicalAnalyzer 결과 dict와 동일한 컬럼)"""
+        records = self.latest_records(close, volume)
+        return pd.DataFrame.from_records(records, index=[record['ticker'] for record in records])
+
+    def latest_records(self, close, volume):
+        """종목별 최신 분석 결과 목록 (순수 파이썬 타입)"""
+        ind = self.compute(close, volume)
+        tickers = list(close.columns)
+
+        # 종목별 마지막 유효 행 (휴장/거래정지로 마지막 날짜가 비어 있는 경우 대비)
+        notna = close.notna().to_numpy()
+        rows = len(close) - 1 - notna[::-1].argmax(axis=0)
+        cols = np.arange(len(tickers))
+        latest = {key: panel.to_numpy(dtype=float)[rows, cols] for key, panel in ind.items()}
+
+        score, signal_masks, valid = self.score(latest)
+        buy_masks, sell_masks, level = self.urgent_signals(latest)
+
+        price = latest['close']
+        bb_width = latest['bb_upper'] - latest['bb_lower']
+        analysis_time = datetime.now().isoformat()
+
+        records = []
+        for i, ticker in enumerate(tickers):
+            volume_i = latest['volume'][i]
+            volume_avg_i = latest['volume_avg'][i]
+            macd_i = latest['macd_histogram'][i]
+            change_5d_i = latest['price_change_5d'][i]
+            records.append({
+                'ticker': ticker,
+                'current_price': float(price[i]),
+                'ema_12': float(latest['ema_12'][i]),
+                'ema_26': float(latest['ema_26'][i]),
+                'rsi': float(latest['rsi'][i]),
+                'bb_upper': float(latest['bb_upper'][i]),
+                'bb_lower': float(latest['bb_lower'][i]),
+                'bb_middle': float(latest['bb_middle'][i]),
+                'macd_signal': float(macd_i) if not np.isnan(macd_i) else 0,
+                'volume': int(volume_i) if volume_i > 0 else 0,
+                'volume_avg': int(volume_avg_i) if volume_avg_i > 0 else 0,
+                'volume_ratio': float(latest['volume_ratio'][i]),
+                'price_change_5d': float(change_5d_i) if not np.isnan(change_5d_i) else 0.0,
+                'score': min(round(float(score[i]), 1), 10),
+                'signals': [label for label, mask in signal_masks if mask[i]][:6],
+                'analysis_time': analysis_time,
+                'confidence': min(float(score[i]) / 10.0, 1.0),
+                'volatility': float(bb_width[i] / price[i]) if price[i] > 0 else 0,
+                'urgent_buy_signals': [label for label, mask in buy_masks if mask[i]],
+                'urgent_sell_signals': [label for label, mask in sell_masks if mask[i]],
+                'urgent_level': int(level[i]),
+                'valid': bool(valid[i]),
+            })
+
+        return records
+
+    @staticmethod
+    def interior_gaps(panel):
+        """상장 구간 중간에 빈 날짜가 있는 종목 (다른 종목 거래일 합집합으로 생긴 NaN 행)"""
+        listed = panel.notna()
+        inside = listed.cummax() & listed[::-1].cummax()[::-1]
+        return list(panel.columns[(inside & ~listed).any().to_numpy()])
+
+    def analyze_frames(self, frames):
+        """종목별 OHLCV 프레임 일괄 분석 → {ticker: 결과 dict 또는 None}"""
+        if not frames:
+            return {}
+
+        close = self.build_panel(frames, 'Close')
+        volume = self.build_panel(frames, 'Volume')
+
+        # 중간 거래일이 빠진 종목은 자기 날짜 기준으로 따로 계산 (NaN 행 위의 이동 지표 방지)
+        gapped = self.interior_gaps(close)
+        aligned = [ticker for ticker in close.columns if ticker not in gapped]
+
+        records = self.latest_records(close[aligned], volume[aligned]) if aligned else []
+
+        # 거래일이 같은 종목끼리 묶어 일괄 계산 (대부분 종목별 1개 그룹)
+        groups = {}
+        for ticker in gapped:
+            groups.setdefault(tuple(frames[ticker].index), []).append(ticker)
+        for group in groups.values():
+            self.logger.debug(f"거래일 불일치 종목 자체 날짜 기준 계산: {', '.join(group)}")
+            subset = {ticker: frames[ticker] for ticker in group}
+            records.extend(self.latest_records(self.build_panel(subset, 'Close'), self.build_panel(subset, 'Volume')))
+
+        results = {}
+        for record in records:
+            ticker = record['ticker']
+            if not record.pop('valid'):
+                self.logger.warning(f"{ticker}: 일부 지표 계산 실패")
+                results[ticker] = None
+                continue
+            results[ticker] = record
+        return results
+
+print("✅ CrossSectionalIndicatorEngine (날짜×종목 패널 벡터화 지표 엔진)")
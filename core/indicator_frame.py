@@ -0,0 +1,116 @@
+import numpy as np
+
+
+class IndicatorFrame:
+    """OHLCV 프레임 래퍼 (파생 지표를 최초 접근 시 계산 후 캐시)"""
+
+    def __init__(self, data=None, close=None, volume=None):
+        # close/volume은 Series(단일 종목) 또는 DataFrame(날짜×종목 패널) 모두 가능
+        self.data = data
+        self.close = close if close is not None else data['Close']
+        if volume is not None:
+            self.volume = volume
+        elif data is not None and 'Volume' in data:
+            self.volume = data['Volume']
+        else:
+            self.volume = None
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.close)
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def ema(self, span):
+        """지수이동평균"""
+        return self._cached(('ema', span), lambda: self.close.ewm(span=span).mean())
+
+    def rsi(self, period=14):
+        """RSI (단순 이동평균, 계산 불가 구간은 50)"""
+        def compute():
+            gain, loss = self._gain_loss()
+            avg_gain = gain.rolling(window=period).mean()
+            avg_loss = loss.rolling(window=period).mean()
+            # 0으로 나누기 방지
+            rs = avg_gain / avg_loss.replace(0, np.nan)
+            return (100 - (100 / (1 + rs))).fillna(50)
+        return self._cached(('rsi', period), compute)
+
+    def wilder_averages(self, period=14):
+        """Wilder 평활 평균 상승/하락폭 (최초 period개는 단순 평균으로 시드)"""
+        def compute():
+            gain, loss = self._gain_loss()
+            return self._wilder(gain.iloc[1:], period), self._wilder(loss.iloc[1:], period)
+        return self._cached(('wilder', period), compute)
+
+    @staticmethod
+    def _wilder(values, period):
+        if len(values) < period:
+            return values.iloc[0:0]
+        seeded = values.iloc[period - 1:].copy()
+        seeded.iloc[0] = values.iloc[:period].mean()
+        return seeded.ewm(alpha=1 / period, adjust=False).mean()
+
+    def _gain_loss(self):
+        def compute():
+            # 상장 전(종가 없음) 구간은 제외
+            listed = self.close.notna()
+            delta = self.close.diff()
+            gain = delta.where(delta > 0, 0).where(listed)
+            loss = (-delta.where(delta < 0, 0)).where(listed)
+            return gain, loss
+        return self._cached(('gain_loss',), compute)
+
+    def rolling_mean(self, period):
+        """종가 단순이동평균"""
+        return self._cached(('sma', period), lambda: self._rolling(period).mean())
+
+    def rolling_std(self, period):
+        """종가 이동 표준편차"""
+        return self._cached(('std', period), lambda: self._rolling(period).std())
+
+    def _rolling(self, period):
+        return self._cached(('rolling', period), lambda: self.close.rolling(period))
+
+    def bollinger(self, period=20, num_std=2):
+        """볼린저 밴드 (middle, upper, lower; 표준편차 0이면 현재가 ±2%)"""
+        def compute():
+            middle = self.rolling_mean(period)
+            std = self.rolling_std(period)
+            upper = (middle + std * num_std).where(std != 0, self.close * 1.02)
+            lower = (middle - std * num_std).where(std != 0, self.close * 0.98)
+            return middle, upper, lower
+        return self._cached(('bollinger', period, num_std), compute)
+
+    def macd(self, fast=12, slow=26, signal=9):
+        """MACD (line, signal, histogram) — EMA는 캐시된 값을 재사용"""
+        def compute():
+            line = self.ema(fast) - self.ema(slow)
+            signal_line = line.ewm(span=signal).mean()
+            return line, signal_line, line - signal_line
+        return self._cached(('macd', fast, slow, signal), compute)
+
+    def volume_avg(self, period=20):
+        """거래량 이동평균 (계산 불가 시 당일 거래량)"""
+        def compute():
+            avg = self.volume.rolling(period).mean()
+            return avg.where(avg.notna(), self.volume)
+        return self._cached(('volume_avg', period), compute)
+
+    def volume_ratio(self, period=20):
+        """거래량 비율 (평균 대비)"""
+        def compute():
+            avg = self.volume_avg(period)
+            return (self.volume / avg).where(avg > 0, 1.0)
+        return self._cached(('volume_ratio', period), compute)
+
+    def pct_change(self, periods=1):
+        """기간 수익률 (%)"""
+        return self._cached(('pct_change', periods),
+                            lambda: (self.close / self.close.shift(periods) - 1) * 100)
+
+
+print("✅ IndicatorFrame (지연 계산 + 캐시 지표 프레임)")
@@ -0,0 +1,153 @@
+import asyncio
+import random
+import threading
+import logging
+from datetime import datetime
+
+
+class AsyncJobScheduler:
+    """단일 asyncio 이벤트 루프 기반 주기 작업 스케줄러 (작업별 간격/지터/지연 측정)"""
+
+    def __init__(self, name="scheduler"):
+        self.name = name
+        self.jobs = {}
+        self.stats = {}
+        self.logger = logging.getLogger(__name__)
+
+        self._loop = None
+        self._thread = None
+        self._tasks = []
+        self._ready = threading.Event()
+
+    def add_job(self, name, func, interval, jitter=0.0, error_interval=None, initial_delay=0.0):
+        """주기 작업 등록 (func: 코루틴 함수 또는 블로킹 함수 — 블로킹 함수는 스레드에서 실행)
+
+        interval/error_interval/initial_delay는 초 단위 숫자 또는 매 주기 호출되는 함수
+        """
+        self.jobs[name] = {
+            'name': name,
+            'func': func,
+            'interval': interval,
+            'jitter': jitter,
+            'error_interval': error_interval if error_interval is not None else interval,
+            'initial_delay': initial_delay
+        }
+        self.stats[name] = {
+            'runs': 0,
+            'errors': 0,
+            'last_run': None,
+            'last_duration': 0.0,
+            'last_lag': 0.0,
+            'max_lag': 0.0,
+            'next_interval': None
+        }
+
+    def start(self):
+        """백그라운드 스레드에서 이벤트 루프 시작"""
+        if self._thread and self._thread.is_alive():
+            return False
+
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+        return True
+
+    def stop(self, timeout=10):
+        """모든 작업 취소 후 루프 종료 대기"""
+        if self._loop is None or not self._thread:
+            return
+
+        try:
+            self._loop.call_soon_threadsafe(self._cancel_all)
+        except RuntimeError:
+            pass  # 이미 종료된 루프
+
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            self.logger.warning(f"{self.name} 스케줄러 종료 대기 시간 초과 ({timeout}초)")
+
+    def is_running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def get_lag_report(self):
+        """작업별 실행 통계 (계획 시각 대비 지연 포함)"""
+        return {name: dict(stat) for name, stat in self.stats.items()}
+
+    def _resolve(self, value, job_name):
+        """간격 값 계산 (함수인 경우 호출, 오류 시 None)"""
+        if not callable(value):
+            return float(value)
+        try:
+            return max(0.0, float(value()))
+        except Exception as e:
+            self.logger.error(f"{job_name} 간격 계산 오류: {e}")
+            return None
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+
+    async def _main(self):
+        self._tasks = [
+            asyncio.create_task(self._run_job(job), name=job['name'])
+            for job in self.jobs.values()
+        ]
+        self._ready.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _cancel_all(self):
+        for task in self._tasks:
+            task.cancel()
+
+    async def _run_job(self, job):
+        """작업 반복 실행 (계획 시각 기준으로 다음 실행을 잡아 드리프트 방지)"""
+        loop = asyncio.get_running_loop()
+        stat = self.stats[job['name']]
+        base = loop.time() + (self._resolve(job['initial_delay'], job['name']) or 0.0)
+        planned = base
+
+        while True:
+            delay = planned - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            started = loop.time()
+            lag = max(0.0, started - planned)
+            stat['last_lag'] = round(lag, 3)
+            stat['max_lag'] = round(max(stat['max_lag'], lag), 3)
+            stat['last_run'] = datetime.now().isoformat()
+
+            interval_source = job['interval']
+            try:
+                if asyncio.iscoroutinefunction(job['func']):
+                    await job['func']()
+                else:
+                    await asyncio.to_thread(job['func'])
+                stat['runs'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stat['errors'] += 1
+                interval_source = job['error_interval']
+                self.logger.error(f"{job['name']} 작업 오류: {e}")
+
+            stat['last_duration'] = round(loop.time() - started, 3)
+
+            interval = self._resolve(interval_source, job['name'])
+            if interval is None:
+                interval = self._resolve(job['error_interval'], job['name']) or 60.0
+            stat['next_interval'] = round(interval, 1)
+
+            # 다음 계획 시각 (실행이 밀린 경우 현재 시각 + 간격으로 재설정, 지터는 누적하지 않음)
+            base += interval
+            if base < loop.time():
+                base = loop.time() + interval
+            planned = base + (random.uniform(0, job['jitter']) if job['jitter'] else 0)
+
+
+print("✅ AsyncJobScheduler (asyncio 단일 루프 주기 작업 스케줄러)")
@@ -0,0 +1,132 @@
+import time
+import threading
+import logging
+from types import MappingProxyType
+from datetime import datetime
+
+import pandas as pd
+
+
+class MarketSnapshot:
+    """한 틱의 시세 스냅샷 (구독자에게는 읽기 전용, 조회 시 복사본 반환)"""
+
+    def __init__(self, frames, history_store, fetched_at=None):
+        self._frames = MappingProxyType(dict(frames))  # (종목, 간격) → 통합 기간 프레임
+        self._history_store = history_store
+        self.fetched_at = fetched_at or datetime.now()
+
+    def __contains__(self, key):
+        return key in self._frames
+
+    def get(self, symbol, interval, period=None):
+        """종목/간격 프레임 (period 지정 시 해당 기간만)"""
+        frame = self._frames.get((symbol, interval))
+        if frame is None:
+            return pd.DataFrame(columns=self._history_store.COLUMNS)
+        if period is not None:
+            frame = self._history_store.slice_period(frame, period)
+        return frame.copy()
+
+
+class MarketDataBus:
+    """구독자별 필요 종목/간격을 합쳐 틱마다 간격별 일괄 조회 후 스냅샷 배포"""
+
+    def __init__(self, history_store, on_tick=None):
+        self.history_store = history_store
+        self.on_tick = on_tick  # 틱 종료 후 구독자 반환값 목록으로 1회 호출 (예: 알림 일괄 전송)
+        self.subscribers = {}
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    def subscribe(self, name, symbols, requirements, callback, every=0):
+        """구독 등록
+
+        requirements: {간격: 기간} (예: {'1h': '5d', '1d': '10d'})
+        every: 실행 간격 (초 또는 매번 호출되는 함수), callback(snapshot) → 반환값은 on_tick으로 모아 전달
+        """
+        with self._lock:
+            self.subscribers[name] = {
+                'name': name,
+                'symbols': list(symbols),
+                'requirements': dict(requirements),
+                'callback': callback,
+                'every': every,
+                'next_due': 0.0,
+            }
+
+    def unsubscribe(self, name):
+        with self._lock:
+            self.subscribers.pop(name, None)
+
+    @staticmethod
+    def _resolve_every(every):
+        return float(every()) if callable(every) else float(every)
+
+    def seconds_until_next_due(self):
+        """가장 먼저 실행할 구독자까지 남은 시간 (스케줄러 간격 함수로 사용)"""
+        with self._lock:
+            if not self.subscribers:
+                return 60.0
+            next_due = min(subscriber['next_due'] for subscriber in self.subscribers.values())
+        return max(0.0, next_due - time.time())
+
+    def _due_subscribers(self, now, tolerance=1.0):
+        with self._lock:
+            return [subscriber for subscriber in self.subscribers.values()
+                    if subscriber['next_due'] <= now + tolerance]
+
+    def build_plan(self, subscribers):
+        """간격별 (종목 합집합, 가장 긴 기간)"""
+        symbols_by_interval = {}
+        periods_by_interval = {}
+        for subscriber in subscribers:
+            for interval, period in subscriber['requirements'].items():
+                symbols_by_interval.setdefault(interval, {}).update(dict.fromkeys(subscriber['symbols']))
+                periods_by_interval.setdefault(interval, []).append(period)
+
+        return {
+            interval: (list(symbols), self.history_store.widest_period(periods_by_interval[interval]))
+            for interval, symbols in symbols_by_interval.items()
+        }
+
+    def tick(self):
+        """실행 시점이 된 구독자만 대상으로 간격별 1회 조회 후 콜백 호출 (호출 구독자 수 반환)"""
+        now = time.time()
+        due = self._due_subscribers(now)
+        if not due:
+            return 0
+
+        frames = {}
+        for interval, (symbols, period) in self.build_plan(due).items():
+            for symbol, frame in self.history_store.get_many(symbols, interval=interval, period=period).items():
+                frames[(symbol, interval)] = frame
+
+        snapshot = MarketSnapshot(frames, self.history_store)
+        self.logger.debug(f"시세 스냅샷 배포: 구독자 {len(due)}개, 프레임 {len(frames)}개")
+
+        results = []
+        for subscriber in due:
+            try:
+                result = subscriber['callback'](snapshot)
+                if result is not None:
+                    results.append(result)
+            except Exception as e:
+                self.logger.error(f"{subscriber['name']} 구독자 처리 오류: {e}")
+            finally:
+                try:
+                    every = self._resolve_every(subscriber['every'])
+                except Exception as e:
+                    self.logger.error(f"{subscriber['name']} 실행 간격 계산 오류: {e}")
+                    every = 60.0
+                subscriber['next_due'] = time.time() + every
+
+        if self.on_tick:
+            try:
+                self.on_tick(results)
+            except Exception as e:
+                self.logger.error(f"틱 결과 처리 오류: {e}")
+
+        return len(due)
+
+
+print("✅ MarketDataBus (구독 통합 시세 조회 + 스냅샷 배포)")
@@ -0,0 +1,285 @@
+import os
+import time
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+
+from utils.concurrency import TokenBucket
+
+
+class TelegramRateLimiter:
+    """텔레그램 전송 속도 제한 (채팅별 + 전체)"""
+
+    def __init__(self, per_chat_rate=1.0, per_chat_burst=3, global_rate=30.0):
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.global_bucket = TokenBucket(rate=global_rate, capacity=global_rate)
+        self._chat_buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, chat_id):
+        """전송 가능 시점까지 대기"""
+        with self._lock:
+            bucket = self._chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = TokenBucket(rate=self.per_chat_rate, capacity=self.per_chat_burst)
+                self._chat_buckets[chat_id] = bucket
+        bucket.acquire()
+        self.global_bucket.acquire()
+
+
+# 같은 봇 토큰을 쓰는 모든 TelegramBot 인스턴스가 한도를 공유
+default_rate_limiter = TelegramRateLimiter()
+
+
+class OutboundMessageQueue:
+    """우선순위 발신 큐 (SQLite 스풀에 보관, 백그라운드 전송, 시작 시 미전송 메시지 재전송)"""
+
+    PRIORITIES = {'EMERGENCY': 0, 'URGENT': 1, 'NORMAL': 2}
+    DELAYED_PREFIX = "⏳ 지연 전송"
+
+    # 스풀 경로별 프로세스 공유 인스턴스 (같은 스풀에 전송 스레드는 한 벌만)
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, send_func=None, spool_path="data/message_spool.db", workers=2,
+                 max_attempts=5, retry_delay=10, max_age_hours=24, on_delivered=None, timeout=30,
+                 stale_after_minutes=30):
+        # 전송 클라이언트 목록 [(send_func, on_delivered)] - 가장 최근 등록된 클라이언트로 전송
+        # send_func: (chat_id, text) → 성공 여부, on_delivered: 전송 성공 후 콜백 (행 dict)
+        self._clients = [(send_func, on_delivered)] if send_func else []
+        self.spool_path = spool_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_age = max_age_hours * 3600
+        self.stale_after = stale_after_minutes * 60  # 재시작 후 재전송 시 긴급도 유지 기한
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads = []
+
+        os.makedirs(os.path.dirname(spool_path) or '.', exist_ok=True)
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """DB 연결 (커밋 후 종료)"""
+        conn = sqlite3.connect(self.spool_path, timeout=self.timeout)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """스풀 테이블 생성 (status: pending/sending/failed)"""
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    priority INTEGER NOT NULL,
+                    chat_id TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    followup INTEGER NOT NULL DEFAULT 0,
+                    incident TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    next_attempt REAL NOT NULL,
+                    claimed_at REAL
+                )
+            """)
+            # 이전 스키마 스풀 호환
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(outbox)")}
+            if 'incident' not in columns:
+                conn.execute("ALTER TABLE outbox ADD COLUMN incident TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_ready ON outbox (status, priority, next_attempt, id)")
+
+    @classmethod
+    def shared(cls, spool_path="data/message_spool.db", **kwargs):
+        """스풀 경로별 공유 인스턴스 (없으면 생성)"""
+        key = os.path.abspath(spool_path)
+        with cls._shared_lock:
+            queue = cls._shared.get(key)
+            if queue is None:
+                queue = cls(spool_path=spool_path, **kwargs)
+                cls._shared[key] = queue
+            return queue
+
+    def attach(self, send_func, on_delivered=None):
+        """전송 클라이언트 등록 (첫 등록 시 전송 스레드 시작)"""
+        with self._lock:
+            self._clients.append((send_func, on_delivered))
+        self.start()
+
+    def detach(self, send_func):
+        """전송 클라이언트 해제 (남은 클라이언트가 없으면 전송 스레드 종료, 미전송분은 스풀 보존)"""
+        with self._lock:
+            self._clients = [client for client in self._clients if client[0] != send_func]
+            remaining = len(self._clients)
+        if not remaining:
+            self.stop()
+
+    def start(self):
+        """미전송 메시지 복구 후 전송 스레드 시작"""
+        if self._threads or not self._clients:
+            return
+
+        self._recover()
+        self._stopping.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"outbox-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=10):
+        """전송 스레드 종료 (남은 메시지는 스풀에 보존되어 다음 시작 시 재전송)"""
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def enqueue(self, chat_id, text, priority='NORMAL', followup=False, incident=None):
+        """메시지 등록 후 즉시 반환 (incident: 후속 알림 병합 키)"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO outbox (priority, chat_id, text, followup, incident, created_at, next_attempt) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.PRIORITIES.get(priority, 2), str(chat_id), text, int(followup), incident, now, now)
+            )
+            message_id = cursor.lastrowid
+
+        with self._wakeup:
+            self._wakeup.notify()
+        return message_id
+
+    def pending_count(self):
+        with self._lock, self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox WHERE status != 'failed'").fetchone()[0]
+
+    def flush(self, timeout=30):
+        """대기 중인 메시지 전송 완료까지 대기 (완료 여부 반환)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.pending_count() == 0:
+                return True
+            time.sleep(0.2)
+        return self.pending_count() == 0
+
+    def _recover(self):
+        """중단된 전송/최종 실패 메시지를 대기 상태로 복구 (보관 기한 초과분은 폐기)"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            expired = conn.execute("DELETE FROM outbox WHERE created_at < ?", (now - self.max_age,)).rowcount
+            recovered = conn.execute(
+                "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt = ?, claimed_at = NULL "
+                "WHERE status = 'failed' OR (status = 'sending' AND claimed_at < ?)",
+                (now, now - 300)
+            ).rowcount
+            # 오래된 알림은 현재 상황처럼 보이지 않도록 일반 등급 + 지연 표시로 전송 (후속 재확인 없음)
+            delayed = 0
+            for row in conn.execute(
+                "SELECT id, text, created_at FROM outbox WHERE status = 'pending' AND created_at < ? "
+                "AND text NOT LIKE ?", (now - self.stale_after, f"{self.DELAYED_PREFIX}%")
+            ).fetchall():
+                created = time.strftime('%m-%d %H:%M', time.localtime(row['created_at']))
+                conn.execute(
+                    "UPDATE outbox SET priority = ?, followup = 0, text = ? WHERE id = ?",
+                    (self.PRIORITIES['NORMAL'], f"{self.DELAYED_PREFIX} ({created} 발생 알림)\n\n{row['text']}",
+                     row['id'])
+                )
+                delayed += 1
+            pending = conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+        if expired:
+            self.logger.warning(f"보관 기한이 지난 미전송 메시지 {expired}개 폐기")
+        if delayed:
+            self.logger.warning(f"{self.stale_after // 60}분 이상 지난 미전송 알림 {delayed}개 지연 표시 후 일반 등급 전송")
+        if pending:
+            self.logger.info(f"미전송 메시지 {pending}개 재전송 예정 (복구 {recovered}개)")
+
+    def _claim_next(self):
+        """전송할 다음 메시지 선점 (우선순위 → 등록 순, 다른 인스턴스와 중복 전송 방지)"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt <= ? "
+                    "ORDER BY priority, id LIMIT 1", (now,)
+                ).fetchone()
+                if row is None:
+                    next_due = conn.execute(
+                        "SELECT MIN(next_attempt) FROM outbox WHERE status = 'pending'"
+                    ).fetchone()[0]
+                    return None, next_due
+
+                claimed = conn.execute(
+                    "UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ? AND status = 'pending'",
+                    (now, row['id'])
+                ).rowcount
+                if claimed:
+                    return dict(row), None
+
+    def _worker(self):
+        while not self._stopping.is_set():
+            try:
+                row, next_due = self._claim_next()
+            except Exception as e:
+                self.logger.error(f"발신 큐 조회 오류: {e}")
+                row, next_due = None, time.time() + self.retry_delay
+
+            if row is None:
+                wait = 5.0 if next_due is None else min(5.0, max(0.05, next_due - time.time()))
+                with self._wakeup:
+                    self._wakeup.wait(timeout=wait)
+                continue
+
+            self._deliver(row)
+
+    def _deliver(self, row):
+        with self._lock:
+            send_func, on_delivered = self._clients[-1] if self._clients else (None, None)
+        if send_func is None:
+            # 클라이언트가 모두 해제된 경우 다음 시작 시 재전송
+            with self._lock, self._connect() as conn:
+                conn.execute("UPDATE outbox SET status = 'pending', claimed_at = NULL WHERE id = ?", (row['id'],))
+            return
+
+        try:
+            success = send_func(row['chat_id'], row['text'])
+        except Exception as e:
+            self.logger.error(f"메시지 전송 오류 (id={row['id']}): {e}")
+            success = False
+
+        with self._lock, self._connect() as conn:
+            if success:
+                conn.execute("DELETE FROM outbox WHERE id = ?", (row['id'],))
+            else:
+                attempts = row['attempts'] + 1
+                if attempts >= self.max_attempts:
+                    conn.execute("UPDATE outbox SET status = 'failed', attempts = ? WHERE id = ?",
+                                 (attempts, row['id']))
+                    self.logger.error(f"메시지 최종 전송 실패 - 스풀 보관 (id={row['id']}, 다음 시작 시 재전송)")
+                else:
+                    conn.execute(
+                        "UPDATE outbox SET status = 'pending', attempts = ?, next_attempt = ? WHERE id = ?",
+                        (attempts, time.time() + self.retry_delay * 2 ** (attempts - 1), row['id'])
+                    )
+
+        if success and on_delivered:
+            try:
+                on_delivered(row)
+            except Exception as e:
+                self.logger.error(f"전송 후 처리 오류: {e}")
+
+
+print("✅ OutboundMessageQueue (우선순위 발신 큐 + SQLite 스풀)")
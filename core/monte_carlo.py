@@ -0,0 +1,118 @@
+import logging
+
+import pandas as pd
+import numpy as np
+
+
+class MonteCarloSimulator:
+    """과거 일간 수익률 블록 부트스트랩 기반 손익 목표 시뮬레이션 (익절 선도달 확률, 기대수익, 도달 기간)"""
+
+    def __init__(self, paths=5000, horizon=10, lookback=250, block_size=5, min_observations=60, seed=None):
+        self.paths = paths
+        self.horizon = horizon                  # 보유 기간 (거래일)
+        self.lookback = lookback                # 부트스트랩 표본 일수
+        self.block_size = block_size            # 변동성 군집 보존용 연속 일수
+        self.min_observations = min_observations
+        self.rng = np.random.default_rng(seed)
+        self.logger = logging.getLogger(__name__)
+
+    def daily_moves(self, data):
+        """일봉 → 전일 종가 대비 (종가, 고가, 저가) 로그 변화 (일수 × 3)"""
+        data = data[['High', 'Low', 'Close']].dropna().iloc[-(self.lookback + 1):]
+        prev_close = data['Close'].shift(1)
+        moves = np.log(data[['Close', 'High', 'Low']].div(prev_close, axis=0)).iloc[1:]
+        return moves.replace([np.inf, -np.inf], np.nan).dropna().to_numpy()
+
+    def _bootstrap(self, moves):
+        """블록 부트스트랩 경로 (경로 × 기간 × 3)"""
+        days = len(moves)
+        block = max(1, min(self.block_size, days))
+        blocks = -(-self.horizon // block)
+
+        starts = self.rng.integers(0, days - block + 1, size=(self.paths, blocks))
+        index = (starts[:, :, None] + np.arange(block)).reshape(self.paths, -1)[:, :self.horizon]
+        return moves[index]
+
+    def simulate(self, moves, current_price, stop_loss, take_profit):
+        """손절/익절 경로 시뮬레이션 (같은 날 둘 다 닿으면 손절 우선)"""
+        sampled = self._bootstrap(moves)
+
+        # 전일까지 누적 종가 + 당일 고가/저가 변화
+        close_path = np.cumsum(sampled[:, :, 0], axis=1)
+        prev_path = close_path - sampled[:, :, 0]
+        high_path = prev_path + sampled[:, :, 1]
+        low_path = prev_path + sampled[:, :, 2]
+
+        stop_level = np.log(stop_loss / current_price)
+        take_level = np.log(take_profit / current_price)
+        stop_hit = low_path <= stop_level
+        take_hit = high_path >= take_level
+
+        no_hit = self.horizon
+        stop_day = np.where(stop_hit.any(axis=1), stop_hit.argmax(axis=1), no_hit)
+        take_day = np.where(take_hit.any(axis=1), take_hit.argmax(axis=1), no_hit)
+
+        take_first = take_day < stop_day
+        stop_first = (stop_day <= take_day) & (stop_day < no_hit)
+        neither = ~(take_first | stop_first)
+
+        # 청산 규칙 적용 수익률 (목표가 체결, 미도달 시 만기 종가)
+        terminal = np.exp(close_path[:, -1]) - 1
+        realized = np.where(take_first, take_profit / current_price - 1,
+                            np.where(stop_first, stop_loss / current_price - 1, terminal))
+
+        days_to_target = take_day[take_first] + 1
+        distribution = np.bincount(days_to_target, minlength=self.horizon + 1)[1:] / self.paths
+
+        return {
+            'paths': self.paths,
+            'horizon': self.horizon,
+            'observations': int(len(moves)),
+            'take_profit_probability': round(float(take_first.mean()), 3),
+            'stop_loss_probability': round(float(stop_first.mean()), 3),
+            'no_exit_probability': round(float(neither.mean()), 3),
+            'expected_return': round(float(realized.mean()) * 100, 2),
+            'expected_terminal_return': round(float(terminal.mean()) * 100, 2),
+            'return_percentiles': {
+                f"p{q}": round(float(value) * 100, 2)
+                for q, value in zip((5, 25, 50, 75, 95), np.percentile(realized, [5, 25, 50, 75, 95]))
+            },
+            'median_days_to_target': float(np.median(days_to_target)) if len(days_to_target) else None,
+            'days_to_target_distribution': [round(float(p), 4) for p in distribution],
+        }
+
+    def analyze(self, data, stop_loss, take_profit, current_price=None):
+        """일봉 데이터로 시뮬레이션 (데이터 부족/잘못된 목표가면 None)"""
+        try:
+            if data is None or data.empty:
+                return None
+
+            current_price = current_price or float(data['Close'].iloc[-1])
+            if not (0 < stop_loss < current_price < take_profit):
+                return None
+
+            moves = self.daily_moves(data)
+            if len(moves) < self.min_observations:
+                self.logger.debug(f"몬테카를로 표본 부족: {len(moves)}일")
+                return None
+
+            result = self.simulate(moves, current_price, stop_loss, take_profit)
+            # 갱신 실패로 저장된 봉만 사용한 경우 (최근 변동 미반영)
+            result['stale_data'] = bool(data.attrs.get('stale'))
+            return result
+
+        except Exception as e:
+            self.logger.error(f"몬테카를로 시뮬레이션 오류: {e}")
+            return None
+
+    def analyze_many(self, frames, targets):
+        """여러 종목 일괄 시뮬레이션 (targets: {종목: (현재가, 손절가, 익절가)})"""
+        results = {}
+        for ticker, (current_price, stop_loss, take_profit) in targets.items():
+            result = self.analyze(frames.get(ticker, pd.DataFrame()), stop_loss, take_profit, current_price)
+            if result:
+                results[ticker] = result
+        return results
+
+
+print("✅ MonteCarloSimulator (블록 부트스트랩 손익 목표 시뮬레이션)")
@@ -0,0 +1,299 @@
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import pandas as pd
+import numpy as np
+
+from config import settings
+from .backtest import VectorizedBacktester
+from .indicator_engine import CrossSectionalIndicatorEngine
+
+
+# 지표 기간 (바뀌면 지표 재계산 필요)
+PERIOD_PARAMS = {
+    'ema_fast': settings.MACD_FAST,
+    'ema_slow': settings.MACD_SLOW,
+    'macd_signal': settings.MACD_SIGNAL,
+    'rsi_period': settings.RSI_PERIOD,
+    'bb_period': settings.BOLLINGER_PERIOD,
+    'bb_std': settings.BOLLINGER_STD,
+    'volume_period': 20,
+}
+
+# 점수 가중치 (파라미터 이름 → CrossSectionalIndicatorEngine 신호 이름)
+WEIGHT_PARAMS = {
+    'w_above_ema12': "12일 EMA 상향",
+    'w_above_ema26': "26일 EMA 상향",
+    'w_golden_cross': "EMA 골든크로스",
+    'w_rsi_normal': "RSI 양호",
+    'w_oversold': "과매도 구간",
+    'w_in_band': "볼린저 적정구간",
+    'w_band_low': "볼린저 하단 접촉",
+    'w_macd_up': "MACD 상승신호",
+    'w_volume_surge': "거래량 급증",
+    'w_momentum_5d': "5일 상승 모멘텀",
+}
+
+# 신호 판정 기준
+THRESHOLD_PARAMS = list(CrossSectionalIndicatorEngine.DEFAULT_THRESHOLDS)
+
+# 선정/재검토/청산 규칙 (VectorizedBacktester 인자)
+# recheck_min_confidence는 신뢰도 = 점수/10이라 recheck_min_score와 같은 축이므로 탐색 대상에서 제외
+RULE_PARAMS = {
+    'min_score': 7.0,
+    'max_picks': settings.MAX_STOCKS_ANALYSIS,
+    'max_holding_days': 10,
+    'max_gap_pct': 8.0,
+    'recheck_min_score': settings.MIN_TECHNICAL_SCORE,
+    'recheck_min_rsi': 15.0,
+    'drop_on_dead_cross': True,
+}
+
+DEFAULT_PARAMS = {
+    **PERIOD_PARAMS,
+    **{name: CrossSectionalIndicatorEngine.DEFAULT_WEIGHTS[label] for name, label in WEIGHT_PARAMS.items()},
+    **CrossSectionalIndicatorEngine.DEFAULT_THRESHOLDS,
+    **RULE_PARAMS,
+}
+
+
+def param_id(params):
+    """파라미터 조합 고유 ID (체크포인트 재개용)"""
+    encoded = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+def validate_params(params):
+    """알 수 없는 파라미터 이름 거부 (오타가 기본값으로 조용히 실행되는 것 방지)"""
+    unknown = sorted(set(params) - set(DEFAULT_PARAMS))
+    if unknown:
+        raise ValueError(f"알 수 없는 파라미터: {', '.join(unknown)}")
+
+
+def build_backtester(params, cost_bps=0.0):
+    """파라미터 조합 → VectorizedBacktester"""
+    validate_params(params)
+    params = {**DEFAULT_PARAMS, **params}
+    engine = CrossSectionalIndicatorEngine(**{name: params[name] for name in PERIOD_PARAMS})
+    return VectorizedBacktester(
+        indicator_engine=engine,
+        score_weights={label: params[name] for name, label in WEIGHT_PARAMS.items()},
+        score_thresholds={name: params[name] for name in THRESHOLD_PARAMS},
+        cost_bps=cost_bps,
+        **{name: params[name] for name in RULE_PARAMS}
+    )
+
+
+# ---- 작업 프로세스 (공유 메모리 패널 읽기 전용 참조) ----
+
+_worker_panel = None
+_worker_segments = []
+_worker_indicators = {}
+_WORKER_INDICATOR_CACHE = 4
+
+
+def _attach_panel(spec):
+    """공유 메모리 배열로 패널 구성 (복사 없음, 쓰기 금지)"""
+    index = pd.DatetimeIndex(spec['index'])
+    panel = {}
+    segments = []
+    for field, (name, shape, dtype) in spec['arrays'].items():
+        segment = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        array.flags.writeable = False
+        panel[field] = pd.DataFrame(array, index=index, columns=spec['columns'], copy=False)
+        segments.append(segment)
+    return panel, segments
+
+
+def _init_worker(spec):
+    global _worker_panel, _worker_segments
+    _worker_panel, _worker_segments = _attach_panel(spec)
+
+
+def _run_params(params, cost_bps):
+    """파라미터 조합 1개 평가 (같은 지표 기간의 지표는 프로세스 내 재사용)"""
+    started = time.perf_counter()
+    try:
+        backtester = build_backtester(params, cost_bps)
+
+        period_key = tuple({**DEFAULT_PARAMS, **params}[name] for name in PERIOD_PARAMS)
+        indicators = _worker_indicators.get(period_key)
+        if indicators is None:
+            indicators = backtester.compute_indicators(_worker_panel)
+            if len(_worker_indicators) >= _WORKER_INDICATOR_CACHE:
+                _worker_indicators.pop(next(iter(_worker_indicators)))
+            _worker_indicators[period_key] = indicators
+
+        summary = backtester.run(_worker_panel, indicators)['summary']
+    except Exception as e:
+        summary = {'error': str(e)}
+
+    return param_id(params), params, summary, round(time.perf_counter() - started, 3)
+
+
+class ParameterSweep:
+    """점수 가중치/재검토 규칙/지표 기간 파라미터 탐색 (프로세스 풀 + 공유 메모리 패널 + JSONL 체크포인트)"""
+
+    def __init__(self, panel, checkpoint_file="data/param_sweep.jsonl", workers=None, cost_bps=0.0):
+        self.panel = panel
+        self.checkpoint_file = checkpoint_file
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.cost_bps = cost_bps
+        self.logger = logging.getLogger(__name__)
+
+        os.makedirs(os.path.dirname(checkpoint_file) or '.', exist_ok=True)
+
+    @staticmethod
+    def grid(space):
+        """격자 탐색 조합 (space: {파라미터: 후보 목록})"""
+        validate_params(space)
+        names = list(space)
+        return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+    @staticmethod
+    def sample(space, count, seed=42):
+        """무작위 탐색 조합 (후보 목록에서 중복 없이 count개)"""
+        validate_params(space)
+        rng = random.Random(seed)
+        names = list(space)
+        total = int(np.prod([len(space[name]) for name in names])) if names else 0
+
+        seen = set()
+        samples = []
+        while len(samples) < min(count, total):
+            params = {name: rng.choice(space[name]) for name in names}
+            key = param_id(params)
+            if key not in seen:
+                seen.add(key)
+                samples.append(params)
+        return samples
+
+    def load_results(self):
+        """체크포인트에 기록된 결과 (param_id → 기록, 오류 기록은 제외하여 재실행)"""
+        results = {}
+        if not os.path.exists(self.checkpoint_file):
+            return results
+
+        with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    if 'error' in record['summary']:
+                        continue  # 이전 버전이 기록한 오류 결과
+                    results[record['param_id']] = record
+                except Exception:
+                    continue  # 중단으로 잘린 마지막 줄
+        return results
+
+    def _share_panel(self):
+        """패널 필드를 공유 메모리로 복사 (작업 프로세스는 읽기 전용 참조)"""
+        close = self.panel['Close']
+        spec = {'index': close.index.to_numpy(), 'columns': list(close.columns), 'arrays': {}}
+        segments = []
+        for field in VectorizedBacktester.FIELDS:
+            data = np.ascontiguousarray(self.panel[field].reindex(index=close.index, columns=close.columns),
+                                        dtype=np.float64)
+            segment = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+            np.ndarray(data.shape, dtype=data.dtype, buffer=segment.buf)[:] = data
+            spec['arrays'][field] = (segment.name, data.shape, data.dtype.str)
+            segments.append(segment)
+        return spec, segments
+
+    def run(self, param_sets, rank_by='sharpe', min_trades=30):
+        """파라미터 조합 평가 (체크포인트에 있는 조합은 건너뜀, 오류 조합은 기록하지 않아 재개 시 재시도) → 순위 테이블"""
+        for params in param_sets:
+            validate_params(params)
+
+        done = self.load_results()
+        pending = [params for params in param_sets if param_id(params) not in done]
+
+        # 같은 지표 기간끼리 연속 배치 (작업 프로세스 지표 캐시 재사용)
+        pending.sort(key=lambda params: tuple(str({**DEFAULT_PARAMS, **params}[name]) for name in PERIOD_PARAMS))
+
+        self.logger.info(f"파라미터 탐색: 전체 {len(param_sets)}개, 완료 {len(param_sets) - len(pending)}개, "
+                         f"남은 {len(pending)}개 (작업 프로세스 {self.workers}개)")
+
+        if pending:
+            spec, segments = self._share_panel()
+            started = time.time()
+            try:
+                with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                         initargs=(spec,)) as executor, \
+                        open(self.checkpoint_file, 'a', encoding='utf-8') as checkpoint:
+                    futures = [executor.submit(_run_params, params, self.cost_bps) for params in pending]
+                    for completed, future in enumerate(as_completed(futures), 1):
+                        key, params, summary, elapsed = future.result()
+                        record = {'param_id': key, 'params': params, 'summary': summary, 'elapsed': elapsed}
+                        done[key] = record
+                        if 'error' in summary:
+                            self.logger.warning(f"파라미터 조합 평가 실패 {key}: {summary['error']}")
+                        else:
+                            checkpoint.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                            checkpoint.flush()
+
+                        if completed % 50 == 0 or completed == len(pending):
+                            rate = completed / max(time.time() - started, 1e-9)
+                            eta = (len(pending) - completed) / rate
+                            self.logger.info(f"파라미터 탐색 진행: {completed}/{len(pending)} "
+                                             f"({rate:.2f}개/초, 남은 시간 {eta / 60:.0f}분)")
+            finally:
+                for segment in segments:
+                    segment.close()
+                    segment.unlink()
+
+        wanted = {param_id(params) for params in param_sets}
+        records = [record for key, record in done.items() if key in wanted]
+        inert = self.inert_params(records)
+        if inert:
+            self.logger.warning(f"결과에 영향 없는 파라미터 축: {', '.join(inert)} (탐색 공간에서 제외 권장)")
+        return self.rank(records, rank_by, min_trades)
+
+    @staticmethod
+    def inert_params(records):
+        """값을 바꿔도 요약 결과가 전혀 달라지지 않는 파라미터 (다른 파라미터가 같은 조합끼리 비교)"""
+        records = [record for record in records if 'error' not in record['summary']]
+        names = {name for record in records for name in record['params']}
+
+        inert = []
+        for name in sorted(names):
+            groups = {}
+            for record in records:
+                rest = {key: value for key, value in record['params'].items() if key != name}
+                groups.setdefault(param_id(rest), []).append(record)
+
+            varied = [group for group in groups.values()
+                      if len({json.dumps(record['params'].get(name), default=str) for record in group}) > 1]
+            if varied and all(len({json.dumps(record['summary'], sort_keys=True, default=str) for record in group}) == 1
+                              for group in varied):
+                inert.append(name)
+        return inert
+
+    @staticmethod
+    def rank(records, rank_by='sharpe', min_trades=30):
+        """결과 순위 테이블 (거래 수 부족/오류 조합은 하위)"""
+        rows = []
+        for record in records:
+            summary = {key: value for key, value in record['summary'].items() if not isinstance(value, dict)}
+            rows.append({'param_id': record['param_id'], **record['params'], **summary})
+        if not rows:
+            return pd.DataFrame()
+
+        table = pd.DataFrame(rows)
+        if rank_by not in table:
+            table[rank_by] = np.nan
+        eligible = table.get('trades', pd.Series(0, index=table.index)).fillna(0) >= min_trades
+        table['eligible'] = eligible
+        table = table.sort_values(['eligible', rank_by], ascending=[False, False], na_position='last')
+        table.insert(0, 'rank', range(1, len(table) + 1))
+        return table.reset_index(drop=True)
+
+
+print("✅ ParameterSweep (프로세스 풀 + 공유 메모리 파라미터 탐색)")
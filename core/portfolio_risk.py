@@ -0,0 +1,233 @@
+import logging
+from collections import deque
+from statistics import NormalDist
+
+import pandas as pd
+import numpy as np
+
+
+class PortfolioRiskEngine:
+    """유지 종목 포트폴리오 위험 분석 (수축 공분산, 변동성, VaR/CVaR, 한계 위험 기여도)"""
+
+    TRADING_DAYS = 252
+
+    def __init__(self, confidence=0.95, lookback=250, min_observations=30,
+                 concentration_limit=0.35, correlation_limit=0.7):
+        self.confidence = confidence
+        self.lookback = lookback                        # 공분산 추정 일수
+        self.min_observations = min_observations
+        self.concentration_limit = concentration_limit  # 종목별 위험 기여 비중 한도
+        self.correlation_limit = correlation_limit      # 고상관 종목 쌍 기준
+        self.logger = logging.getLogger(__name__)
+
+        self._z = NormalDist().inv_cdf(confidence)
+        self._tail_density = NormalDist().pdf(self._z) / (1 - confidence)
+
+    @staticmethod
+    def close_panel(frames):
+        """종목별 일봉 프레임 → 날짜×종목 종가 패널 (시간대 제거, 날짜 기준 정렬)"""
+        frames = {ticker: frame for ticker, frame in frames.items() if frame is not None and not frame.empty}
+        if not frames:
+            return pd.DataFrame()
+
+        panel = pd.concat({ticker: frame['Close'] for ticker, frame in frames.items()}, axis=1)
+        index = pd.DatetimeIndex(panel.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        panel.index = index.normalize()
+        return panel.groupby(level=0).last().sort_index()
+
+    def returns_matrix(self, closes):
+        """일간 수익률 행렬 (전 종목 공통 거래일, 최근 lookback일)"""
+        returns = closes.pct_change(fill_method=None).iloc[1:].dropna(how='any')
+        return returns.iloc[-self.lookback:]
+
+    @staticmethod
+    def shrinkage_covariance(returns):
+        """Ledoit-Wolf 수축 공분산 (목표: 평균 분산 × 단위행렬) → (공분산, 수축 강도)"""
+        x = np.asarray(returns, dtype=float)
+        t, n = x.shape
+        x = x - x.mean(axis=0)
+        sample = x.T @ x / t
+
+        mu = np.trace(sample) / n
+        target = mu * np.eye(n)
+        d2 = np.sum((sample - target) ** 2) / n
+        if d2 <= 0:
+            return sample, 0.0
+
+        # 표본 공분산 추정 오차: Σ_t ||x_t x_tᵀ - S||² / T²
+        row_norms = np.einsum('ij,ij->i', x, x)
+        b2_bar = (np.sum(row_norms ** 2) - t * np.sum(sample ** 2)) / (t ** 2) / n
+        shrinkage = float(min(max(b2_bar, 0.0), d2) / d2)
+        return shrinkage * target + (1 - shrinkage) * sample, shrinkage
+
+    @staticmethod
+    def normalize_weights(tickers, weights=None):
+        """종목 비중 정규화 (없거나 합이 0이면 동일 비중)"""
+        if weights:
+            values = np.array([max(float(weights.get(ticker, 0) or 0), 0.0) for ticker in tickers])
+            if values.sum() > 0:
+                return values / values.sum()
+        return np.full(len(tickers), 1.0 / len(tickers)) if tickers else np.array([])
+
+    def risk_metrics(self, tickers, cov, weights, portfolio_returns=None):
+        """공분산/비중 기반 위험 지표 (1일 기준, 순수 파이썬 타입)"""
+        tickers = list(tickers)
+        portfolio_var = float(weights @ cov @ weights)
+        portfolio_vol = float(np.sqrt(max(portfolio_var, 0.0)))
+
+        # 한계/구성 위험 기여도 (구성 기여도 합 = 포트폴리오 변동성)
+        marginal = cov @ weights / portfolio_vol if portfolio_vol > 0 else np.zeros(len(tickers))
+        component = weights * marginal
+        contribution = component / portfolio_vol if portfolio_vol > 0 else np.zeros(len(tickers))
+
+        vols = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.where(np.outer(vols, vols) > 0, cov / np.outer(vols, vols), 0.0)
+        upper = np.triu_indices(len(tickers), k=1)
+        pair_corr = corr[upper]
+
+        high_pairs = sorted(
+            ((tickers[i], tickers[j], float(c)) for i, j, c in zip(upper[0], upper[1], pair_corr)
+             if c >= self.correlation_limit),
+            key=lambda pair: -pair[2]
+        )
+        concentrated = [(tickers[i], float(contribution[i])) for i in np.argsort(-contribution)
+                        if contribution[i] >= max(self.concentration_limit, 1.5 / len(tickers))]
+
+        metrics = {
+            'tickers': tickers,
+            'weights': {ticker: round(float(w), 4) for ticker, w in zip(tickers, weights)},
+            'volatility_daily': round(portfolio_vol * 100, 3),
+            'volatility_annual': round(portfolio_vol * np.sqrt(self.TRADING_DAYS) * 100, 2),
+            'var_parametric': round((self._z * portfolio_vol) * 100, 3),
+            'cvar_parametric': round((self._tail_density * portfolio_vol) * 100, 3),
+            'marginal_risk': {ticker: round(float(m) * 100, 4) for ticker, m in zip(tickers, marginal)},
+            'risk_contribution': {ticker: round(float(c), 4) for ticker, c in zip(tickers, contribution)},
+            'avg_correlation': round(float(pair_corr.mean()), 3) if len(pair_corr) else 0.0,
+            'diversification_ratio': round(float(weights @ vols / portfolio_vol), 3) if portfolio_vol > 0 else 1.0,
+            'effective_bets': round(float(1 / np.sum(np.clip(contribution, 0, None) ** 2)), 2)
+                              if np.any(contribution > 0) else float(len(tickers)),
+            'high_correlation_pairs': [[a, b, round(c, 3)] for a, b, c in high_pairs[:5]],
+            'concentration': [[ticker, round(c, 4)] for ticker, c in concentrated],
+        }
+
+        if portfolio_returns is not None and len(portfolio_returns) >= self.min_observations:
+            losses = -np.asarray(portfolio_returns, dtype=float)
+            var_hist = float(np.quantile(losses, self.confidence))
+            tail = losses[losses >= var_hist]
+            metrics['var_historical'] = round(var_hist * 100, 3)
+            metrics['cvar_historical'] = round(float(tail.mean()) * 100, 3) if len(tail) else metrics['var_historical']
+
+        metrics['risk_flags'] = self._risk_flags(metrics)
+        metrics['warnings'] = [flag['message'] for flag in metrics['risk_flags']]
+        return metrics
+
+    def _risk_flags(self, metrics):
+        """위험 경고 목록 [{code: 알림 코드, message: 표시 문구}]"""
+        flags = []
+        for ticker, share in metrics['concentration']:
+            flags.append({'code': f"CONCENTRATION_{ticker}",
+                          'message': f"{ticker} 위험 기여 {share * 100:.0f}% 집중"})
+        if metrics['high_correlation_pairs']:
+            pairs = ", ".join(f"{a}/{b}({c:.2f})" for a, b, c in metrics['high_correlation_pairs'][:3])
+            flags.append({'code': "HIGH_CORRELATION", 'message': f"고상관 종목 쌍: {pairs}"})
+        if metrics['avg_correlation'] >= self.correlation_limit:
+            flags.append({'code': "AVG_CORRELATION",
+                          'message': f"평균 상관계수 {metrics['avg_correlation']:.2f} - 사실상 단일 포지션"})
+        return flags
+
+    def analyze(self, frames, weights=None):
+        """종목별 일봉 프레임으로 포트폴리오 위험 분석 (데이터 부족 시 None)"""
+        closes = self.close_panel(frames)
+        if closes.empty:
+            return None
+
+        returns = self.returns_matrix(closes)
+        tickers = list(returns.columns)
+        if len(returns) < self.min_observations or not tickers:
+            self.logger.warning(f"포트폴리오 위험 분석 데이터 부족: {len(returns)}일")
+            return None
+
+        cov, shrinkage = self.shrinkage_covariance(returns.to_numpy())
+        w = self.normalize_weights(tickers, weights)
+        metrics = self.risk_metrics(tickers, cov, w, returns.to_numpy() @ w)
+        metrics['observations'] = int(len(returns))
+        metrics['shrinkage'] = round(shrinkage, 3)
+        # 갱신 실패로 저장된 봉만 사용한 종목 (최근 변동 미반영)
+        metrics['stale_tickers'] = sorted(ticker for ticker, frame in frames.items()
+                                          if frame is not None and frame.attrs.get('stale'))
+        if metrics['stale_tickers']:
+            metrics['warnings'].append(f"시세 갱신 실패 종목 포함 (최근 변동 미반영): {', '.join(metrics['stale_tickers'])}")
+        return metrics
+
+    def analyze_tickers(self, tickers, history_store, weights=None, period="1y"):
+        """저장소 일봉으로 포트폴리오 위험 분석 (누락 구간만 다운로드)"""
+        if len(tickers) < 1:
+            return None
+        frames = history_store.get_many(tickers, interval="1d", period=period)
+        return self.analyze(frames, weights)
+
+
+class EWMAPortfolioRiskState:
+    """EWMA 공분산 증분 갱신 상태 (새 확정 일봉만 반영, 형성 중인 봉은 조회만)"""
+
+    def __init__(self, engine, tickers, weights=None, decay=0.94):
+        self.engine = engine
+        self.tickers = list(tickers)
+        self.weights = engine.normalize_weights(self.tickers, weights)
+        self.decay = decay
+
+        self.cov = None
+        self.last_bar_time = None
+        self.last_closes = None
+        self.portfolio_returns = deque(maxlen=engine.lookback)
+        self.metrics = None
+        self.updates = 0
+
+    def sync(self, closes, forming=True):
+        """날짜×종목 종가 패널 동기화 (forming: 마지막 행이 당일 형성 중인 봉인지, 아니면 확정 봉으로 반영)"""
+        closes = closes.reindex(columns=self.tickers)
+        confirmed = (closes.iloc[:-1] if forming else closes).dropna(how='any')
+        if confirmed.empty:
+            return
+
+        if self.cov is None:
+            returns = self.engine.returns_matrix(confirmed)
+            if len(returns) < self.engine.min_observations:
+                return
+            # 최초 동기화는 수축 공분산으로 시드
+            self.cov, _ = self.engine.shrinkage_covariance(returns.to_numpy())
+            self.portfolio_returns.extend(returns.to_numpy() @ self.weights)
+        else:
+            new_rows = confirmed[confirmed.index > self.last_bar_time]
+            if new_rows.empty:
+                return
+            prices = np.vstack([self.last_closes, new_rows.to_numpy(dtype=float)])
+            for r in prices[1:] / prices[:-1] - 1:
+                self.cov = self.decay * self.cov + (1 - self.decay) * np.outer(r, r)
+                self.portfolio_returns.append(float(r @ self.weights))
+                self.updates += 1
+
+        self.last_bar_time = confirmed.index[-1]
+        self.last_closes = confirmed.iloc[-1].to_numpy(dtype=float)
+        self.metrics = self.engine.risk_metrics(self.tickers, self.cov, self.weights, list(self.portfolio_returns))
+
+    def snapshot(self, live_prices):
+        """현재가 반영 포트폴리오 당일 수익률 + 최근 위험 지표 (시드 전이면 None, 현재가 없는 종목은 수익률 0)"""
+        if self.metrics is None:
+            return None
+
+        live = np.array([live_prices.get(ticker, np.nan) for ticker in self.tickers], dtype=float)
+        live = np.where(np.isnan(live), self.last_closes, live)
+        returns = live / self.last_closes - 1
+        return {
+            **self.metrics,
+            'intraday_return': round(float(returns @ self.weights) * 100, 3),
+            'intraday_contribution': {ticker: round(float(r * w) * 100, 3)
+                                      for ticker, r, w in zip(self.tickers, returns, self.weights)},
+        }
+
+
+print("✅ PortfolioRiskEngine (수축 공분산 + VaR/CVaR + EWMA 증분 갱신)")
@@ -50,6 +50,134 @@ class AdvancedPositionEstimator:
             logging.error(f"포지션 분석 오류: {e}")
             return self._get_default_position(analysis_data)
     
+    def estimate_positions(self, df):
+        """후보 테이블 일괄 포지션 분석 (estimate_optimal_position과 동일한 규칙, 행 단위 결과 테이블)"""
+        n = len(df)
+        index = df.index
+        
+        def column(name, default):
+            if name not in df:
+                return np.full(n, float(default))
+            values = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float)
+            return np.where(np.isnan(values), default, values)
+        
+        def count(name):
+            # 신호 목록 컬럼(list) 또는 개수 컬럼(*_count) 모두 허용
+            if name in df:
+                return df[name].str.len().fillna(0).to_numpy(dtype=float)
+            return column(f"{name[:-len('_signals')]}_count", 0)
+        
+        score = column('score', 5)
+        confidence = column('confidence', 0.5)
+        rsi = column('rsi', 50)
+        macd_signal = column('macd_signal', 0)
+        volume_ratio = column('volume_ratio', 1.0)
+        urgent_level = column('urgent_level', 0)
+        urgent_buy = count('urgent_buy_signals')
+        urgent_sell = count('urgent_sell_signals')
+        
+        price_given = column('current_price', np.nan)
+        current_price = np.where(np.isnan(price_given), 100.0, price_given)
+        volatility = column('volatility', 0.05)
+        bb_upper = column('bb_upper', np.nan)
+        bb_upper = np.where(np.isnan(bb_upper), current_price * 1.1, bb_upper)
+        bb_lower = column('bb_lower', np.nan)
+        bb_lower = np.where(np.isnan(bb_lower), current_price * 0.9, bb_lower)
+        
+        # 1. 신호 강도 (_analyze_signals)
+        buy_strength = (
+            np.select([score >= 8, score >= 7, score >= 6, score >= 5], [4, 3, 2, 1], 0)
+            + np.select([rsi < 25, rsi < 30, rsi < 40], [3, 2, 1], 0)
+            + np.select([macd_signal > 0.5, macd_signal > 0], [2, 1], 0)
+            + np.select([volume_ratio > 3, volume_ratio > 2], [2, 1], 0)
+            + np.minimum(urgent_buy, 3)
+        )
+        sell_strength = (
+            np.select([score <= 2, score <= 3, score <= 4, score <= 5], [4, 3, 2, 1], 0)
+            + np.select([rsi > 75, rsi > 70, rsi > 60], [3, 2, 1], 0)
+            + np.select([macd_signal < -0.5, macd_signal < 0], [2, 1], 0)
+            + np.minimum(urgent_sell, 3)
+        )
+        buy_strength = buy_strength.astype(int)
+        sell_strength = sell_strength.astype(int)
+        net_signal = buy_strength - sell_strength
+        win_probability = np.clip(score * confidence / 10, 0.15, 0.85)
+        
+        # 2. 리스크 (_calculate_risk)
+        risk_level = np.select(
+            [volatility > 0.20, volatility > 0.15, volatility > 0.10, volatility > 0.05],
+            ['EXTREME', 'VERY_HIGH', 'HIGH', 'MEDIUM'], 'LOW'
+        )
+        with np.errstate(divide='ignore'):
+            risk_multiplier = np.clip(1 / (volatility * 20 + 0.1), 0.1, 2.0)
+        
+        # 3. 포지션 크기 (_calculate_position_size)
+        kelly_fraction = np.where(win_probability > 0.5, np.clip(win_probability * 2 - 1, 0, 0.25), 0.0)
+        signal_multiplier = np.clip(np.abs(net_signal) / 5, 0.1, 2.0)
+        base_position = self.total_capital * self.risk_per_trade * signal_multiplier
+        optimal_position = base_position * (1 + kelly_fraction) * risk_multiplier
+        max_allowed = self.total_capital * self.max_position_per_stock
+        final_position = np.minimum(np.maximum(optimal_position, self.min_position), max_allowed)
+        
+        # 4. 진입/청산 타이밍 (_predict_timing)
+        entry_timing = np.select(
+            [(net_signal > 5) | (urgent_level >= 5), (net_signal > 3) | (urgent_level >= 4),
+             net_signal > 0, net_signal > -3],
+            ['IMMEDIATE', 'SOON', 'WAIT', 'REDUCE'], 'EXIT'
+        )
+        exit_timing = np.select(
+            [(rsi > 80) | (urgent_level >= 5), (rsi > 70) | (urgent_level >= 4), rsi < 20],
+            ['IMMEDIATE', 'PARTIAL', 'HOLD'], 'MONITOR'
+        )
+        
+        # 5. 손익 구간 (_calculate_profit_targets)
+        targets = self.profit_target_arrays(current_price, volatility, bb_upper, bb_lower)
+        
+        # 최종 추천 (_get_recommendation)
+        recommendation = np.select(
+            [(net_signal >= 6) & (confidence > 0.8), (net_signal >= 4) & (confidence > 0.7), net_signal >= 2,
+             (net_signal <= -6) & (confidence > 0.8), (net_signal <= -4) & (confidence > 0.7), net_signal <= -2],
+            ['STRONG_BUY', 'BUY', 'WEAK_BUY', 'STRONG_SELL', 'SELL', 'WEAK_SELL'], 'HOLD'
+        )
+        
+        result = pd.DataFrame({
+            'ticker': df['ticker'].to_numpy() if 'ticker' in df else np.asarray(index).astype(str),
+            'current_price': np.where(np.isnan(price_given), 0.0, price_given),
+            'position_recommendation': recommendation,
+            'dollar_amount': np.round(final_position, 2),
+            'percentage': np.round(final_position / self.total_capital * 100, 2),
+            'shares': (final_position / np.maximum(1, current_price)).astype(int),
+            'kelly_component': np.round(kelly_fraction * 100, 2),
+            'signal_strength': np.round(signal_multiplier, 2),
+            'risk_adjustment': np.round(risk_multiplier, 2),
+            'risk_level': risk_level,
+            'entry_timing': entry_timing,
+            'exit_timing': exit_timing,
+            'stop_loss': np.round(targets['stop_loss'], 2),
+            'take_profit': np.round(targets['take_profit'], 2),
+            'stop_loss_pct': np.round(targets['stop_loss_pct'], 1),
+            'expected_return': np.round(targets['expected_return'], 1),
+            'risk_reward_ratio': np.round(targets['risk_reward_ratio'], 2),
+            'win_probability': win_probability,
+            'confidence_score': confidence,
+            'buy_strength': np.minimum(buy_strength, 10),
+            'sell_strength': np.minimum(sell_strength, 10),
+            'net_signal': net_signal,
+        }, index=index)
+        
+        # 현재가가 0 이하인 행은 오류 시 기본 포지션과 동일하게 처리
+        invalid = ~(current_price > 0)
+        if invalid.any():
+            result.loc[invalid, ['dollar_amount', 'percentage', 'shares', 'stop_loss', 'take_profit',
+                                 'stop_loss_pct', 'expected_return', 'risk_reward_ratio']] = 0
+            result.loc[invalid, 'position_recommendation'] = 'HOLD'
+            result.loc[invalid, 'risk_level'] = 'UNKNOWN'
+            result.loc[invalid, 'entry_timing'] = 'WAIT'
+            result.loc[invalid, 'exit_timing'] = 'MONITOR'
+            result.loc[invalid, ['win_probability', 'confidence_score']] = 0.5
+        
+        return result
+    
     def _analyze_signals(self, data):
         """신호 강도 분석"""
         score = data.get('score', 5)
@@ -270,6 +398,41 @@ class AdvancedPositionEstimator:
             'atr_estimate': round(atr_estimate, 2)
         }
     
+    def profit_target_arrays(self, current_price, volatility, bb_upper, bb_lower):
+        """동적 손익 목표 일괄 계산 (_calculate_profit_targets와 동일한 규칙, 배열 입력, 반올림 없음)"""
+        current_price = np.asarray(current_price, dtype=float)
+        volatility = np.asarray(volatility, dtype=float)
+        bb_upper = np.asarray(bb_upper, dtype=float)
+        bb_lower = np.asarray(bb_lower, dtype=float)
+        
+        atr_estimate = current_price * volatility * 2
+        
+        stop_loss = np.maximum.reduce([
+            current_price - (atr_estimate * 1.5),
+            bb_lower * 0.98,
+            current_price * 0.95
+        ])
+        take_profit = np.minimum.reduce([
+            current_price + (atr_estimate * 2.5),
+            bb_upper * 1.02,
+            current_price * 1.10
+        ])
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected_return = (take_profit - current_price) / current_price * 100
+            downside_risk = (current_price - stop_loss) / current_price * 100
+            risk_reward_ratio = np.where(downside_risk > 0, np.abs(expected_return / downside_risk), 0.0)
+        
+        return {
+            'stop_loss': stop_loss,
+            'take_profit': take_profit,
+            'stop_loss_pct': -downside_risk,
+            'take_profit_pct': expected_return,
+            'expected_return': expected_return,
+            'risk_reward_ratio': risk_reward_ratio,
+            'atr_estimate': atr_estimate
+        }
+    
     def _get_recommendation(self, signals):
         """최종 매매 추천"""
         net_signal = signals['net_signal']
@@ -1,15 +1,48 @@
-import yfinance as yf
-import time
-import threading
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 
+from .history_store import OHLCVHistoryStore
+from .job_scheduler import AsyncJobScheduler
+from .market_data_bus import MarketDataBus
+from .dedup_store import TTLDedupStore
+from .streaming_indicators import IntradayRiskState, DailyLevelState
+from .portfolio_risk import PortfolioRiskEngine, EWMAPortfolioRiskState
+from utils.time_utils import get_now_est, get_us_market_status, get_session_poll_interval, seconds_until_next_session_boundary
+
 class RealtimeRiskMonitor:
-    def __init__(self, telegram_bot, portfolio_tickers):
+    # 요약 알림 전송 순서 및 (제목, 맺음말)
+    DIGEST_ORDER = ['URGENT_SELL', 'URGENT_BUY', 'WARNING', 'INFO']
+    DIGEST_TEMPLATES = {
+        'URGENT_SELL': ("🔴 긴급 매도 신호 요약 🔴", "💸 신속한 매도 검토 바랍니다"),
+        'URGENT_BUY': ("🟢 긴급 매수 신호 요약 🟢", "💰 신중한 매수 검토 바랍니다"),
+        'WARNING': ("💡 Alpha Seeker 주의 신호 요약", "📝 참고사항: 지속적 모니터링 권장"),
+        'INFO': ("ℹ️ Alpha Seeker 정보 알림 요약", "📝 시장 환경 참고 정보"),
+    }
+    
+    def __init__(self, telegram_bot, portfolio_tickers, history_store=None, portfolio_weights=None):
         self.telegram_bot = telegram_bot
         self.portfolio_tickers = portfolio_tickers or []
+        self.portfolio_weights = portfolio_weights
+        self.history_store = history_store or OHLCVHistoryStore()
         self.monitoring = False
-        self.alert_history = {}  # 중복 알림 방지
+        # 중복 알림 방지 (같은 알림은 30분에 한 번, 재시작 후에도 유지)
+        self.alert_history = TTLDedupStore(ttl=30 * 60, max_entries=10000, db_path="data/alert_history.db")
+        
+        # 종목별 증분 지표 상태 (새 봉만 반영)
+        self.intraday_states = {}
+        self.daily_states = {}
+        
+        # 포트폴리오 EWMA 공분산 상태 (최초 1회 수축 공분산 시드 후 새 일봉만 반영)
+        self.portfolio_risk_engine = PortfolioRiskEngine()
+        self.portfolio_risk_state = None
+        self.announced_risk_flags = set()  # 현재 종목 구성에서 이미 알린 구조적 위험 코드 (집중/고상관)
+        
+        # 단일 asyncio 루프 스케줄러 + 공유 시세 버스 (포트폴리오/시장/VIX 구독)
+        self.scheduler = None
+        # 구독자는 알림 목록을 반환하고 틱 종료 시 한 번에 등급별 요약 전송
+        self.market_data_bus = MarketDataBus(self.history_store, on_tick=self._dispatch_tick_alerts)
+        self.market_tickers = ['SPY', 'QQQ', 'IWM']
+        self.extended_hours_factor = 3  # 프리/애프터마켓 폴링 간격 배수
         
         # 위험 임계값 설정
         self.risk_thresholds = {
@@ -33,57 +66,93 @@ class RealtimeRiskMonitor:
             return False
         
         self.monitoring = True
+        self.scheduler = AsyncJobScheduler(name="realtime-risk-monitor")
         
+        # 구독자별 필요 종목/간격 등록 (틱마다 간격별 1회 일괄 조회 후 스냅샷 공유)
+        # 간격은 정규장 기준 (프리/애프터마켓은 완화, 휴장 중에는 다음 세션까지 대기)
         # 1. 포트폴리오 모니터링 (3분 간격)
-        portfolio_thread = threading.Thread(target=self._monitor_portfolio, daemon=True)
-        portfolio_thread.start()
+        self.market_data_bus.subscribe('portfolio', self.portfolio_tickers, {'1h': '5d', '1d': '10d'},
+                                       self._monitor_portfolio, every=self._session_interval(180))
+        
+        # 2. 포트폴리오 위험 모니터링 (3분 간격, 2종목 이상)
+        if len(self.portfolio_tickers) >= 2:
+            self.market_data_bus.subscribe('portfolio-risk', self.portfolio_tickers, {'1d': '1y'},
+                                           self._monitor_portfolio_risk, every=self._session_interval(180))
         
-        # 2. 시장 전반 모니터링 (10분 간격)
-        market_thread = threading.Thread(target=self._monitor_market, daemon=True)
-        market_thread.start()
+        # 3. 시장 전반 모니터링 (10분 간격)
+        self.market_data_bus.subscribe('market', self.market_tickers, {'1h': '2d'},
+                                       self._monitor_market, every=self._session_interval(600))
         
-        # 3. VIX 모니터링 (15분 간격)
-        vix_thread = threading.Thread(target=self._monitor_vix, daemon=True)
-        vix_thread.start()
+        # 4. VIX 모니터링 (15분 간격)
+        self.market_data_bus.subscribe('vix', ['^VIX'], {'15m': '1d'},
+                                       self._monitor_vix, every=self._session_interval(900))
         
-        logging.info(f"실시간 위험 모니터링 시작: {len(self.portfolio_tickers)}개 종목")
+        # 가장 먼저 실행할 구독자 시점에 맞춰 틱 실행
+        self.scheduler.add_job('market-data', self.market_data_bus.tick,
+                               interval=self.market_data_bus.seconds_until_next_due, jitter=5,
+                               error_interval=self._session_interval(120),
+                               initial_delay=self._closed_market_delay)
+        
+        self.scheduler.start()
+        
+        market_status = get_us_market_status()['status']
+        logging.info(f"실시간 위험 모니터링 시작: {len(self.portfolio_tickers)}개 종목 (시장 상태: {market_status})")
         print(f"🔍 실시간 위험 모니터링 활성화: {', '.join(self.portfolio_tickers)}")
         return True
     
-    def _monitor_portfolio(self):
-        """포트폴리오 종목 실시간 모니터링"""
-        while self.monitoring:
-            try:
-                for ticker in self.portfolio_tickers:
-                    risk_alerts = self._analyze_ticker_risk(ticker)
+    def _session_interval(self, base_interval):
+        """시장 세션에 따라 매 주기 다시 계산되는 폴링 간격"""
+        return lambda: get_session_poll_interval(base_interval, extended_factor=self.extended_hours_factor)
+    
+    def _closed_market_delay(self):
+        """휴장 중 시작 시 다음 세션 경계까지 첫 실행 지연"""
+        if get_us_market_status()['status'] == 'closed':
+            return seconds_until_next_session_boundary()
+        return 0.0
+    
+    def _monitor_portfolio(self, snapshot):
+        """포트폴리오 종목 실시간 모니터링 (1회 주기)"""
+        try:
+            alerts = []
+            for ticker in self.portfolio_tickers:
+                alerts.extend(self._analyze_ticker_risk(ticker, snapshot))
+            
+            # 틱 종료 시 다른 구독자 알림과 합쳐 등급별 요약 전송
+            return alerts
                     
-                    for alert in risk_alerts:
-                        self._send_urgent_alert(alert)
-                
-                time.sleep(180)  # 3분 간격
-                
-            except Exception as e:
-                logging.error(f"포트폴리오 모니터링 오류: {e}")
-                time.sleep(120)
+        except Exception as e:
+            logging.error(f"포트폴리오 모니터링 오류: {e}")
+            raise
     
-    def _analyze_ticker_risk(self, ticker):
+    def _analyze_ticker_risk(self, ticker, snapshot):
         """개별 종목 위험 분석 (긴급 매수/매도 신호 통합)"""
         alerts = []
         
         try:
-            # 실시간 데이터 수집
-            stock = yf.Ticker(ticker)
-            
-            # 최근 5일, 1시간 간격 데이터
-            data_1h = stock.history(period="5d", interval="1h")
-            data_1d = stock.history(period="10d", interval="1d")
+            # 공유 스냅샷에서 조회 (최근 5일 1시간봉, 10일 일봉)
+            data_1h = snapshot.get(ticker, "1h", "5d")
+            data_1d = snapshot.get(ticker, "1d", "10d")
             
             if data_1h.empty or data_1d.empty or len(data_1h) < 10:
                 return alerts
             
+            # 갱신 실패로 지난 봉만 있으면 현재 상황처럼 알리지 않음
+            if self.history_store.is_stale(data_1h) or self.history_store.is_stale(data_1d):
+                logging.warning(f"{ticker} 시세 갱신 실패 - 위험 알림 생략")
+                return alerts
+            
             current_price = data_1h['Close'].iloc[-1]
             previous_close = data_1d['Close'].iloc[-2] if len(data_1d) >= 2 else current_price
             
+            # 증분 지표 갱신 (확정 봉만 반영, 형성 중인 마지막 봉은 조회만)
+            intraday_state = self.intraday_states.setdefault(ticker, IntradayRiskState())
+            intraday_state.sync(data_1h)
+            indicators = intraday_state.snapshot(float(current_price), float(data_1h['Volume'].iloc[-1]))
+            
+            daily_state = self.daily_states.setdefault(ticker, DailyLevelState())
+            daily_state.sync(data_1d)
+            levels = daily_state.snapshot(float(current_price))
+            
             # 1. 급락/갭다운 검사
             gap_pct = (current_price - previous_close) / previous_close
             if gap_pct <= self.risk_thresholds['price_crash']:
@@ -112,7 +181,7 @@ class RealtimeRiskMonitor:
                 })
             
             # 2. RSI 극단값 검사
-            rsi = self._calculate_rsi(data_1h['Close'])
+            rsi = indicators['rsi'] if indicators['rsi'] is not None else 50
             if rsi <= self.risk_thresholds['rsi_oversold']:
                 alerts.append({
                     'type': 'URGENT_BUY',
@@ -131,9 +200,9 @@ class RealtimeRiskMonitor:
                 })
             
             # 3. 거래량 이상 검사
-            if len(data_1h) >= 20:
+            if indicators['volume_avg'] is not None:
                 current_volume = data_1h['Volume'].iloc[-1]
-                avg_volume = data_1h['Volume'].rolling(20).mean().iloc[-1]
+                avg_volume = indicators['volume_avg']
                 
                 volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
                 
@@ -172,9 +241,9 @@ class RealtimeRiskMonitor:
                     })
             
             # 4. 지지선/저항선 이탈 검사
-            if len(data_1d) >= 50:
-                sma_20 = data_1d['Close'].rolling(20).mean().iloc[-1]
-                sma_50 = data_1d['Close'].rolling(50).mean().iloc[-1]
+            if levels['sma_50'] is not None:
+                sma_20 = levels['sma_20']
+                sma_50 = levels['sma_50']
                 
                 support_break = (current_price - sma_50) / sma_50
                 resistance_break = (current_price - sma_20) / sma_20
@@ -198,15 +267,12 @@ class RealtimeRiskMonitor:
                     })
             
             # 5. 추가 기술적 분석 기반 신호 (간단 버전)
-            if len(data_1h) >= 24:  # 24시간 이상 데이터
-                ema_12 = data_1h['Close'].ewm(span=12).mean()
-                ema_26 = data_1h['Close'].ewm(span=26).mean()
-                
+            if indicators['bar_count'] >= 24:  # 24시간 이상 데이터
                 # 현재와 이전 EMA 크로스오버 감지
-                current_ema12 = ema_12.iloc[-1]
-                current_ema26 = ema_26.iloc[-1]
-                prev_ema12 = ema_12.iloc[-2]
-                prev_ema26 = ema_26.iloc[-2]
+                current_ema12 = indicators['ema_12']
+                current_ema26 = indicators['ema_26']
+                prev_ema12 = indicators['prev_ema_12']
+                prev_ema26 = indicators['prev_ema_26']
                 
                 # 골든크로스 감지
                 if current_ema12 > current_ema26 and prev_ema12 <= prev_ema26:
@@ -233,116 +299,256 @@ class RealtimeRiskMonitor:
         
         return alerts
     
-    def _monitor_market(self):
-        """시장 전반 모니터링"""
-        while self.monitoring:
-            try:
-                # SPY, QQQ, IWM 주요 지수 모니터링
-                market_tickers = ['SPY', 'QQQ', 'IWM']
-                
-                for ticker in market_tickers:
-                    stock = yf.Ticker(ticker)
-                    data = stock.history(period="2d", interval="1h")
-                    
-                    if not data.empty and len(data) >= 2:
-                        current = data['Close'].iloc[-1]
-                        previous = data['Close'].iloc[-2]
-                        change_pct = (current - previous) / previous * 100
-                        
-                        if change_pct <= -3:  # 3% 이상 급락
-                            self._send_urgent_alert({
-                                'type': 'EMERGENCY',
-                                'ticker': ticker,
-                                'alert': 'MARKET_CRASH',
-                                'value': change_pct,
-                                'message': f"시장 급락 감지: {ticker} {change_pct:+.1f}%"
-                            })
-                        elif change_pct <= -1.5:  # 1.5% 이상 하락
-                            self._send_urgent_alert({
-                                'type': 'URGENT_SELL',
-                                'ticker': ticker,
-                                'alert': 'MARKET_DECLINE',
-                                'value': change_pct,
-                                'message': f"시장 하락 신호: {ticker} {change_pct:+.1f}%"
-                            })
-                        elif change_pct >= 2:  # 2% 이상 상승
-                            self._send_urgent_alert({
-                                'type': 'URGENT_BUY',
-                                'ticker': ticker,
-                                'alert': 'MARKET_RALLY',
-                                'value': change_pct,
-                                'message': f"시장 상승 신호: {ticker} {change_pct:+.1f}%"
-                            })
-                
-                time.sleep(600)  # 10분 간격
-                
-            except Exception as e:
-                logging.error(f"시장 모니터링 오류: {e}")
-                time.sleep(300)
+    def _monitor_portfolio_risk(self, snapshot):
+        """포트폴리오 VaR/CVaR 및 위험 집중 모니터링 (1회 주기)"""
+        try:
+            frames = {ticker: snapshot.get(ticker, "1d", "1y") for ticker in self.portfolio_tickers}
+            closes = self.portfolio_risk_engine.close_panel(frames)
+            if closes.empty or len(closes) < 2:
+                return
+            
+            # 첫 틱에 조회 실패한 종목이 이후 들어오면 상태 재구성 (종목 구성 변경 시)
+            tickers = list(closes.columns)
+            if self.portfolio_risk_state is None or self.portfolio_risk_state.tickers != tickers:
+                if self.portfolio_risk_state is not None:
+                    logging.info(f"포트폴리오 위험 상태 재구성: {', '.join(tickers)}")
+                self.portfolio_risk_state = EWMAPortfolioRiskState(
+                    self.portfolio_risk_engine, tickers, self.portfolio_weights
+                )
+                self.announced_risk_flags = set()
+            state = self.portfolio_risk_state
+            
+            # 마지막 행이 오늘(뉴욕) 정규장 개장 이후 봉일 때만 형성 중인 봉 (프리마켓에는 전일 확정 봉)
+            forming = self._is_forming_daily_bar(closes.index[-1])
+            state.sync(closes, forming=forming)
+            
+            # 형성 중인 일봉 종가 = 현재가 (확정 봉만 있으면 당일 수익률 0)
+            live_prices = closes.iloc[-1].to_dict() if forming else {}
+            risk = state.snapshot(live_prices)
+            if risk is None:
+                return
+            
+            # 갱신 실패 종목이 있으면 당일 손실 계산이 틀릴 수 있으므로 알림 생략 (상태 동기화는 유지)
+            stale = [ticker for ticker, frame in frames.items() if self.history_store.is_stale(frame)]
+            if stale:
+                logging.warning(f"포트폴리오 시세 갱신 실패 ({', '.join(stale)}) - 위험 알림 생략")
+                return
+            
+            return self._portfolio_risk_alerts(risk)
+            
+        except Exception as e:
+            logging.error(f"포트폴리오 위험 모니터링 오류: {e}")
+            raise
     
-    def _monitor_vix(self):
-        """VIX 변동성 지수 모니터링"""
-        while self.monitoring:
-            try:
-                vix = yf.Ticker('^VIX')
-                data = vix.history(period="1d", interval="15m")
+    @staticmethod
+    def _is_forming_daily_bar(bar_date):
+        """일봉 날짜가 오늘 뉴욕 세션이고 정규장이 열린 뒤인지"""
+        if bar_date.date() != get_now_est().date():
+            return False
+        return get_us_market_status()['status'] in ('open', 'after_market')
+    
+    def _portfolio_risk_alerts(self, risk):
+        """포트폴리오 위험 지표 → 알림 (당일 손실이 VaR/CVaR 초과는 매 틱, 위험 집중/고상관은 종목 구성별 1회)"""
+        alerts = []
+        loss = -risk['intraday_return']
+        var = risk.get('var_historical', risk['var_parametric'])
+        cvar = max(risk.get('cvar_historical', risk['cvar_parametric']), var)
+        
+        if loss >= cvar:
+            alerts.append({
+                'type': 'EMERGENCY',
+                'ticker': 'PORTFOLIO',
+                'alert': 'PORTFOLIO_CVAR_BREACH',
+                'value': risk['intraday_return'],
+                'message': f"포트폴리오 손실 {risk['intraday_return']:+.2f}% - CVaR95 {cvar:.2f}% 초과 (꼬리 위험 구간)"
+            })
+        elif loss >= var:
+            worst = min(risk['intraday_contribution'].items(), key=lambda item: item[1])
+            alerts.append({
+                'type': 'URGENT_SELL',
+                'ticker': 'PORTFOLIO',
+                'alert': 'PORTFOLIO_VAR_BREACH',
+                'value': risk['intraday_return'],
+                'message': f"포트폴리오 손실 {risk['intraday_return']:+.2f}% - VaR95 {var:.2f}% 초과 "
+                           f"(최대 기여: {worst[0]} {worst[1]:+.2f}%p)"
+            })
+        
+        # 집중/고상관은 세션 중 거의 변하지 않으므로 종목 구성별로 처음 나타날 때만 알림
+        for flag in risk['risk_flags']:
+            if flag['code'] in self.announced_risk_flags:
+                continue
+            self.announced_risk_flags.add(flag['code'])
+            alerts.append({
+                'type': 'WARNING',
+                'ticker': 'PORTFOLIO',
+                'alert': f"PORTFOLIO_{flag['code']}",
+                'value': risk['volatility_annual'],
+                'message': f"{flag['message']} (연 변동성 {risk['volatility_annual']:.1f}%)"
+            })
+        return alerts
+    
+    def _monitor_market(self, snapshot):
+        """시장 전반 모니터링 (1회 주기)"""
+        alerts = []
+        try:
+            # SPY, QQQ, IWM 주요 지수 모니터링
+            for ticker in self.market_tickers:
+                data = snapshot.get(ticker, "1h", "2d")
                 
-                if not data.empty:
-                    current_vix = data['Close'].iloc[-1]
+                if self.history_store.is_stale(data):
+                    logging.warning(f"{ticker} 시세 갱신 실패 - 시장 알림 생략")
+                    continue
+                
+                if not data.empty and len(data) >= 2:
+                    current = data['Close'].iloc[-1]
+                    previous = data['Close'].iloc[-2]
+                    change_pct = (current - previous) / previous * 100
                     
-                    if current_vix >= 35:  # VIX 35 이상 (극도 공포)
-                        self._send_urgent_alert({
+                    if change_pct <= -3:  # 3% 이상 급락
+                        alerts.append({
                             'type': 'EMERGENCY',
-                            'ticker': 'VIX',
-                            'alert': 'VIX_EXTREME',
-                            'value': current_vix,
-                            'message': f"VIX 극도 공포: {current_vix:.1f} (시장 패닉 상태 - 매수 기회 가능성)"
+                            'ticker': ticker,
+                            'alert': 'MARKET_CRASH',
+                            'value': change_pct,
+                            'message': f"시장 급락 감지: {ticker} {change_pct:+.1f}%"
                         })
-                    elif current_vix >= self.risk_thresholds['vix_spike']:
-                        self._send_urgent_alert({
+                    elif change_pct <= -1.5:  # 1.5% 이상 하락
+                        alerts.append({
                             'type': 'URGENT_SELL',
-                            'ticker': 'VIX',
-                            'alert': 'VIX_SPIKE',
-                            'value': current_vix,
-                            'message': f"VIX 공포지수 급등: {current_vix:.1f} (변동성 증가 - 주의 필요)"
+                            'ticker': ticker,
+                            'alert': 'MARKET_DECLINE',
+                            'value': change_pct,
+                            'message': f"시장 하락 신호: {ticker} {change_pct:+.1f}%"
                         })
-                    elif current_vix <= 15:  # VIX 낮음 (시장 안정)
-                        self._send_urgent_alert({
-                            'type': 'INFO',
-                            'ticker': 'VIX',
-                            'alert': 'VIX_LOW',
-                            'value': current_vix,
-                            'message': f"VIX 안정권: {current_vix:.1f} (시장 안정 - 적극적 투자 환경)"
+                    elif change_pct >= 2:  # 2% 이상 상승
+                        alerts.append({
+                            'type': 'URGENT_BUY',
+                            'ticker': ticker,
+                            'alert': 'MARKET_RALLY',
+                            'value': change_pct,
+                            'message': f"시장 상승 신호: {ticker} {change_pct:+.1f}%"
                         })
-                
-                time.sleep(900)  # 15분 간격
-                
-            except Exception as e:
-                logging.error(f"VIX 모니터링 오류: {e}")
-                time.sleep(600)
+            
+            return alerts
+            
+        except Exception as e:
+            logging.error(f"시장 모니터링 오류: {e}")
+            raise
     
-    def _calculate_rsi(self, prices, period=14):
-        """RSI 계산"""
+    def _monitor_vix(self, snapshot):
+        """VIX 변동성 지수 모니터링 (1회 주기)"""
+        alerts = []
         try:
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi.iloc[-1] if not rsi.empty else 50
-        except:
-            return 50  # 기본값
+            data = snapshot.get('^VIX', "15m", "1d")
+            
+            if self.history_store.is_stale(data):
+                logging.warning("VIX 시세 갱신 실패 - VIX 알림 생략")
+                return alerts
+            
+            if not data.empty:
+                current_vix = data['Close'].iloc[-1]
+                
+                if current_vix >= 35:  # VIX 35 이상 (극도 공포)
+                    alerts.append({
+                        'type': 'EMERGENCY',
+                        'ticker': 'VIX',
+                        'alert': 'VIX_EXTREME',
+                        'value': current_vix,
+                        'message': f"VIX 극도 공포: {current_vix:.1f} (시장 패닉 상태 - 매수 기회 가능성)"
+                    })
+                elif current_vix >= self.risk_thresholds['vix_spike']:
+                    alerts.append({
+                        'type': 'URGENT_SELL',
+                        'ticker': 'VIX',
+                        'alert': 'VIX_SPIKE',
+                        'value': current_vix,
+                        'message': f"VIX 공포지수 급등: {current_vix:.1f} (변동성 증가 - 주의 필요)"
+                    })
+                elif current_vix <= 15:  # VIX 낮음 (시장 안정)
+                    alerts.append({
+                        'type': 'INFO',
+                        'ticker': 'VIX',
+                        'alert': 'VIX_LOW',
+                        'value': current_vix,
+                        'message': f"VIX 안정권: {current_vix:.1f} (시장 안정 - 적극적 투자 환경)"
+                    })
+            
+            return alerts
+            
+        except Exception as e:
+            logging.error(f"VIX 모니터링 오류: {e}")
+            raise
     
-    def _send_urgent_alert(self, alert):
-        """긴급 알림 전송 (긴급 매수/매도 신호 포함)"""
-        alert_key = f"{alert['ticker']}_{alert['alert']}"
+    def _dispatch_tick_alerts(self, results):
+        """버스 1틱 동안 모든 구독자가 반환한 알림을 합쳐 1회 전송 (틱당 등급별 요약 1건)"""
+        self._dispatch_alerts([alert for alerts in results for alert in alerts])
+    
+    def _dispatch_alerts(self, alerts):
+        """한 주기 알림 일괄 처리 (EMERGENCY는 즉시 개별 전송, 나머지는 등급별 요약 1건)"""
+        grouped = {}
+        for alert in alerts:
+            if alert['type'] == 'EMERGENCY':
+                self._send_urgent_alert(alert)
+                continue
+            
+            # 중복 알림 방지 (같은 알림은 30분에 한 번만)
+            if not self.alert_history.check_and_set(self._alert_key(alert)):
+                continue
+            grouped.setdefault(alert['type'], []).append(alert)
+        
+        for alert_type in self.DIGEST_ORDER:
+            type_alerts = grouped.get(alert_type)
+            if not type_alerts:
+                continue
+            if len(type_alerts) == 1:
+                self._deliver_alert(type_alerts[0])
+            else:
+                self._deliver_digest(alert_type, type_alerts)
+    
+    def _deliver_digest(self, alert_type, alerts):
+        """등급별 요약 메시지 전송 (종목별 그룹)"""
         current_time = datetime.now()
+        title, footer = self.DIGEST_TEMPLATES[alert_type]
+        
+        by_ticker = {}
+        for alert in alerts:
+            by_ticker.setdefault(alert['ticker'], []).append(alert['message'])
+        
+        lines = []
+        for ticker, messages in by_ticker.items():
+            lines.append(f"📌 {ticker}")
+            lines.extend(f"  • {message}" for message in messages)
+        body = "\n".join(lines)
         
+        message = f"""
+{title} ({len(alerts)}건 / {len(by_ticker)}개 종목)
+⏰ {current_time.strftime('%H:%M:%S')} KST
+
+{body}
+
+{footer}
+🤖 Alpha Seeker v4.3 Enhanced Final
+"""
+        urgent = alert_type in ('URGENT_BUY', 'URGENT_SELL')
+        self.telegram_bot.send_message_async(message, urgent=urgent)
+        logging.info(f"{alert_type} 요약 알림 전송: {len(alerts)}건 ({', '.join(by_ticker)})")
+    
+    @staticmethod
+    def _alert_key(alert):
+        return f"{alert['ticker']}_{alert['alert']}"
+    
+    def _send_urgent_alert(self, alert):
+        """긴급 알림 전송 (긴급 매수/매도 신호 포함)"""
         # 중복 알림 방지 (같은 알림은 30분에 한 번만)
-        if alert_key in self.alert_history:
-            last_alert = self.alert_history[alert_key]
-            if current_time - last_alert < timedelta(minutes=30):
-                return
+        if not self.alert_history.check_and_set(self._alert_key(alert)):
+            return
+        
+        self._deliver_alert(alert)
+    
+    def _deliver_alert(self, alert):
+        """개별 알림 메시지 생성 및 전송"""
+        alert_key = self._alert_key(alert)
+        current_time = datetime.now()
         
         # 알림 메시지 생성
         if alert['type'] == 'EMERGENCY':
@@ -361,7 +567,7 @@ class RealtimeRiskMonitor:
 📱 즉시 대응 바랍니다!
 🤖 Alpha Seeker v4.3 Enhanced Final
 """
-            self.telegram_bot.send_message(message, emergency=True)
+            self.telegram_bot.send_message_async(message, emergency=True, incident=alert_key)
             logging.critical(f"긴급 알림 전송: {alert['message']}")
             
         elif alert['type'] == 'URGENT_BUY':
@@ -379,7 +585,7 @@ class RealtimeRiskMonitor:
 💰 신중한 매수 검토 바랍니다
 🤖 Alpha Seeker v4.3 Enhanced Final
 """
-            self.telegram_bot.send_message(message, urgent=True)
+            self.telegram_bot.send_message_async(message, urgent=True)
             logging.warning(f"긴급 매수 신호: {alert['message']}")
             
         elif alert['type'] == 'URGENT_SELL':
@@ -397,7 +603,7 @@ class RealtimeRiskMonitor:
 💸 신속한 매도 검토 바랍니다
 🤖 Alpha Seeker v4.3 Enhanced Final
 """
-            self.telegram_bot.send_message(message, urgent=True)
+            self.telegram_bot.send_message_async(message, urgent=True)
             logging.warning(f"긴급 매도 신호: {alert['message']}")
             
         elif alert['type'] == 'WARNING':
@@ -410,7 +616,7 @@ class RealtimeRiskMonitor:
 📝 참고사항: 지속적 모니터링 권장
 🤖 Alpha Seeker v4.3 Enhanced Final
 """
-            self.telegram_bot.send_message(message)
+            self.telegram_bot.send_message_async(message)
             logging.info(f"주의 알림 전송: {alert['message']}")
             
         elif alert['type'] == 'INFO':
@@ -423,15 +629,24 @@ class RealtimeRiskMonitor:
 📝 시장 환경 참고 정보
 🤖 Alpha Seeker v4.3 Enhanced Final
 """
-            self.telegram_bot.send_message(message)
+            self.telegram_bot.send_message_async(message)
             logging.info(f"정보 알림 전송: {alert['message']}")
-        
-        # 알림 기록 업데이트
-        self.alert_history[alert_key] = current_time
+    
+    def get_monitoring_status(self):
+        """작업별 실행 통계 (계획 대비 지연 포함)"""
+        if not self.scheduler:
+            return {}
+        return self.scheduler.get_lag_report()
     
     def stop_monitoring(self):
-        """모니터링 중지"""
+        """모니터링 중지 (진행 중인 작업 취소)"""
         self.monitoring = False
+        if self.scheduler:
+            self.scheduler.stop()
+            logging.info(f"모니터링 작업 통계: {self.scheduler.get_lag_report()}")
+        # 발신 큐에 남은 알림 전송 대기 후 봇 정리 (미전송분은 스풀에 보존, 대기 중인 후속 알림 취소)
+        self.telegram_bot.flush(timeout=30)
+        self.telegram_bot.close()
         print("🛑 실시간 위험 모니터링 중지")
         logging.info("실시간 위험 모니터링 중지")
 
@@ -188,6 +188,14 @@ class MorningReportGenerator:
 📈 **손익 목표**
 • 익절가: {self.utils.format_currency(take_profit)} (+{((take_profit/max(current_price, 0.01)-1)*100):.1f}%)
 • 손절가: {self.utils.format_currency(stop_loss)} ({((stop_loss/max(current_price, 0.01)-1)*100):+.1f}%)
+"""
+                    
+                    # 과거 수익률 부트스트랩 시뮬레이션 결과
+                    simulation = data.get('monte_carlo')
+                    if simulation:
+                        median_days = simulation.get('median_days_to_target')
+                        days_text = f"{median_days:.0f}일" if median_days else "미도달"
+                        report += f"""• 🎲 시뮬레이션({simulation['horizon']}일): 익절 선도달 {simulation['take_profit_probability']*100:.0f}% | 손절 {simulation['stop_loss_probability']*100:.0f}% | 기대수익 {simulation['expected_return']:+.1f}% | 익절 도달 중앙값 {days_text}
 """
                 else:
                     # 고급 포지션 정보 없을 때
@@ -685,13 +693,24 @@ class EveningReportGenerator:
             market_status = "🔴 방어적 투자"
             strategy = "최소 종목만 유지, 리스크 우선"
         
+        # 유지 종목 포트폴리오 위험 (2종목 이상일 때만 계산됨)
+        portfolio_section = ""
+        if 'portfolio_volatility' in risk_metrics:
+            portfolio_section = f"""
+📐 **포트폴리오 위험 (유지 종목)**
+• 연 변동성: {risk_metrics['portfolio_volatility']:.1f}%
+• 1일 VaR95: -{risk_metrics['portfolio_var']:.2f}% | CVaR95: -{risk_metrics['portfolio_cvar']:.2f}%
+• 평균 상관계수: {risk_metrics['avg_correlation']:.2f} | 유효 분산 종목 수: {risk_metrics['effective_bets']:.1f}개
+"""
+            portfolio_section += "".join(f"• ⚠️ {warning}\n" for warning in risk_metrics.get('portfolio_warnings', []))
+        
         return f"""
 
 🚨 **리스크 관리 현황**
 • 시장 상태: {market_status}
 • 리스크 등급: {risk_level} (점수: {risk_score:.1f}%)
 • 기본 전략: {strategy}
-
+{portfolio_section}
 ⚠️ **주요 리스크 체크포인트**
 • ✅ 포지션 사이징: Kelly Criterion 적용
 • ✅ 손절매 설정: 동적 ATR 기반 자동 계산
@@ -0,0 +1,268 @@
+import math
+from collections import deque
+
+from .indicator_frame import IndicatorFrame
+
+
+class StreamingEMA:
+    """지수이동평균 (pandas ewm(span, adjust=True)와 동일, O(1) 갱신)"""
+
+    def __init__(self, span):
+        self.decay = 1 - 2 / (span + 1)
+        self._numerator = 0.0
+        self._denominator = 0.0
+        self.value = None
+
+    def _next(self, x):
+        numerator = x + self.decay * self._numerator
+        denominator = 1 + self.decay * self._denominator
+        return numerator, denominator
+
+    def update(self, x):
+        """확정 봉 반영"""
+        self._numerator, self._denominator = self._next(x)
+        self.value = self._numerator / self._denominator
+        return self.value
+
+    def seed(self, value, count):
+        """count개 값으로 계산된 EMA로 상태 초기화"""
+        self._denominator = (1 - self.decay ** count) / (1 - self.decay)
+        self._numerator = value * self._denominator
+        self.value = value
+
+    def peek(self, x):
+        """x를 반영했을 때의 값 (상태 변경 없음)"""
+        numerator, denominator = self._next(x)
+        return numerator / denominator
+
+
+class StreamingRSI:
+    """Wilder 평활 RSI (O(1) 갱신)"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev_close = None
+        self.avg_gain = None
+        self.avg_loss = None
+        self._seed_gain = 0.0
+        self._seed_loss = 0.0
+        self._seed_count = 0
+
+    def _next(self, x):
+        if self.prev_close is None:
+            return None, None, 0.0, 0.0, 0
+
+        change = x - self.prev_close
+        gain = max(change, 0.0)
+        loss = max(-change, 0.0)
+
+        # 초기 period개 변화량은 단순 평균으로 시드
+        if self.avg_gain is None:
+            seed_gain = self._seed_gain + gain
+            seed_loss = self._seed_loss + loss
+            seed_count = self._seed_count + 1
+            if seed_count < self.period:
+                return None, None, seed_gain, seed_loss, seed_count
+            return seed_gain / self.period, seed_loss / self.period, seed_gain, seed_loss, seed_count
+
+        avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+        avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        return avg_gain, avg_loss, self._seed_gain, self._seed_loss, self._seed_count
+
+    @staticmethod
+    def _to_rsi(avg_gain, avg_loss):
+        if avg_gain is None:
+            return None
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else 50.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    @property
+    def value(self):
+        return self._to_rsi(self.avg_gain, self.avg_loss)
+
+    def update(self, x):
+        """확정 봉 반영"""
+        self.avg_gain, self.avg_loss, self._seed_gain, self._seed_loss, self._seed_count = self._next(x)
+        self.prev_close = x
+        return self.value
+
+    def seed(self, prev_close, avg_gain, avg_loss):
+        """Wilder 평균 상승/하락폭으로 상태 초기화"""
+        self.prev_close = prev_close
+        self.avg_gain = avg_gain
+        self.avg_loss = avg_loss
+        self._seed_count = self.period
+
+    def peek(self, x):
+        """x를 반영했을 때의 RSI (상태 변경 없음, 계산 불가 시 None)"""
+        avg_gain, avg_loss = self._next(x)[:2]
+        return self._to_rsi(avg_gain, avg_loss)
+
+
+class RollingWindowStats:
+    """고정 구간 이동 평균/분산 (Welford 증분 갱신, O(1))"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self):
+        return len(self.values)
+
+    def _add(self, x):
+        self.values.append(x)
+        delta = x - self.mean
+        self.mean += delta / len(self.values)
+        self._m2 += delta * (x - self.mean)
+
+    def _remove(self, x):
+        self.values.popleft()
+        count = len(self.values)
+        if count == 0:
+            self.mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = x - self.mean
+        self.mean -= delta / count
+        self._m2 -= delta * (x - self.mean)
+
+    def seed(self, values):
+        """최근 window개 값으로 상태 초기화"""
+        self.values.clear()
+        self.mean = 0.0
+        self._m2 = 0.0
+        for x in list(values)[-self.window:]:
+            self._add(x)
+
+    def update(self, x):
+        """확정 값 반영 (구간 초과분 제거)"""
+        self._add(x)
+        if len(self.values) > self.window:
+            self._remove(self.values[0])
+        return self.mean
+
+    @property
+    def variance(self):
+        """표본 분산"""
+        if len(self.values) < 2:
+            return float('nan')
+        return max(self._m2, 0.0) / (len(self.values) - 1)
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def peek_mean(self, x):
+        """최근 window-1개 확정 값 + x의 평균 (상태 변경 없음, 구간 부족 시 None)"""
+        if len(self.values) < self.window - 1:
+            return None
+        if len(self.values) < self.window:
+            return (self.mean * len(self.values) + x) / (len(self.values) + 1)
+        return (self.mean * self.window - self.values[0] + x) / self.window
+
+
+class _BarStreamState:
+    """봉 프레임 동기화 공통 로직 (새 확정 봉만 반영)"""
+
+    def __init__(self):
+        self.last_bar_time = None
+        self.bar_count = 0
+
+    def sync(self, frame):
+        """마지막 봉(형성 중)을 제외한 새 봉만 반영"""
+        if frame is None or len(frame) < 2:
+            return
+
+        closed = frame.iloc[:-1]
+        if self.last_bar_time is None:
+            # 최초 동기화는 IndicatorFrame 벡터 연산으로 상태 시드
+            self._seed(IndicatorFrame(closed))
+        else:
+            closed = closed[closed.index > self.last_bar_time]
+            if closed.empty:
+                return
+            for close, volume in zip(closed['Close'], closed['Volume']):
+                self._apply(float(close), float(volume))
+
+        self.bar_count += len(closed)
+        self.last_bar_time = closed.index[-1]
+
+    def _seed(self, frame):
+        for close, volume in zip(frame.close, frame.volume):
+            self._apply(float(close), float(volume))
+
+    def _apply(self, close, volume):
+        raise NotImplementedError
+
+
+class IntradayRiskState(_BarStreamState):
+    """1시간봉 기반 종목 위험 지표 상태 (EMA12/26, RSI, 20봉 거래량 평균)"""
+
+    def __init__(self, rsi_period=14, volume_window=20):
+        super().__init__()
+        self.ema_12 = StreamingEMA(12)
+        self.ema_26 = StreamingEMA(26)
+        self.rsi = StreamingRSI(rsi_period)
+        self.volume = RollingWindowStats(volume_window)
+
+    def _apply(self, close, volume):
+        self.ema_12.update(close)
+        self.ema_26.update(close)
+        self.rsi.update(close)
+        self.volume.update(volume)
+
+    def _seed(self, frame):
+        avg_gain, avg_loss = frame.wilder_averages(self.rsi.period)
+        if avg_gain.empty:
+            super()._seed(frame)
+            return
+
+        count = len(frame)
+        self.ema_12.seed(float(frame.ema(12).iloc[-1]), count)
+        self.ema_26.seed(float(frame.ema(26).iloc[-1]), count)
+        self.rsi.seed(float(frame.close.iloc[-1]), float(avg_gain.iloc[-1]), float(avg_loss.iloc[-1]))
+        self.volume.seed(frame.volume.astype(float))
+
+    def snapshot(self, close, volume):
+        """형성 중인 봉을 반영한 현재 지표값"""
+        return {
+            'bar_count': self.bar_count + 1,
+            'ema_12': self.ema_12.peek(close),
+            'ema_26': self.ema_26.peek(close),
+            'prev_ema_12': self.ema_12.value,
+            'prev_ema_26': self.ema_26.value,
+            'rsi': self.rsi.peek(close),
+            'volume_avg': self.volume.peek_mean(volume)
+        }
+
+
+class DailyLevelState(_BarStreamState):
+    """일봉 기반 지지/저항 이동평균 상태 (SMA20/50)"""
+
+    def __init__(self):
+        super().__init__()
+        self.sma_20 = RollingWindowStats(20)
+        self.sma_50 = RollingWindowStats(50)
+
+    def _apply(self, close, volume):
+        self.sma_20.update(close)
+        self.sma_50.update(close)
+
+    def _seed(self, frame):
+        closes = frame.close.astype(float)
+        self.sma_20.seed(closes)
+        self.sma_50.seed(closes)
+
+    def snapshot(self, close):
+        """마지막 일봉을 반영한 현재 이동평균"""
+        return {
+            'bar_count': self.bar_count + 1,
+            'sma_20': self.sma_20.peek_mean(close),
+            'sma_50': self.sma_50.peek_mean(close)
+        }
+
+
+print("✅ StreamingIndicators (O(1) 증분 지표: EMA, Wilder RSI, 이동 평균/분산)")
@@ -1,15 +1,27 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime
 
+from .history_store import OHLCVHistoryStore
+from .indicator_engine import CrossSectionalIndicatorEngine
+from .indicator_frame import IndicatorFrame
+
 
 class TechnicalAnalyzer:
-    def __init__(self):
+    def __init__(self, history_store=None, verify_parity=False):
         self.timeout = 30
         self.retry_count = 3
         
+        # 패널 지표를 종목별 계산과 대조 (디버그용 - 운영 경로에서는 이중 계산하지 않음)
+        self.verify_parity = verify_parity
+        
+        # 로컬 히스토리 저장소 (누락 구간만 다운로드)
+        self.history_store = history_store or OHLCVHistoryStore(timeout=self.timeout)
+        
+        # 다종목 일괄 지표 계산 엔진
+        self.indicator_engine = CrossSectionalIndicatorEngine()
+        
         # 로깅 설정
         self.logger = logging.getLogger(__name__)
         
@@ -17,14 +29,12 @@ class TechnicalAnalyzer:
         """강화된 기술적 분석 (데이터 검증 포함)"""
         for attempt in range(self.retry_count if retry else 1):
             try:
-                # yfinance 데이터 수집
-                stock = yf.Ticker(ticker)
-                
-                # 타임아웃과 함께 데이터 요청
-                data = stock.history(
-                    period="60d", 
-                    interval="1d", 
-                    timeout=self.timeout
+                # 저장소에서 데이터 조회 (재시도 시 전체 재다운로드)
+                data = self.history_store.get_history(
+                    ticker,
+                    interval="1d",
+                    period="60d",
+                    full_refresh=attempt > 0
                 )
                 
                 # 데이터 유효성 검증
@@ -38,7 +48,7 @@ class TechnicalAnalyzer:
                 
                 # 기술적 분석 수행
                 analysis_result = self.perform_technical_analysis(ticker, data)
-                return analysis_result
+                return self._mark_stale(ticker, analysis_result, data)
                 
             except Exception as e:
                 if attempt < self.retry_count - 1:
@@ -51,6 +61,98 @@ class TechnicalAnalyzer:
         
         return None
     
+    def analyze_many(self, tickers, retry=True):
+        """여러 종목 일괄 기술적 분석 (단일 다중 심볼 다운로드)"""
+        tickers = list(dict.fromkeys(tickers))
+        validated = {}
+        pending = tickers
+        
+        for attempt in range(self.retry_count if retry else 1):
+            if not pending:
+                break
+            
+            try:
+                # 대기 중인 종목 전체를 한 번의 요청으로 수집 (저장소에 없는 구간만)
+                frames = self.history_store.get_many(
+                    pending,
+                    interval="1d",
+                    period="60d",
+                    full_refresh=attempt > 0
+                )
+            except Exception as e:
+                self.logger.warning(f"일괄 데이터 수집 오류 ({attempt + 1}/{self.retry_count}): {str(e)}")
+                frames = {}
+            
+            failed = []
+            for ticker in pending:
+                data = frames.get(ticker)
+                
+                # 데이터 유효성 검증 (실패 종목만 다음 일괄 요청으로 재시도)
+                if data is None or not self.validate_market_data(data, ticker):
+                    failed.append(ticker)
+                    continue
+                
+                validated[ticker] = data
+            
+            pending = failed
+            if pending and retry and attempt < self.retry_count - 1:
+                self.logger.warning(f"일괄 분석 실패 {len(pending)}개 종목 재시도 중... ({attempt + 1}/{self.retry_count})")
+                import time
+                time.sleep(2 ** attempt)  # 지수 백오프
+        
+        for ticker in pending:
+            self.logger.error(f"{ticker} 일괄 분석 최종 실패")
+        
+        # 검증 통과 종목 전체를 날짜×종목 패널로 묶어 한 번에 지표 계산
+        try:
+            results = self.indicator_engine.analyze_frames(validated)
+            if self.verify_parity and not self.check_panel_parity(validated, results):
+                raise ValueError("패널 지표가 종목별 계산과 불일치")
+        except Exception as e:
+            self.logger.error(f"패널 지표 계산 오류, 종목별 계산으로 전환: {str(e)}")
+            results = {ticker: self.perform_technical_analysis(ticker, data)
+                       for ticker, data in validated.items()}
+        
+        for ticker, data in validated.items():
+            self._mark_stale(ticker, results.get(ticker), data)
+        
+        # 입력 순서 유지
+        return {ticker: results.get(ticker) for ticker in tickers}
+    
+    STALE_CONFIDENCE_FACTOR = 0.7
+    
+    def _mark_stale(self, ticker, result, data):
+        """갱신 실패로 저장된 봉만 사용한 결과는 표시 후 신뢰도 하향"""
+        if result and self.history_store.is_stale(data):
+            self.logger.warning(f"{ticker}: 최신 데이터 갱신 실패 - 저장된 봉 기준 분석 (신뢰도 하향)")
+            result['stale_data'] = True
+            result['confidence'] = result['confidence'] * self.STALE_CONFIDENCE_FACTOR
+        return result
+    
+    PARITY_FIELDS = ['current_price', 'ema_12', 'ema_26', 'rsi', 'bb_upper', 'bb_lower',
+                     'volume_ratio', 'volatility', 'score']
+    
+    def check_panel_parity(self, frames, results, sample=1):
+        """패널 결과를 종목별 계산(perform_technical_analysis)과 대조 (거래일 정렬/불일치 종목 각각 표본)"""
+        gapped = self.indicator_engine.interior_gaps(self.indicator_engine.build_panel(frames, 'Close'))
+        aligned = [ticker for ticker in frames if ticker not in gapped]
+        
+        for ticker in gapped[:sample] + aligned[:sample]:
+            panel_result = results.get(ticker)
+            expected = self.perform_technical_analysis(ticker, frames[ticker])
+            if panel_result is None and expected is None:
+                continue
+            if panel_result is None or expected is None:
+                self.logger.error(f"{ticker} 패널 지표 불일치: 결과 유무 "
+                                  f"(패널 {panel_result is not None}, 종목별 {expected is not None})")
+                return False
+            for field in self.PARITY_FIELDS:
+                if not np.isclose(panel_result[field], expected[field], rtol=1e-6, atol=1e-6):
+                    self.logger.error(f"{ticker} 패널 지표 불일치: {field} "
+                                      f"{panel_result[field]} != {expected[field]}")
+                    return False
+        return True
+    
     def validate_market_data(self, data, ticker):
         """시장 데이터 유효성 검증 (강화된 버전)"""
         try:
@@ -118,12 +220,15 @@ class TechnicalAnalyzer:
     def perform_technical_analysis(self, ticker, data):
         """실제 기술적 분석 로직 (기존 코드와 동일하되 추가 안전성 검사)"""
         try:
-            current_price = data['Close'].iloc[-1]
-            volume = data['Volume'].iloc[-1] if 'Volume' in data else 0
+            # 지표는 IndicatorFrame에서 최초 접근 시 한 번만 계산 (긴급 신호 감지와 공유)
+            frame = data if isinstance(data, IndicatorFrame) else IndicatorFrame(data)
+            
+            current_price = frame.close.iloc[-1]
+            volume = frame.volume.iloc[-1] if frame.volume is not None else 0
             
             # EMA 계산 (Series로 유지하여 rolling 계산 가능하게 함)
-            ema_12_series = data['Close'].ewm(span=12).mean()
-            ema_26_series = data['Close'].ewm(span=26).mean()
+            ema_12_series = frame.ema(12)
+            ema_26_series = frame.ema(26)
             
             # NaN 값 체크
             if ema_12_series.isna().any() or ema_26_series.isna().any():
@@ -133,32 +238,26 @@ class TechnicalAnalyzer:
             ema_26 = ema_26_series.iloc[-1]
             
             # RSI 계산 (안전성 강화)
-            rsi_series = self._calculate_rsi_safe(data['Close'])
+            rsi_series = self._calculate_rsi_safe(frame)
             rsi = rsi_series.iloc[-1] if not rsi_series.empty else 50
             
-            # 볼린저 밴드 (안전성 강화)
-            bb_middle = data['Close'].rolling(20).mean()
-            bb_std = data['Close'].rolling(20).std()
-            
-            if bb_std.iloc[-1] == 0:  # 표준편차가 0인 경우 (모든 값이 동일)
+            # 볼린저 밴드 (안전성 강화, 표준편차 0이면 현재가 ±2%)
+            bb_middle, bb_upper_series, bb_lower_series = frame.bollinger(20, 2)
+            if frame.rolling_std(20).iloc[-1] == 0:  # 표준편차가 0인 경우 (모든 값이 동일)
                 self.logger.warning(f"{ticker}: 볼린저밴드 계산 불가 (표준편차 0)")
-                bb_upper = current_price * 1.02
-                bb_lower = current_price * 0.98
-            else:
-                bb_upper = (bb_middle + (bb_std * 2)).iloc[-1]
-                bb_lower = (bb_middle - (bb_std * 2)).iloc[-1]
+            bb_upper = bb_upper_series.iloc[-1]
+            bb_lower = bb_lower_series.iloc[-1]
             
-            # MACD 계산 (수정된 버전)
-            macd_line_series = ema_12_series - ema_26_series
-            macd_signal_series = macd_line_series.ewm(span=9).mean()
-            macd_histogram = (macd_line_series - macd_signal_series).iloc[-1]
+            # MACD 계산 (캐시된 EMA 재사용)
+            macd_histogram = frame.macd(12, 26, 9)[2].iloc[-1]
             
             # 거래량 평균 (안전한 계산)
-            volume_avg_series = (data['Volume'].rolling(20).mean() if 'Volume' in data 
-                               else pd.Series([volume] * len(data)))
-            volume_avg = (volume_avg_series.iloc[-1] if not volume_avg_series.empty 
-                         and not pd.isna(volume_avg_series.iloc[-1]) else volume)
-            volume_ratio = volume / volume_avg if volume_avg > 0 else 1.0
+            if frame.volume is not None:
+                volume_avg = frame.volume_avg(20).iloc[-1]
+                volume_ratio = frame.volume_ratio(20).iloc[-1]
+            else:
+                volume_avg = volume
+                volume_ratio = 1.0
             
             # 점수 계산 (기존 로직 유지하되 NaN 체크 추가)
             score = 5  # 기본 점수
@@ -222,9 +321,8 @@ class TechnicalAnalyzer:
             
             # 추가 기술적 분석: 가격 모멘텀
             price_change_5d = 0
-            if len(data) >= 6:
-                price_change_5d = ((current_price - data['Close'].iloc[-6]) 
-                                 / data['Close'].iloc[-6] * 100)
+            if len(frame) >= 6:
+                price_change_5d = frame.pct_change(5).iloc[-1]
                 if price_change_5d > 3:
                     score += 0.3
                     signals.append("5일 상승 모멘텀")
@@ -233,7 +331,7 @@ class TechnicalAnalyzer:
             
             # 긴급 매수/매도 신호 감지
             urgent_signals = self.detect_urgent_signals(
-                data, current_price, ema_12, ema_26, rsi, macd_histogram, 
+                frame, current_price, ema_12, ema_26, rsi, macd_histogram, 
                 volume_ratio, bb_upper, bb_lower
             )
             
@@ -266,37 +364,26 @@ class TechnicalAnalyzer:
             return None
     
     def _calculate_rsi_safe(self, prices, period=14):
-        """안전한 RSI 계산"""
+        """안전한 RSI 계산 (IndicatorFrame 캐시 사용)"""
+        frame = prices if isinstance(prices, IndicatorFrame) else IndicatorFrame(close=prices)
         try:
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            
-            # 0으로 나누기 방지
-            rs = gain / loss.replace(0, np.nan)
-            rsi = 100 - (100 / (1 + rs))
-            
-            # NaN 값을 50으로 대체
-            rsi = rsi.fillna(50)
-            
-            return rsi
+            return frame.rsi(period)
             
         except Exception as e:
             self.logger.error(f"RSI 계산 오류: {e}")
             # 기본값으로 50 시리즈 반환
-            return pd.Series([50] * len(prices), index=prices.index)
+            return pd.Series([50] * len(frame.close), index=frame.close.index)
     
     def detect_urgent_signals(self, data, current_price, ema_12, ema_26, rsi, 
                             macd_histogram, volume_ratio, bb_upper, bb_lower):
         """긴급 신호 감지"""
         try:
-            # 이전 값들 계산
+            frame = data if isinstance(data, IndicatorFrame) else IndicatorFrame(data)
+            
+            # 이전 값들 계산 (RSI는 과거 값만 사용하므로 전일 값 = 캐시된 시리즈의 직전 값)
             prev_rsi = 50
-            if len(data) > 15:
-                prev_data = data[:-1]['Close']
-                prev_rsi_series = self._calculate_rsi_safe(prev_data)
-                if not prev_rsi_series.empty:
-                    prev_rsi = prev_rsi_series.iloc[-1]
+            if len(frame) > 15:
+                prev_rsi = self._calculate_rsi_safe(frame).iloc[-2]
             
             # 긴급 신호 로직...
             buy_signals = []
@@ -304,9 +391,8 @@ class TechnicalAnalyzer:
             urgency_level = 0
             
             # 급락/급등 검사
-            if len(data) >= 2:
-                price_change_1d = ((current_price - data['Close'].iloc[-2]) 
-                                 / data['Close'].iloc[-2] * 100)
+            if len(frame) >= 2:
+                price_change_1d = frame.pct_change(1).iloc[-1]
                 
                 if price_change_1d <= -5:  # 5% 이상 급락
                     sell_signals.append("급락 발생")
@@ -1,9 +1,15 @@
 import os
-import time
-import threading
+import hashlib
 import logging
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .message_queue import OutboundMessageQueue, default_rate_limiter
+from .timer_scheduler import shared_timer
 
 
 class TelegramBot:
@@ -12,92 +18,176 @@ class TelegramBot:
         self.bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
         self.chat_id = os.getenv('TELEGRAM_CHAT_ID')
         self.emergency_chat_id = os.getenv('EMERGENCY_CHAT_ID')
+        self.timeout = (5, 30)  # (연결, 응답) 초
         
-    def send_message(self, message, urgent=False, emergency=False):
-        """메시지 전송 (재시도 로직 강화)"""
-        max_retries = 3
+        # 봇당 하나의 keep-alive 세션 (재시도/백오프는 전송 계층에서 처리)
+        self.session = self._create_session()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="telegram-send")
         
-        for attempt in range(max_retries):
-            try:
-                import requests
-                
-                # 메시지 포맷팅
-                if emergency:
-                    formatted_message = f"🚨🚨🚨 긴급 알림 🚨🚨🚨\n\n{message}"
-                    target_chats = ([self.chat_id, self.emergency_chat_id] 
-                                  if self.emergency_chat_id else [self.chat_id])
-                elif urgent:
-                    formatted_message = f"⚠️ 중요 알림 ⚠️\n\n{message}"
-                    target_chats = [self.chat_id]
-                else:
-                    formatted_message = message
-                    target_chats = [self.chat_id]
-                
-                # 여러 채널에 전송
-                success_count = 0
-                for chat_id in target_chats:
-                    if chat_id:
-                        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-                        payload = {
-                            'chat_id': chat_id,
-                            'text': formatted_message,
-                            'parse_mode': 'HTML'
-                        }
-                        
-                        response = requests.post(url, data=payload, timeout=30)
-                        if response.status_code == 200:
-                            success_count += 1
-                            logging.info(f"텔레그램 전송 성공 (시도 {attempt + 1}): {chat_id}")
-                        else:
-                            logging.error(f"텔레그램 전송 실패: {response.status_code} - {response.text}")
-                
-                if success_count > 0:
-                    # 긴급 알림의 경우 후속 알림 스케줄
-                    if emergency:
-                        self._schedule_emergency_followup(formatted_message)
-                    
-                    logging.info(f"텔레그램 전송 완료: {success_count}/{len(target_chats)} 채널")
-                    return True
-                
-                # 전송 실패 시 재시도 대기
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt  # 지수 백오프
-                    logging.warning(f"텔레그램 전송 실패, {wait_time}초 후 재시도 ({attempt + 1}/{max_retries})")
-                    time.sleep(wait_time)
-                    
-            except Exception as e:
-                logging.error(f"텔레그램 전송 오류 (시도 {attempt + 1}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
+        # 백그라운드 우선순위 발신 큐 (미전송 메시지는 스풀에 보관 후 재전송)
+        self.rate_limiter = default_rate_limiter
+        # 같은 스풀은 프로세스 내 전송 스레드 한 벌만 사용 (봇 인스턴스는 클라이언트로 등록)
+        self.outbox = OutboundMessageQueue.shared()
+        self.outbox.attach(self._post_message, on_delivered=self._on_queued_delivered)
+        
+        # 긴급 알림 후속 재확인 (공유 타이머, 같은 사건은 하나로 병합)
+        self.timer = shared_timer
+        self.followup_delay = 300
+        self._closed = False
+    
+    @staticmethod
+    def _create_session(max_retries=3, backoff_factor=1.0, pool_size=4):
+        """연결 재사용 + 지수 백오프 재시도 세션 (429는 Retry-After 준수)"""
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        
+        session = requests.Session()
+        session.mount('https://', adapter)
+        return session
+        
+    def _format_message(self, message, urgent, emergency):
+        """알림 등급별 메시지 포맷 및 대상 채널"""
+        if emergency:
+            formatted_message = f"🚨🚨🚨 긴급 알림 🚨🚨🚨\n\n{message}"
+            target_chats = ([self.chat_id, self.emergency_chat_id] 
+                          if self.emergency_chat_id else [self.chat_id])
+        elif urgent:
+            formatted_message = f"⚠️ 중요 알림 ⚠️\n\n{message}"
+            target_chats = [self.chat_id]
+        else:
+            formatted_message = message
+            target_chats = [self.chat_id]
+        
+        return formatted_message, [chat_id for chat_id in target_chats if chat_id]
+    
+    def send_message(self, message, urgent=False, emergency=False, incident=None):
+        """메시지 전송 (대상 채널 병렬 전송, 재시도는 세션에서 처리)"""
+        formatted_message, target_chats = self._format_message(message, urgent, emergency)
+        
+        # 여러 채널에 동시 전송
+        if len(target_chats) > 1:
+            results = list(self._executor.map(lambda chat_id: self._post_message(chat_id, formatted_message),
+                                              target_chats))
+        else:
+            results = [self._post_message(chat_id, formatted_message) for chat_id in target_chats]
+        success_count = sum(results)
+        failed_chats = [chat_id for chat_id, ok in zip(target_chats, results) if not ok]
+        if failed_chats:
+            # 실패한 채널은 발신 큐 스풀에 보관하여 백그라운드 재전송
+            self._backup_failed_message(formatted_message, urgent, emergency, failed_chats)
+        
+        if success_count > 0:
+            # 긴급 알림의 경우 후속 알림 스케줄
+            if emergency:
+                self._schedule_emergency_followup(formatted_message, incident)
+            
+            logging.info(f"텔레그램 전송 완료: {success_count}/{len(target_chats)} 채널")
+            return True
         
-        # 최종 실패 시 로컬 파일에 백업
-        self._backup_failed_message(formatted_message, urgent, emergency)
         return False
     
-    def _backup_failed_message(self, message, urgent, emergency):
-        """실패한 메시지 로컬 백업"""
+    def send_message_async(self, message, urgent=False, emergency=False, incident=None):
+        """발신 큐에 등록 후 즉시 반환 (전송은 백그라운드, 우선순위: EMERGENCY > URGENT > NORMAL)
+
+        incident: 같은 사건의 긴급 알림 후속 재확인을 하나로 병합하는 키
+        """
+        formatted_message, target_chats = self._format_message(message, urgent, emergency)
+        priority = "EMERGENCY" if emergency else "URGENT" if urgent else "NORMAL"
+        
+        try:
+            for index, chat_id in enumerate(target_chats):
+                # 후속 알림은 메시지당 한 번 (첫 번째 채널 전송 성공 시)
+                self.outbox.enqueue(chat_id, formatted_message, priority,
+                                    followup=emergency and index == 0, incident=incident)
+            return bool(target_chats)
+        except Exception as e:
+            logging.error(f"발신 큐 등록 실패: {e}")
+            return False
+    
+    def _on_queued_delivered(self, row):
+        if row.get('followup'):
+            self._schedule_emergency_followup(row['text'], row.get('incident'))
+    
+    def flush(self, timeout=30):
+        """발신 큐의 대기 메시지 전송 완료 대기"""
+        return self.outbox.flush(timeout=timeout)
+    
+    def _post_message(self, chat_id, text):
+        """단일 채널 전송 (성공 여부 반환)"""
+        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        payload = {
+            'chat_id': chat_id,
+            'text': text,
+            'parse_mode': 'HTML'
+        }
+        
+        try:
+            self.rate_limiter.acquire(chat_id)
+            response = self.session.post(url, data=payload, timeout=self.timeout)
+            if response.status_code == 200:
+                logging.info(f"텔레그램 전송 성공: {chat_id}")
+                return True
+            logging.error(f"텔레그램 전송 실패: {response.status_code} - {response.text}")
+        except Exception as e:
+            logging.error(f"텔레그램 전송 오류 ({chat_id}): {e}")
+        return False
+    
+    def close(self):
+        """세션 및 전송 스레드 정리 (미전송 메시지는 스풀에 남음, 대기 중인 후속 알림 취소)"""
+        if self._closed:
+            return
+        self._closed = True
+        cancelled = self.timer.cancel_owner(self)
+        if cancelled:
+            logging.info(f"대기 중인 긴급 후속 알림 {cancelled}개 취소")
+        self.outbox.detach(self._post_message)
+        self._executor.shutdown(wait=True)
+        self.session.close()
+    
+    def _backup_failed_message(self, message, urgent, emergency, chat_ids):
+        """실패한 메시지 스풀 보관 (백그라운드 재전송 + 재시작 시 복구)"""
         try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             priority = "EMERGENCY" if emergency else "URGENT" if urgent else "NORMAL"
             
-            with open('failed_messages.log', 'a', encoding='utf-8') as f:
-                f.write(f"[{timestamp}] [{priority}] {message}\n")
-                f.write("-" * 80 + "\n")
+            for chat_id in chat_ids:
+                self.outbox.enqueue(chat_id, message, priority)
                 
-            logging.error(f"텔레그램 전송 최종 실패 - 로컬 백업 완료: {priority}")
+            logging.error(f"텔레그램 전송 실패 - 발신 큐 스풀 보관: {priority} ({len(chat_ids)}개 채널)")
             
         except Exception as e:
             logging.critical(f"메시지 백업도 실패: {e}")
     
-    def _schedule_emergency_followup(self, message):
-        """긴급 알림 후속 처리"""
-        def followup():
-            time.sleep(300)  # 5분 후
-            followup_msg = f"📢 5분 전 긴급 알림 재확인 필요\n\n{message[:200]}..."
-            self.send_message(followup_msg, urgent=True)
+    def _schedule_emergency_followup(self, message, incident=None):
+        """긴급 알림 후속 처리 (5분 후 재확인, 같은 사건의 알림은 한 번으로 병합)"""
+        if incident is None:
+            incident = hashlib.sha1(message.encode('utf-8')).hexdigest()
         
-        # 백그라운드로 후속 알림 스케줄
-        threading.Thread(target=followup, daemon=True).start()
+        self.timer.schedule(
+            ('emergency_followup', incident),
+            self.followup_delay,
+            self._send_emergency_followup,
+            payload={'messages': [message[:200]], 'count': 1},
+            merge=self._merge_followup,
+            owner=self
+        )
+    
+    @staticmethod
+    def _merge_followup(current, new):
+        messages = current['messages'] + [m for m in new['messages'] if m not in current['messages']]
+        return {'messages': messages[-3:], 'count': current['count'] + new['count']}
+    
+    def _send_emergency_followup(self, payload):
+        count_text = f" ({payload['count']}건)" if payload['count'] > 1 else ""
+        body = "\n\n".join(f"{message}..." for message in payload['messages'])
+        followup_msg = f"📢 5분 전 긴급 알림 재확인 필요{count_text}\n\n{body}"
+        self.send_message_async(followup_msg, urgent=True)
 
 
-print("✅ TelegramBot Enhanced (재시도 로직 + 실패 백업)")
+print("✅ TelegramBot Enhanced (keep-alive 세션 + 우선순위 발신 큐 + 스풀 재전송)")
@@ -0,0 +1,134 @@
+import heapq
+import itertools
+import threading
+import logging
+import time
+
+
+class TimerScheduler:
+    """단일 스레드 힙 타이머 (지연/반복 작업, 같은 키는 하나로 병합, 종료 시 일괄 취소)"""
+
+    def __init__(self, name="timer-scheduler"):
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+
+        self._heap = []     # (실행 시각, 순번, 키)
+        self._entries = {}  # 키 → 작업 dict (힙에는 최신 작업만 유효)
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def schedule(self, key, delay, callback, payload=None, interval=None, merge=None, owner=None):
+        """작업 등록 (같은 키가 대기 중이면 실행 시각은 유지하고 payload만 병합)
+
+        callback(payload) 형태로 호출, interval이 있으면 실행 후 같은 간격으로 반복
+        """
+        with self._condition:
+            if self._stopped:
+                return False
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['payload'] = merge(entry['payload'], payload) if merge else payload
+                return True
+
+            entry = {
+                'key': key,
+                'due': time.monotonic() + delay,
+                'seq': next(self._counter),
+                'callback': callback,
+                'payload': payload,
+                'interval': interval,
+                'owner': owner,
+            }
+            self._entries[key] = entry
+            heapq.heappush(self._heap, (entry['due'], entry['seq'], key))
+            self._ensure_thread()
+            self._condition.notify()
+            return True
+
+    def cancel(self, key):
+        """대기 중인 작업 취소 (힙 항목은 실행 시점에 무시)"""
+        with self._condition:
+            return self._entries.pop(key, None) is not None
+
+    def cancel_owner(self, owner):
+        """소유자가 등록한 대기 작업 전체 취소"""
+        with self._condition:
+            keys = [key for key, entry in self._entries.items() if entry['owner'] is owner]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def pending(self):
+        with self._condition:
+            return len(self._entries)
+
+    def shutdown(self, timeout=5):
+        """대기 작업 전체 취소 후 스레드 종료"""
+        with self._condition:
+            cancelled = len(self._entries)
+            self._entries.clear()
+            self._heap.clear()
+            self._stopped = True
+            self._condition.notify_all()
+
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        if cancelled:
+            self.logger.info(f"{self.name}: 대기 작업 {cancelled}개 취소")
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _next_due_entry(self):
+        """실행할 작업 대기 후 반환 (종료 시 None) — 잠금 보유 상태에서 호출"""
+        while not self._stopped:
+            # 취소/교체된 힙 항목 정리
+            while self._heap:
+                due, seq, key = self._heap[0]
+                entry = self._entries.get(key)
+                if entry is not None and entry['seq'] == seq:
+                    break
+                heapq.heappop(self._heap)
+
+            if not self._heap:
+                self._condition.wait()
+                continue
+
+            delay = self._heap[0][0] - time.monotonic()
+            if delay > 0:
+                self._condition.wait(timeout=delay)
+                continue
+
+            _, _, key = heapq.heappop(self._heap)
+            entry = self._entries.pop(key)
+            if entry['interval']:
+                # 반복 작업은 다음 실행을 먼저 등록 (콜백 실행 중 병합 가능)
+                next_entry = dict(entry, due=entry['due'] + entry['interval'], seq=next(self._counter))
+                self._entries[key] = next_entry
+                heapq.heappush(self._heap, (next_entry['due'], next_entry['seq'], key))
+            return entry
+        return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                entry = self._next_due_entry()
+            if entry is None:
+                return
+
+            try:
+                entry['callback'](entry['payload'])
+            except Exception as e:
+                self.logger.error(f"{self.name}: 작업 실행 오류 ({entry['key']}): {e}")
+
+
+# 프로세스 공유 타이머 (TelegramBot 후속 알림 등)
+shared_timer = TimerScheduler()
+
+
+print("✅ TimerScheduler (힙 기반 공유 타이머)")
@@ -44,9 +44,12 @@ from core.telegram_bot import TelegramBot
 from core.technical import TechnicalAnalyzer
 from core.report_generator import MorningReportGenerator, EveningReportGenerator
 from core.analyzer import AlphaSeeker
+from core.timer_scheduler import shared_timer
 
 
 def main():
+    telegram_bot = None
+    alpha_seeker = None
     try:
         current_time_kst = get_now_kst().strftime('%Y-%m-%d %H:%M:%S')
         print(f"🚀 Alpha Seeker v4.3 Enhanced Final 시작 - {current_time_kst} (KST)")
@@ -146,10 +149,22 @@ def main():
 🤖 Alpha Seeker v4.3 Emergency Alert"""
             
             emergency_bot.send_message(emergency_msg, emergency=True)
+            emergency_bot.close()
             
         except Exception as alert_error:
             print(f"❌ 긴급 알림 전송도 실패: {alert_error}")
             logger.critical(f"긴급 알림 전송 실패: {alert_error}")
+    
+    finally:
+        # 종료 정리 (모니터링 중지, 발신 큐 스레드 종료, 대기 중인 후속 알림 취소)
+        try:
+            if alpha_seeker:
+                alpha_seeker.shutdown()
+            if telegram_bot:
+                telegram_bot.close()
+            shared_timer.shutdown()
+        except Exception as e:
+            logger.error(f"종료 정리 오류: {e}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TokenBucket:
+    """토큰 버킷 요청 속도 제한기 (스레드 안전)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)  # 초당 토큰 보충량
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1):
+        """토큰 확보까지 대기"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait_time = (tokens - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def run_concurrently(func, items, max_workers=4, rate_limiter=None, description="작업"):
+    """제한된 스레드 풀로 병렬 실행 후 입력 순서대로 결과 반환 (실패 항목은 None)"""
+    items = list(items)
+    if not items:
+        return []
+
+    def task(item):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        return func(item)
+
+    results = [None] * len(items)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(task, item) for item in items]
+        for index, future in enumerate(futures):
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                logging.error(f"{description} 병렬 실행 오류 ({items[index]}): {e}")
+
+    return results
+
+
+print("✅ Concurrency 유틸리티 로드 완료 (토큰 버킷 + 병렬 실행기)")
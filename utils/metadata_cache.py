@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import logging
+import threading
+
+
+class SecurityMetadataCache:
+    """종목 메타데이터 캐시 (필드별 TTL, 메모리 + 디스크, 동일 종목 동시 조회 1회로 병합)"""
+
+    DAY = 24 * 60 * 60
+
+    # 필드별 유효 기간 (초): 회사명/섹터/거래소는 거의 변하지 않고 시가총액은 매일 변동
+    FIELD_TTLS = {
+        'symbol': 30 * DAY,
+        'longName': 30 * DAY,
+        'sector': 30 * DAY,
+        'exchange': 30 * DAY,
+        'marketCap': 1 * DAY,
+    }
+
+    # 종목명/심볼이 빠진 응답(일시 오류 또는 미존재 종목)은 짧게만 보관
+    INCOMPLETE_TTL = 60 * 60
+    REQUIRED_FIELDS = ('symbol', 'longName')
+
+    def __init__(self, cache_file='data/security_metadata.json', fetcher=None, wait_timeout=60, save_interval=30):
+        self.cache_file = cache_file
+        self.fetcher = fetcher or self._fetch_info
+        self.wait_timeout = wait_timeout
+        self.save_interval = save_interval  # 디스크 저장 최소 간격 (초), 남은 변경은 flush()로 저장
+        self.logger = logging.getLogger(__name__)
+
+        self._entries = {}   # ticker → {field: [value, fetched_at]}
+        self._inflight = {}  # ticker → threading.Event
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # 파일 쓰기 직렬화 (조회 잠금과 분리)
+        self._dirty = False
+        self._last_save = time.time()
+        self._load()
+
+    @staticmethod
+    def _fetch_info(ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).info
+
+    def _load(self):
+        """디스크 캐시로 웜 스타트 (만료 항목 제거)"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r') as f:
+                    self._entries = json.load(f)
+                self._dirty = self._prune(time.time()) > 0
+        except Exception as e:
+            self.logger.warning(f"메타데이터 캐시 로드 실패 (빈 캐시로 시작): {e}")
+            self._entries = {}
+
+    def _prune(self, now):
+        """만료 항목 제거 (모든 필드가 만료됐거나 불완전 응답 보관 기한이 지난 종목), 호출 측에서 잠금 보유 → 제거 수"""
+        expired = []
+        for ticker, entry in self._entries.items():
+            incomplete = entry.get('_incomplete')
+            if incomplete is not None and now - incomplete[1] > self.INCOMPLETE_TTL:
+                expired.append(ticker)
+            elif all(now - entry[field][1] > ttl for field, ttl in self.FIELD_TTLS.items() if field in entry):
+                expired.append(ticker)
+        for ticker in expired:
+            del self._entries[ticker]
+        return len(expired)
+
+    def _save_if_due(self):
+        """마지막 저장 후 save_interval이 지났을 때만 저장 (종목마다 전체 파일을 다시 쓰지 않음)"""
+        if time.time() - self._last_save >= self.save_interval:
+            self.flush()
+
+    def flush(self):
+        """변경분 저장 (만료 항목 정리 후 원자적 교체, 파일 쓰기는 조회 잠금 밖에서 수행)"""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._prune(time.time())
+                entries = dict(self._entries)
+                self._dirty = False
+                self._last_save = time.time()
+
+            try:
+                os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+                temp_file = f"{self.cache_file}.tmp"
+                with open(temp_file, 'w') as f:
+                    json.dump(entries, f)
+                os.replace(temp_file, self.cache_file)
+            except Exception as e:
+                self.logger.error(f"메타데이터 캐시 저장 실패: {e}")
+                with self._lock:
+                    self._dirty = True
+
+    def _fresh_fields(self, ticker, fields, now):
+        """유효한 필드 값 dict (하나라도 만료/누락이면 None)"""
+        entry = self._entries.get(ticker)
+        if entry is None:
+            return None
+
+        incomplete = entry.get('_incomplete')
+        if incomplete is not None and now - incomplete[1] > self.INCOMPLETE_TTL:
+            return None
+
+        values = {}
+        for field in fields:
+            cached = entry.get(field)
+            if cached is None or now - cached[1] > self.FIELD_TTLS.get(field, self.DAY):
+                return None
+            values[field] = cached[0]
+        return values
+
+    def get(self, ticker, fields=('symbol', 'longName')):
+        """요청 필드 조회 (캐시 우선, 만료 시 .info 1회 조회 — 조회 실패 시 예외 전파)"""
+        fields = tuple(fields)
+
+        while True:
+            with self._lock:
+                values = self._fresh_fields(ticker, fields, time.time())
+                if values is not None:
+                    return values
+
+                event = self._inflight.get(ticker)
+                if event is None:
+                    event = threading.Event()
+                    self._inflight[ticker] = event
+                    break
+
+            # 다른 스레드가 같은 종목을 조회 중이면 결과를 기다렸다가 캐시에서 다시 확인
+            if not event.wait(self.wait_timeout):
+                self.logger.warning(f"{ticker} 메타데이터 조회 대기 시간 초과")
+            with self._lock:
+                values = self._fresh_fields(ticker, fields, time.time())
+                if values is not None:
+                    return values
+                if ticker in self._inflight:
+                    # 빈 값을 돌려주면 미존재 종목으로 오인되므로 조회 실패로 처리
+                    raise TimeoutError(f"{ticker} 메타데이터 조회 대기 시간 초과")
+
+        try:
+            info = self.fetcher(ticker) or {}
+            self._store(ticker, info)
+            return {field: info.get(field) for field in fields}
+        finally:
+            with self._lock:
+                self._inflight.pop(ticker, None)
+            event.set()
+
+    def _store(self, ticker, info):
+        """추적 필드 전체 저장 (없는 필드는 None으로 기록, 필수 필드 누락 응답은 INCOMPLETE_TTL 동안만 유효)"""
+        now = time.time()
+        entry = {field: [info.get(field), now] for field in self.FIELD_TTLS}
+        if not all(info.get(field) for field in self.REQUIRED_FIELDS):
+            entry['_incomplete'] = [True, now]
+        with self._lock:
+            self._entries[ticker] = entry
+            self._dirty = True
+        self._save_if_due()
+
+    def invalidate(self, ticker):
+        with self._lock:
+            if self._entries.pop(ticker, None) is not None:
+                self._dirty = True
+        self._save_if_due()
+
+
+print("✅ SecurityMetadataCache (필드별 TTL 종목 메타데이터 캐시)")
@@ -1,14 +1,20 @@
 import json
 import os
 import re
-import yfinance as yf
 from datetime import datetime
 
+from utils.symbol_universe import SymbolUniverse
+from utils.ticker_matcher import get_ticker_matcher
+from utils.metadata_cache import SecurityMetadataCache
+
 class StockTickerManager:
     def __init__(self):
         self.discovered_tickers_file = 'data/discovered_tickers.json'
         self.company_ticker_map_file = 'data/company_ticker_map.json'
         self.ensure_data_dir()
+        self.symbol_universe = SymbolUniverse()
+        self.ticker_matcher = get_ticker_matcher(self.company_ticker_map_file)
+        self.metadata_cache = SecurityMetadataCache()
         
     def ensure_data_dir(self):
         """데이터 디렉토리 생성"""
@@ -45,27 +51,43 @@ class StockTickerManager:
         except Exception:
             pass
     
-    def validate_ticker(self, ticker):
-        """티커가 실제 존재하는 주식인지 검증"""
+    def _company_map_mtime(self):
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            
-            # 기본 정보가 있는지 확인
-            if info.get('symbol') and info.get('longName'):
-                return True
-            return False
-            
+            return os.path.getmtime(self.company_ticker_map_file)
+        except OSError:
+            return None
+    
+    def validate_ticker(self, ticker, explicit=True):
+        """티커가 실제 존재하는 주식인지 검증 (로컬 종목 인덱스 우선, 판단 불가 시에만 조회)"""
+        known = self.symbol_universe.lookup(ticker, explicit=explicit)
+        if known is not None:
+            return known
+        
+        try:
+            info = self.metadata_cache.get(ticker, ('symbol', 'longName'))
         except Exception:
+            # 조회 실패/대기 시간 초과는 일시 오류일 수 있으므로 네거티브 캐시에 넣지 않음
             return False
+        
+        # 기본 정보가 있는지 확인
+        if info.get('symbol') and info.get('longName'):
+            self.symbol_universe.add_symbol(ticker, info.get('longName', ''))
+            return True
+        
+        # 응답은 왔지만 종목 정보가 전혀 없을 때만 비티커로 확정 (일부 필드만 빠진 응답은 제외)
+        if not info.get('symbol') and not info.get('longName'):
+            self.symbol_universe.add_non_ticker(ticker)
+        return False
     
     def discover_company_from_ticker(self, ticker):
         """티커에서 회사명 역추론 (동적 학습)"""
         try:
             if self.validate_ticker(ticker):
-                stock = yf.Ticker(ticker)
-                info = stock.info
-                company_name = info.get('longName', '').upper()
+                # 상장 목록의 종목명 우선 사용 ("Apple Inc. - Common Stock" → "Apple Inc.")
+                company_name = self.symbol_universe.names.get(ticker, '').split(' - ')[0].upper()
+                if not company_name:
+                    info = self.metadata_cache.get(ticker, ('longName',))
+                    company_name = (info.get('longName') or '').upper()
                 
                 # 회사명에서 주요 키워드 추출
                 keywords = []
@@ -85,50 +107,26 @@ class StockTickerManager:
         """텍스트에서 티커 추출 (완전 동적)"""
         print("🔍 완전 동적 티커 추출 시작...")
         
-        # 기존 발견된 티커들과 매핑 로드
+        # 상장 목록이 오래되었으면 갱신 (실패 시 기존 목록/네트워크 검증 사용)
+        self.symbol_universe.refresh_if_stale()
+        
+        # 기존 발견된 티커 로드 (회사명 매핑은 프로세스 공유 매처가 보관)
         known_tickers = self.load_discovered_tickers()
-        company_map = self.load_company_ticker_map()
         
         verified_tickers = []
         new_tickers = []
         new_mappings = {}
         
-        # 1. 명시적 티커 패턴 추출 (가장 확실한 방법)
-        ticker_patterns = [
-            r'\b[A-Z]{2,5}\b',           # 기본 패턴 AAPL, MSFT
-            r'(?:NYSE:|NASDAQ:)([A-Z]{2,5})',  # NYSE:AAPL
-            r'\$([A-Z]{2,5})\b',         # $AAPL
-            r'\(([A-Z]{2,5})\)',         # (AAPL)
-        ]
-        
-        text_upper = text.upper()
+        # 1-2. 티커 표기(NYSE:/$/괄호/일반)와 회사명 매핑을 단일 스캔으로 추출
         potential_tickers = set()
-        
-        for pattern in ticker_patterns:
-            matches = re.findall(pattern, text_upper)
-            for match in matches:
-                if isinstance(match, tuple):
-                    match = match[0] if match else match[-1]
-                if 2 <= len(match) <= 5:
-                    potential_tickers.add(match)
-        
-        # 2. 회사명 패턴 추출 (동적 추론)
-        company_patterns = [
-            r'([A-Z][A-Za-z]{2,15})\s*(?:\([A-Z]{2,5}\))',  # Apple (AAPL)
-            r'([A-Z][A-Za-z]{2,15})\s+(?:Inc|Corp|Ltd)',    # Tesla Inc
-            r'([A-Z][A-Za-z]{2,15})\s+(?:주식|종목)',        # Tesla 주식
-        ]
-        
-        for pattern in company_patterns:
-            matches = re.findall(pattern, text)
-            for company in matches:
-                company_upper = company.upper()
-                # 기존 매핑에서 확인
-                if company_upper in company_map:
-                    ticker = company_map[company_upper]
-                    if ticker not in potential_tickers:
-                        potential_tickers.add(ticker)
-                        print(f"📋 매핑에서 발견: {company} → {ticker}")
+        explicit_tickers = set()  # 티커 표기($/거래소/괄호) 또는 회사명 매핑으로 나온 후보
+        for candidate in self.ticker_matcher.scan(text):
+            ticker = candidate['ticker']
+            if candidate['match_type'] == 'company' and ticker not in potential_tickers:
+                print(f"📋 매핑에서 발견: {candidate['text']} → {ticker}")
+            potential_tickers.add(ticker)
+            if candidate['match_type'] != 'bare':
+                explicit_tickers.add(ticker)
         
         # 3. 실제 검증 및 동적 학습
         for ticker in potential_tickers:
@@ -136,8 +134,7 @@ class StockTickerManager:
                 verified_tickers.append(ticker)
                 continue
             
-            print(f"🔍 새 티커 검증 중: {ticker}")
-            if self.validate_ticker(ticker):
+            if self.validate_ticker(ticker, explicit=ticker in explicit_tickers):
                 verified_tickers.append(ticker)
                 new_tickers.append(ticker)
                 
@@ -147,8 +144,12 @@ class StockTickerManager:
                     new_mappings[keyword] = ticker
                 
                 print(f"✅ 새 티커 학습: {ticker} → {company_keywords}")
-            else:
-                print(f"❌ 무효 티커: {ticker}")
+        
+        rejected = len(potential_tickers) - len(verified_tickers)
+        if rejected:
+            print(f"❌ 무효 티커 후보 제외: {rejected}개")
+        self.symbol_universe.save_negative_cache()
+        self.metadata_cache.flush()
         
         # 4. 새로운 발견 저장
         if new_tickers:
@@ -163,25 +164,26 @@ class StockTickerManager:
                 json.dump(ticker_data, f, indent=2)
         
         if new_mappings:
+            company_map = self.load_company_ticker_map()
             company_map.update(new_mappings)
             self.save_company_ticker_map(company_map)
+            self.ticker_matcher.update(new_mappings, mtime=self._company_map_mtime())
             print(f"🧠 새 매핑 학습: {len(new_mappings)}개")
         
         print(f"✅ 완전 동적 추출 완료: {len(verified_tickers)}개 티커")
         return verified_tickers
     
     def get_stock_basic_info(self, ticker):
-        """주식 기본 정보 조회"""
+        """주식 기본 정보 조회 (메타데이터 캐시 사용)"""
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            info = self.metadata_cache.get(ticker, ('longName', 'sector', 'marketCap', 'exchange'))
             
             return {
                 'symbol': ticker,
-                'name': info.get('longName', ticker),
-                'sector': info.get('sector', 'Unknown'),
-                'market_cap': info.get('marketCap', 0),
-                'exchange': info.get('exchange', 'Unknown')
+                'name': info.get('longName') or ticker,
+                'sector': info.get('sector') or 'Unknown',
+                'market_cap': info.get('marketCap') or 0,
+                'exchange': info.get('exchange') or 'Unknown'
             }
         except Exception as e:
             print(f"⚠️ {ticker} 기본 정보 조회 실패: {e}")
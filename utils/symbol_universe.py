@@ -0,0 +1,262 @@
+import os
+import json
+import math
+import base64
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+
+class BloomFilter:
+    """비트 배열 기반 확률적 집합 (거짓 음성 없음, 거짓 양성은 error_rate 이내)"""
+
+    def __init__(self, capacity=20000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # 이중 해싱: h1 + i*h2
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def to_dict(self):
+        return {
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'count': self.count,
+            'bits': base64.b64encode(bytes(self.bits)).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        bloom = cls(data['capacity'], data['error_rate'])
+        bits = base64.b64decode(data['bits'])
+        if len(bits) != len(bloom.bits):
+            raise ValueError("블룸 필터 크기 불일치")
+        bloom.bits = bytearray(bits)
+        bloom.count = data.get('count', 0)
+        return bloom
+
+
+class SymbolUniverse:
+    """미국 상장 종목 인덱스 (해시 집합 + 비티커 블룸 필터 네거티브 캐시, 세대 교체로 만료)"""
+
+    LISTING_URLS = [
+        'https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt',
+        'https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt',
+    ]
+
+    # 티커 패턴에 걸리지만 종목이 아닌 금융/일반 용어 (실제 상장 심볼은 제외: AI, PM, LOW, COO, API 등)
+    COMMON_NON_TICKERS = [
+        'EMA', 'SMA', 'MACD', 'ETF', 'ETFS', 'CEO', 'CFO', 'USD',
+        'EPS', 'IPO', 'GDP', 'CPI', 'PPI', 'FOMC', 'FED', 'SEC', 'NYSE', 'AMEX', 'OTC',
+        'EST', 'KST', 'UTC', 'YOY', 'QOQ', 'ROE', 'ROI',
+        'PER', 'EBIT', 'BUY', 'SELL', 'HOLD', 'LONG', 'SHORT', 'NEWS',
+        'THE', 'AND', 'WITH', 'FROM', 'THIS', 'THAT', 'NEW', 'HIGH',
+    ]
+
+    def __init__(self, listing_file='data/symbol_universe.txt',
+                 negative_cache_file='data/ticker_negative_cache.json',
+                 max_listing_age_days=7, negative_ttl_days=7):
+        self.listing_file = listing_file
+        self.negative_cache_file = negative_cache_file
+        self.max_listing_age = timedelta(days=max_listing_age_days)
+        # 네트워크로 확인된 비티커 유지 기간 (세대당, 실제 보존은 1~2배)
+        self.negative_ttl = timedelta(days=negative_ttl_days)
+        self.logger = logging.getLogger(__name__)
+
+        self.symbols = set()
+        self.names = {}  # 티커 → 종목명
+        self.stop_words = frozenset(self.COMMON_NON_TICKERS)
+        self.negative = BloomFilter()
+        self.negative_previous = None
+        self.negative_started = datetime.now()
+        self._negative_dirty = False
+
+        self.load_listing()
+        self.load_negative_cache()
+
+    @property
+    def loaded(self):
+        return bool(self.symbols)
+
+    def load_listing(self):
+        """로컬 상장 목록 파일 로드 (Symbol|Security Name 형식)"""
+        self.symbols = set()
+        self.names = {}
+        try:
+            if not os.path.exists(self.listing_file):
+                return False
+
+            with open(self.listing_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    symbol, _, name = line.rstrip('\n').partition('|')
+                    if symbol:
+                        self.symbols.add(symbol)
+                        self.names[symbol] = name
+            return True
+        except Exception as e:
+            self.logger.error(f"상장 목록 로드 실패: {e}")
+            return False
+
+    def listing_age(self):
+        if not os.path.exists(self.listing_file):
+            return None
+        return datetime.now() - datetime.fromtimestamp(os.path.getmtime(self.listing_file))
+
+    def is_stale(self):
+        age = self.listing_age()
+        return age is None or age > self.max_listing_age
+
+    def refresh(self, timeout=30):
+        """nasdaqtrader 상장 목록 다운로드 후 로컬 파일 갱신"""
+        try:
+            import requests
+
+            listings = {}
+            for url in self.LISTING_URLS:
+                response = requests.get(url, timeout=timeout)
+                response.raise_for_status()
+                listings.update(self._parse_listing(response.text))
+
+            if not listings:
+                return False
+
+            os.makedirs(os.path.dirname(self.listing_file) or '.', exist_ok=True)
+            temp_file = f"{self.listing_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                for symbol in sorted(listings):
+                    f.write(f"{symbol}|{listings[symbol]}\n")
+            os.replace(temp_file, self.listing_file)
+
+            self.load_listing()
+            self.logger.info(f"상장 목록 갱신 완료: {len(self.symbols)}개 종목")
+            return True
+        except Exception as e:
+            self.logger.warning(f"상장 목록 갱신 실패 (기존 목록 사용): {e}")
+            return False
+
+    def refresh_if_stale(self):
+        if self.is_stale():
+            return self.refresh()
+        return False
+
+    @staticmethod
+    def _parse_listing(text):
+        """nasdaqlisted/otherlisted 파이프 구분 파일 파싱 (테스트 종목 제외)"""
+        lines = text.strip().splitlines()
+        if not lines:
+            return {}
+
+        header = lines[0].split('|')
+        symbol_col = header.index('Symbol') if 'Symbol' in header else header.index('ACT Symbol')
+        name_col = header.index('Security Name')
+        test_col = header.index('Test Issue') if 'Test Issue' in header else None
+
+        listings = {}
+        for line in lines[1:]:
+            if line.startswith('File Creation Time'):
+                continue
+            fields = line.split('|')
+            if len(fields) < len(header):
+                continue
+            if test_col is not None and fields[test_col] == 'Y':
+                continue
+            listings[fields[symbol_col].strip()] = fields[name_col].strip()
+        return listings
+
+    def load_negative_cache(self):
+        """비티커 블룸 필터 로드 (현재/이전 세대, 구 형식이나 손상 시 빈 캐시)"""
+        try:
+            if os.path.exists(self.negative_cache_file):
+                with open(self.negative_cache_file, 'r') as f:
+                    data = json.load(f)
+                if 'current' in data:
+                    self.negative = BloomFilter.from_dict(data['current'])
+                    previous = data.get('previous')
+                    self.negative_previous = BloomFilter.from_dict(previous) if previous else None
+                    self.negative_started = datetime.fromisoformat(data['started_at'])
+                    self._rotate_negative_cache()
+                    return
+        except Exception as e:
+            self.logger.warning(f"네거티브 캐시 로드 실패 (재생성): {e}")
+
+        # 구 형식은 만료 정보가 없어 일시 오류로 등록된 종목이 남을 수 있으므로 폐기
+        self.negative = BloomFilter()
+        self.negative_previous = None
+        self.negative_started = datetime.now()
+        self._negative_dirty = True
+
+    def _rotate_negative_cache(self):
+        """현재 세대가 TTL을 넘기면 이전 세대로 밀고 새 세대 시작 (2세대 전 항목 만료)"""
+        now = datetime.now()
+        if now - self.negative_started < self.negative_ttl:
+            return
+        expired = now - self.negative_started >= self.negative_ttl * 2
+        self.negative_previous = None if expired else self.negative
+        self.negative = BloomFilter()
+        self.negative_started = now
+        self._negative_dirty = True
+
+    def save_negative_cache(self):
+        if not self._negative_dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.negative_cache_file) or '.', exist_ok=True)
+            with open(self.negative_cache_file, 'w') as f:
+                json.dump({
+                    'started_at': self.negative_started.isoformat(),
+                    'current': self.negative.to_dict(),
+                    'previous': self.negative_previous.to_dict() if self.negative_previous else None
+                }, f)
+            self._negative_dirty = False
+        except Exception as e:
+            self.logger.error(f"네거티브 캐시 저장 실패: {e}")
+
+    def is_non_ticker(self, symbol):
+        self._rotate_negative_cache()
+        if symbol in self.stop_words or symbol in self.negative:
+            return True
+        return self.negative_previous is not None and symbol in self.negative_previous
+
+    def lookup(self, symbol, explicit=False):
+        """오프라인 판정: True(상장 종목), False(비티커), None(판단 불가 — 네트워크 확인 필요)
+
+        explicit: $TSLA, NASDAQ:TSLA, (TSLA) 처럼 티커로 명시된 후보 (목록 이후 신규 상장일 수 있어 네트워크 확인)
+        """
+        if symbol in self.symbols:
+            return True
+        if self.is_non_ticker(symbol):
+            return False
+        # 최신 상장 목록에 없는 일반 대문자 단어는 오프라인에서 거부 (목록이 없거나 오래됐을 때만 네트워크 확인)
+        if not explicit and self.loaded and not self.is_stale():
+            return False
+        return None
+
+    def add_symbol(self, symbol, name=''):
+        """네트워크로 확인된 신규 종목 등록 (메모리)"""
+        self.symbols.add(symbol)
+        self.names.setdefault(symbol, name)
+
+    def add_non_ticker(self, symbol):
+        """네트워크로 확인된 비티커 등록 (확인된 미존재만, 세대 교체로 만료)"""
+        self._rotate_negative_cache()
+        if symbol not in self.negative:
+            self.negative.add(symbol)
+            self._negative_dirty = True
+
+print("✅ SymbolUniverse (상장 종목 해시 인덱스 + 블룸 필터 네거티브 캐시)")
@@ -0,0 +1,176 @@
+import os
+import re
+import json
+import threading
+from collections import deque
+
+
+class AhoCorasickAutomaton:
+    """다중 문자열 동시 검색 오토마톤 (키 추가 시 실패 링크만 재계산)"""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]  # 노드에서 끝나는 키 (가장 긴 키 하나)
+        self.values = {}
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, key, value):
+        """키 추가/갱신 (기존 키는 값만 교체)"""
+        if key not in self.values:
+            node = 0
+            for char in key:
+                next_node = self.goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto[node][char] = next_node
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(None)
+                node = next_node
+            self.output[node] = key
+            self._dirty = True
+        self.values[key] = value
+
+    def _build_links(self):
+        queue = deque()
+        for node in self.goto[0].values():
+            self.fail[node] = 0
+            queue.append(node)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                queue.append(child)
+
+        self._dirty = False
+
+    def iter_matches(self, text):
+        """(시작, 끝, 키, 값) 순회 (겹치는 매칭 포함)"""
+        if self._dirty:
+            self._build_links()
+
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+
+            match = node
+            while match:
+                key = self.output[match]
+                if key is not None:
+                    yield index + 1 - len(key), index + 1, key, self.values[key]
+                match = self.fail[match]
+
+
+class TickerMatcher:
+    """티커 토큰 + 회사명 매핑 단일 패스 후보 추출기"""
+
+    # 명시적 표기(거래소/$/괄호)를 먼저 시도하고 나머지는 일반 토큰으로 처리
+    TOKEN_PATTERN = re.compile(
+        r'(?:NYSE|NASDAQ):(?P<exchange>[A-Z]{2,5})'
+        r'|\$(?P<cash>[A-Z]{2,5})\b'
+        r'|\((?P<paren>[A-Z]{2,5})\)'
+        r'|\b(?P<bare>[A-Z]{2,5})\b'
+    )
+
+    # 회사명 뒤에 와야 하는 문맥: Apple (AAPL), Tesla Inc, Tesla 주식
+    COMPANY_CONTEXT = re.compile(r'\s*\([A-Z]{2,5}\)|\s+(?:INC|CORP|LTD)\b|\s+(?:주식|종목)')
+
+    def __init__(self, company_map_file):
+        self.company_map_file = company_map_file
+        self.automaton = AhoCorasickAutomaton()
+        self._mtime = None
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """매핑 파일이 변경된 경우에만 새 키를 오토마톤에 반영"""
+        with self._lock:
+            try:
+                if not os.path.exists(self.company_map_file):
+                    return
+                mtime = os.path.getmtime(self.company_map_file)
+                if mtime == self._mtime:
+                    return
+                with open(self.company_map_file, 'r') as f:
+                    mapping = json.load(f)
+                self._mtime = mtime
+            except Exception:
+                return
+
+            for company, ticker in mapping.items():
+                self.automaton.add(company.upper(), ticker)
+
+    def update(self, mappings, mtime=None):
+        """새로 학습한 매핑 반영 (파일 재로드 없이 증분 추가)"""
+        with self._lock:
+            for company, ticker in mappings.items():
+                self.automaton.add(company.upper(), ticker)
+            if mtime is not None:
+                self._mtime = mtime
+
+    def scan(self, text):
+        """후보 목록 반환: [{'ticker', 'match_type', 'position', 'text'}] (위치 순)"""
+        self.reload()
+        text_upper = text.upper()
+        candidates = []
+
+        for match in self.TOKEN_PATTERN.finditer(text_upper):
+            match_type = match.lastgroup
+            candidates.append({
+                'ticker': match.group(match_type),
+                'match_type': match_type,
+                'position': match.start(match_type),
+                'text': match.group(0)
+            })
+
+        with self._lock:
+            company_matches = list(self.automaton.iter_matches(text_upper))
+        # 대문자 변환으로 길이가 바뀌는 문자(ß 등)가 있으면 원문 대소문자 검사 생략
+        same_length = len(text) == len(text_upper)
+
+        for start, end, company, ticker in company_matches:
+            # 단어 경계 + 원문 대문자 시작 + 회사명 문맥 확인
+            if start > 0 and text_upper[start - 1].isalnum():
+                continue
+            if end < len(text_upper) and text_upper[end].isalnum():
+                continue
+            if same_length and not text[start].isupper():
+                continue
+            if not self.COMPANY_CONTEXT.match(text_upper, end):
+                continue
+            candidates.append({
+                'ticker': ticker,
+                'match_type': 'company',
+                'position': start,
+                'text': text[start:end] if same_length else company
+            })
+
+        candidates.sort(key=lambda candidate: candidate['position'])
+        return candidates
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def get_ticker_matcher(company_map_file):
+    """프로세스당 하나의 매처 공유 (매핑 파일 경로별)"""
+    with _matchers_lock:
+        matcher = _matchers.get(company_map_file)
+        if matcher is None:
+            matcher = TickerMatcher(company_map_file)
+            _matchers[company_map_file] = matcher
+        return matcher
+
+
+print("✅ TickerMatcher (Aho-Corasick 회사명 매칭 + 통합 티커 토크나이저)")
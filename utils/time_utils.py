@@ -114,4 +114,37 @@ def get_us_market_status():
             'next_event': 'unknown'
         }
 
+def get_next_us_session_boundary(now_est=None):
+    """다음 미국 시장 세션 경계 시각 (04:00 프리마켓, 09:30 개장, 16:00 마감, 20:00 애프터마켓 종료)"""
+    now_est = now_est or get_now_est()
+    boundaries = [(4, 0), (9, 30), (16, 0), (20, 0)]
+    
+    for day_offset in range(8):
+        day = now_est + timedelta(days=day_offset)
+        if day.weekday() > 4:  # 주말에는 세션 없음
+            continue
+        for hour, minute in boundaries:
+            boundary = EST.localize(datetime(day.year, day.month, day.day, hour, minute))
+            if boundary > now_est:
+                return boundary
+    
+    return now_est + timedelta(days=1)
+
+def seconds_until_next_session_boundary(now_est=None):
+    """다음 세션 경계까지 남은 시간 (초)"""
+    now_est = now_est or get_now_est()
+    return max(0.0, (get_next_us_session_boundary(now_est) - now_est).total_seconds())
+
+def get_session_poll_interval(base_interval, extended_factor=3, boundary_margin=5):
+    """세션별 폴링 간격 (정규장: 기본 간격, 프리/애프터마켓: 완화, 휴장: 다음 세션 경계까지 대기)"""
+    status = get_us_market_status()['status']
+    until_boundary = seconds_until_next_session_boundary() + boundary_margin
+    
+    if status == 'closed':
+        return until_boundary
+    if status in ('pre_market', 'after_market'):
+        # 완화된 간격이라도 정규장 개장/세션 종료 시점은 놓치지 않음
+        return min(base_interval * extended_factor, until_boundary)
+    return base_interval
+
 print("✅ TimeUtils Enhanced 모듈 로드 완료 (한국시간 + 미국시장 연동)")